@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Compare messages/sec for batched LSTM inference at several batch sizes,
+plus the micro-batching queue under concurrent single-message callers.
+
+Usage: python benchmarks/bench_batch_inference.py [--model PREFIX] [--messages N]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import DEFAULT_MODEL_PREFIX, load_chatbot, synthetic_messages
+
+BATCH_SIZES = [1, 8, 64, 512]
+
+
+def bench_batches(chatbot, messages, batch_size):
+    start = time.perf_counter()
+    for i in range(0, len(messages), batch_size):
+        chatbot.predict_diseases(messages[i:i + batch_size])
+    return len(messages) / (time.perf_counter() - start)
+
+
+def bench_micro_batching(chatbot, messages, concurrency, max_wait_ms):
+    batcher = chatbot.enable_micro_batching(max_batch_size=64, max_wait_ms=max_wait_ms)
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(chatbot.predict_disease, messages))
+        elapsed = time.perf_counter() - start
+        return len(messages) / elapsed, batcher.mean_batch_size
+    finally:
+        chatbot.disable_micro_batching()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PREFIX, help="saved model prefix")
+    parser.add_argument("--messages", type=int, default=2048, help="messages per run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    chatbot = load_chatbot(args.model)
+    messages = synthetic_messages(chatbot, args.messages, seed=args.seed)
+
+    # Warm up graph tracing so the first batch size is not penalized
+    chatbot.predict_diseases(messages[:max(BATCH_SIZES)])
+
+    print(f"{'mode':<28}{'messages/sec':>14}{'speedup':>10}")
+    baseline = None
+    for batch_size in BATCH_SIZES:
+        throughput = bench_batches(chatbot, messages, batch_size)
+        baseline = baseline or throughput
+        print(f"{'batch=' + str(batch_size):<28}{throughput:>14.1f}{throughput / baseline:>9.1f}x")
+
+    for concurrency in (8, 64):
+        throughput, mean_batch = bench_micro_batching(chatbot, messages, concurrency, max_wait_ms=5.0)
+        label = f"micro-batch x{concurrency} (avg {mean_batch:.1f})"
+        print(f"{label:<28}{throughput:>14.1f}{throughput / baseline:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Load time of the single-file model bundle against the other backends, and
+request latency while the bundle is hot-reloaded under load.
+
+The load table times load_model in a process that has already imported
+the chatbot module. It also times read_bundle alone with and without
+checksum verification. The hot-swap test runs chat_response in
+--threads threads and calls reload_model_async every --reload-ms
+milliseconds. It reports errors and latency percentiles with and without
+reloads, and checks that every answer matches the first model's answer.
+
+Usage: python benchmarks/bench_bundle.py [--model PREFIX] [--backends numpy mmap bundle] [--seconds 5]
+"""
+
+import argparse
+import threading
+import time
+
+from common import DEFAULT_MODEL_PREFIX, percentile, synthetic_messages
+from medical_chatbot_lstm import MedicalChatbotLSTM
+from model_bundle import read_bundle
+
+
+def load_seconds(model_prefix, backend, runs):
+    timings = []
+    for _ in range(runs):
+        chatbot = MedicalChatbotLSTM()
+        start = time.perf_counter()
+        chatbot.load_model(model_prefix, backend=backend)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def read_seconds(path, verify, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        read_bundle(path, verify=verify)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_load(chatbot, messages, expected, seconds, threads, reload_ms, model_prefix):
+    """Latencies (s), errors and reload count of chat_response for ``seconds``"""
+    stop = threading.Event()
+    latencies, errors = [], []
+
+    def client(offset):
+        i = offset
+        while not stop.is_set():
+            message = messages[i % len(messages)]
+            start = time.perf_counter()
+            try:
+                response = chatbot.chat_response(message)
+            except Exception as exc:
+                errors.append(repr(exc))
+            else:
+                latencies.append(time.perf_counter() - start)
+                if response['disease_predictions'] != expected[message]:
+                    errors.append(f"changed answer for {message!r}")
+            i += 1
+
+    workers = [threading.Thread(target=client, args=(k,)) for k in range(threads)]
+    for worker in workers:
+        worker.start()
+    reloads = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        if reload_ms:
+            time.sleep(reload_ms / 1000)
+            chatbot.reload_model_async(model_prefix, backend='bundle').join()
+            if chatbot.load_error is not None:
+                errors.append(f"reload failed: {chatbot.load_error}")
+            reloads += 1
+        else:
+            time.sleep(0.05)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return latencies, errors, reloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PREFIX, help="saved model prefix")
+    parser.add_argument("--backends", nargs="+", default=["numpy", "mmap", "bundle"],
+                        choices=sorted(MedicalChatbotLSTM.BACKEND_FILES))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each hot-swap phase")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--reload-ms", type=float, default=100.0, help="pause between reloads")
+    args = parser.parse_args()
+
+    for backend in args.backends + ["bundle"]:
+        if not MedicalChatbotLSTM.saved_model_exists(args.model, backend):
+            parser.error(f"No saved {backend} model at {args.model}_*. "
+                         f"Create the bundle with chatbot.save_bundle(prefix).")
+
+    print(f"{'load':<24}{'p50 ms':>10}{'max ms':>10}")
+    for backend in args.backends:
+        timings = [t * 1000 for t in load_seconds(args.model, backend, args.runs)]
+        print(f"{backend:<24}{percentile(timings, 50):>10.2f}{max(timings):>10.2f}")
+    for verify in (True, False):
+        timings = [t * 1000 for t in read_seconds(f"{args.model}.bundle", verify, args.runs)]
+        label = f"read_bundle verify={verify}"
+        print(f"{label:<24}{percentile(timings, 50):>10.2f}{max(timings):>10.2f}")
+
+    chatbot = MedicalChatbotLSTM()
+    chatbot.load_model(args.model, backend='bundle')
+    messages = synthetic_messages(chatbot, 200)
+    expected = {message: chatbot.chat_response(message)['disease_predictions'] for message in messages}
+
+    print(f"\n{'hot swap':<24}{'requests':>10}{'reloads':>9}{'errors':>8}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for label, reload_ms in (("steady", 0), ("reloading", args.reload_ms)):
+        latencies, errors, reloads = run_load(chatbot, messages, expected, args.seconds,
+                                              args.threads, reload_ms, args.model)
+        latencies = [t * 1000 for t in latencies]
+        print(f"{label:<24}{len(latencies):>10}{reloads:>9}{len(errors):>8}{percentile(latencies, 50):>9.2f}"
+              f"{percentile(latencies, 99):>9.2f}{max(latencies):>9.2f}")
+        for error in errors[:5]:
+            print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Accuracy against latency for the rules -> bag-of-words -> LSTM cascade at a
+range of bag-of-words confidence thresholds, next to the LSTM-only baseline.
+
+Messages and labels come from the seeded synthetic training generator.
+For each setting it reports:
+- the share of messages answered by each tier
+- the accuracy of the model prediction (the rules tier counts as
+  'No Disease')
+- the accuracy of the top disease in the final response
+- mean and p95 chat_response latency, and throughput
+
+Usage: python benchmarks/bench_cascade.py [--model PREFIX] [--bow-model PATH] [--messages N]
+"""
+
+import argparse
+import random
+import time
+
+from common import DEFAULT_MODEL_PREFIX, percentile
+from cascade import DEFAULT_BOW_MODEL_PATH
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+THRESHOLDS = [0.0, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.01]
+
+
+def labelled_messages(chatbot, count, seed):
+    texts, labels = chatbot.generate_training_data(num_samples=2000, seed=seed)
+    rng = random.Random(seed)
+    picked = rng.sample(range(len(texts)), min(count, len(texts)))
+    return [texts[i] for i in picked], [labels[i] for i in picked]
+
+
+def model_predictions(chatbot, texts):
+    """Model-slot predictions and the share answered by each tier"""
+    if chatbot.cascade is None:
+        return chatbot.predict_diseases(texts), {'rules': 0.0, 'bow': 0.0, 'lstm': 1.0}
+    symptoms = [chatbot.extract_symptoms(text) for text in texts]
+    predictions = chatbot._cascade_predictions(texts, symptoms)
+    return predictions, chatbot.cascade_stats()['hit_rates']
+
+
+def run(chatbot, texts, labels):
+    predictions, rates = model_predictions(chatbot, texts)
+    model_correct = sum(p['disease'] == label for p, label in zip(predictions, labels))
+
+    latencies = []
+    response_correct = 0
+    for text, label in zip(texts, labels):
+        start = time.perf_counter()
+        response = chatbot.chat_response(text)
+        latencies.append(time.perf_counter() - start)
+        top = response['disease_predictions'][0]['disease'] if response['disease_predictions'] else 'No Disease'
+        response_correct += top == label
+
+    total = sum(latencies)
+    return rates, {
+        'model_accuracy': model_correct / len(texts),
+        'response_accuracy': response_correct / len(texts),
+        'mean_ms': total / len(texts) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'per_s': len(texts) / total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PREFIX, help="saved LSTM model prefix")
+    parser.add_argument("--backend", default="keras", choices=sorted(MedicalChatbotLSTM.BACKEND_FILES))
+    parser.add_argument("--bow-model", default=DEFAULT_BOW_MODEL_PATH, help="output of src/ml_model/train.py")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    chatbot = MedicalChatbotLSTM()
+    if not chatbot.saved_model_exists(args.model, args.backend):
+        parser.error(f"No saved {args.backend} model at {args.model}_*. Train one with medical_chatbot_lstm.py first.")
+    chatbot.load_model(args.model, backend=args.backend)
+    texts, labels = labelled_messages(chatbot, args.messages, args.seed)
+    chatbot.chat_response(texts[0])
+
+    print(f"{'setting':<14}{'rules':>7}{'bow':>7}{'lstm':>7}{'model acc':>11}{'resp acc':>10}"
+          f"{'mean ms':>9}{'p95 ms':>8}{'msg/s':>8}")
+    settings = [("LSTM only", None)] + [(f"bow >= {t:.2f}", t) for t in THRESHOLDS]
+    for name, threshold in settings:
+        chatbot.disable_cascade()
+        if threshold is not None:
+            chatbot.enable_cascade(args.bow_model, bow_threshold=threshold)
+        rates, result = run(chatbot, texts, labels)
+        print(f"{name:<14}{rates['rules']:>7.0%}{rates['bow']:>7.0%}{rates['lstm']:>7.0%}"
+              f"{result['model_accuracy']:>11.1%}{result['response_accuracy']:>10.1%}"
+              f"{result['mean_ms']:>9.2f}{result['p95_ms']:>8.2f}{result['per_s']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of every stage of chat_response for MedicalChatbotLSTM
+and the demo SimpleMedicalChatbot.
+
+For each disease database (built-in, data/disease_database.json, and a
+seeded synthetic one) and each seeded message corpus (short, medium and
+long messages), it times extract_symptoms, analyze_symptoms,
+predict_disease (simulate_lstm_prediction for the demo bot),
+_generate_response and the full chat_response one call at a time.
+Throughput, p50/p95/p99 latency and the peak RSS of each chatbot's process
+are written to performance.json next to metrics.json, where the DVC
+`benchmark` stage tracks them.
+
+Usage: python benchmarks/bench_chat_pipeline.py [--model PREFIX] [--messages N ...] [--output PATH]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import DEFAULT_MODEL_PREFIX, ROOT_DIR, peak_rss_mb, percentile, synthetic_messages
+
+CHATBOTS = ("MedicalChatbotLSTM", "SimpleMedicalChatbot")
+STAGES = ("extract_symptoms", "analyze_symptoms", "predict_disease", "_generate_response", "chat_response")
+# Symptom-free words appended to each message
+MESSAGE_LENGTHS = {"short": 0, "medium": 12, "long": 48}
+DATABASE_FILE = os.path.join(ROOT_DIR, "data", "disease_database.json")
+
+
+def synthetic_database(symptom_names, size, seed):
+    """Seeded database whose diseases mix real symptom names with placeholder ones"""
+    rng = random.Random(seed)
+    vocabulary = list(symptom_names) + [f"symptom {i}" for i in range(200)]
+    return {
+        f"Disease {i}": {
+            'symptoms': rng.sample(vocabulary, rng.randint(5, 12)),
+            'severity': rng.choice(['low', 'medium', 'high']),
+            'description': '',
+            'recommendations': ''
+        }
+        for i in range(size)
+    }
+
+
+def summarize(latencies):
+    total = sum(latencies)
+    return {
+        "throughput_per_s": round(len(latencies) / total, 1) if total else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 4),
+    }
+
+
+def time_calls(func, argument_lists):
+    latencies = []
+    for arguments in argument_lists:
+        start = time.perf_counter()
+        func(*arguments)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def bench_stages(chatbot, predict, messages):
+    """Time each stage in isolation on inputs precomputed by the previous stages"""
+    for message in messages[:10]:
+        chatbot.chat_response(message)
+
+    symptoms = [chatbot.extract_symptoms(message) for message in messages]
+    analyses = [chatbot.analyze_symptoms(found, top_k=3) for found in symptoms]
+    predictions = [predict(message, found) for message, found in zip(messages, symptoms)]
+    return {
+        "extract_symptoms": time_calls(chatbot.extract_symptoms, [(m,) for m in messages]),
+        "analyze_symptoms": time_calls(lambda found: chatbot.analyze_symptoms(found, top_k=3),
+                                       [(found,) for found in symptoms]),
+        "predict_disease": time_calls(predict, list(zip(messages, symptoms))),
+        "_generate_response": time_calls(chatbot._generate_response,
+                                         list(zip(messages, symptoms, predictions, analyses))),
+        "chat_response": time_calls(chatbot.chat_response, [(m,) for m in messages]),
+    }
+
+
+def databases(seed, synthetic_size):
+    from medical_chatbot_lstm import MedicalChatbotLSTM
+
+    reference = MedicalChatbotLSTM()
+    found = {"builtin": reference.disease_database}
+    if os.path.exists(DATABASE_FILE):
+        with open(DATABASE_FILE) as f:
+            found["database_json"] = json.load(f)
+    found[f"synthetic_{synthetic_size}"] = synthetic_database(reference.symptom_synonyms, synthetic_size, seed)
+    return found
+
+
+def write_database(database):
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(database, f)
+    return f.name
+
+
+def run_child(args):
+    """Benchmark one chatbot in this process and print its results as JSON"""
+    chatbot = None
+    results = {}
+    for database_name, database in databases(args.seed, args.synthetic_diseases).items():
+        db_path = write_database(database)
+        try:
+            if args.child == "SimpleMedicalChatbot":
+                sys.path.insert(0, os.path.join(ROOT_DIR, "data"))
+                from demo_lstm_chatbot import SimpleMedicalChatbot
+
+                chatbot = SimpleMedicalChatbot(db_path)
+                predict = chatbot.simulate_lstm_prediction
+            else:
+                from medical_chatbot_lstm import MedicalChatbotLSTM
+
+                if chatbot is None:
+                    # Load the model once and swap only the database between runs
+                    chatbot = MedicalChatbotLSTM()
+                    chatbot.load_model(args.model, backend=args.backend)
+                chatbot.load_disease_database(db_path)
+                predict = lambda message, symptoms: chatbot.predict_disease(message)  # noqa: E731
+        finally:
+            os.unlink(db_path)
+
+        for size in args.messages:
+            for length, filler_words in MESSAGE_LENGTHS.items():
+                messages = synthetic_messages(chatbot, size, seed=args.seed, filler_words=filler_words)
+                corpus = f"{length}_{size}"
+                results.setdefault(database_name, {})[corpus] = bench_stages(chatbot, predict, messages)
+    print(json.dumps({"peak_rss_mb": round(peak_rss_mb(), 1), "databases": results}))
+
+
+def measure(name, args):
+    command = [sys.executable, os.path.abspath(__file__), "--child", name, "--model", args.model,
+               "--backend", args.backend, "--seed", str(args.seed),
+               "--synthetic-diseases", str(args.synthetic_diseases), "--messages", *map(str, args.messages)]
+    output = subprocess.run(command, cwd=os.path.join(ROOT_DIR, "benchmarks"),
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PREFIX, help="saved model prefix")
+    parser.add_argument("--backend", default="keras", help="inference backend for MedicalChatbotLSTM")
+    parser.add_argument("--messages", type=int, nargs="+", default=[200], help="corpus sizes")
+    parser.add_argument("--synthetic-diseases", type=int, default=1000, help="size of the synthetic database")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join(ROOT_DIR, "performance.json"))
+    parser.add_argument("--child", choices=CHATBOTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    from medical_chatbot_lstm import MedicalChatbotLSTM
+
+    chatbots = list(CHATBOTS)
+    if not MedicalChatbotLSTM.saved_model_exists(args.model, args.backend):
+        print(f"No saved {args.backend} model at {args.model}_*; benchmarking SimpleMedicalChatbot only. "
+              "Run `dvc pull` or train one with medical_chatbot_lstm.py first.")
+        chatbots.remove("MedicalChatbotLSTM")
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "seed": args.seed,
+            "messages": args.messages,
+            "synthetic_diseases": args.synthetic_diseases,
+            "backend": args.backend,
+        },
+    }
+    for name in chatbots:
+        report[name] = measure(name, args)
+        print(f"\n{name} (peak RSS {report[name]['peak_rss_mb']:.0f} MB)")
+        print(f"  {'database':<16}{'corpus':<12}{'stage':<20}{'ops/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for database_name, corpora in report[name]["databases"].items():
+            for corpus, stages in corpora.items():
+                for stage in STAGES:
+                    s = stages[stage]
+                    print(f"  {database_name:<16}{corpus:<12}{stage:<20}{s['throughput_per_s']:>10.0f}"
+                          f"{s['p50_ms']:>9.3f}{s['p95_ms']:>9.3f}{s['p99_ms']:>9.3f}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Measure what the corpus cache (train_model(cache_dir=...), --corpus-cache)
+saves before training starts: time to a ready corpus and to the first
+training step, with an empty cache (cold) and with the cache filled by the
+previous run (warm).
+
+Each run is a fresh process, as a new training run would be, and
+TensorFlow is imported before the clock starts. The script also checks
+that the warm run trains on exactly the arrays and vocabulary of the cold
+run.
+
+Usage: python benchmarks/bench_corpus_cache.py [--samples 2000 10000] [--seed 0]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import ROOT_DIR
+
+CHILD = r"""
+import hashlib, json, sys, time
+import numpy as np
+import common  # puts the repository root on sys.path
+from medical_chatbot_lstm import MedicalChatbotLSTM
+from sklearn.model_selection import train_test_split
+import tensorflow  # not part of the measured time
+
+num_samples, seed, cache_dir = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+chatbot = MedicalChatbotLSTM()
+start = time.perf_counter()
+X, y = chatbot.prepare_training_data(num_samples, seed=seed, cache_dir=cache_dir)
+corpus_seconds = time.perf_counter() - start
+X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+model = chatbot.build_lstm_model(len(chatbot.label_encoder.classes_))
+model.train_on_batch(X_train[:32], y_train[:32])
+first_step_seconds = time.perf_counter() - start
+
+digest = hashlib.sha256()
+for part in (np.ascontiguousarray(X), np.ascontiguousarray(y), chatbot.tokenizer.to_json().encode(),
+             json.dumps(list(chatbot.label_encoder.classes_)).encode()):
+    digest.update(part)
+print(json.dumps({"samples": len(y), "corpus_seconds": corpus_seconds,
+                  "first_step_seconds": first_step_seconds, "digest": digest.hexdigest()}))
+"""
+
+
+def run(samples, seed, cache_dir):
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, str(samples), str(seed), cache_dir],
+        cwd=os.path.join(ROOT_DIR, "benchmarks"), capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, nargs="+", default=[2000, 10000],
+                        help="num_samples values passed to the generator")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'num_samples':>11}  {'cache':<6}{'texts':>9}{'corpus s':>10}{'first step s':>14}  identical")
+    for samples in args.samples:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold = run(samples, args.seed, cache_dir)
+            warm = run(samples, args.seed, cache_dir)
+        for label, result in (("cold", cold), ("warm", warm)):
+            identical = "" if result is cold else str(result["digest"] == cold["digest"])
+            print(f"{samples:>11}  {label:<6}{result['samples']:>9}{result['corpus_seconds']:>10.2f}"
+                  f"{result['first_step_seconds']:>14.2f}  {identical}")
+
+
+if __name__ == "__main__":
+    main()
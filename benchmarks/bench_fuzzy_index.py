@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Typo-tolerant symptom extraction with FuzzyIndex.
+
+Part one uses the chatbot's own synonyms. It puts one random edit into
+every synonym word of 5+ letters in synthetic messages, then reports how
+many of the clean messages' symptoms exact matching and fuzzy matching
+recover. It also counts clean messages whose symptoms change once fuzzy
+matching is on, which would be false positives.
+
+Part two reports build time and per-message and per-misspelled-token cost
+as the synonym table grows. It reuses the synthetic tables from
+bench_symptom_matcher.py. "warm" repeats messages through the
+correction cache. "cold" clears the cache before every message, so every
+unknown word is looked up in the index.
+
+Usage: python benchmarks/bench_fuzzy_index.py [--messages N] [--max-distance 2]
+"""
+
+import argparse
+import random
+import string
+import time
+
+from bench_symptom_matcher import MESSAGES, TABLE_SIZES, per_message_us, synthetic_table
+from common import synthetic_messages
+from fuzzy_index import WORD_PATTERN, FuzzyIndex
+from medical_chatbot_lstm import MedicalChatbotLSTM
+from symptom_matcher import SymptomMatcher
+
+TYPO_MESSAGES = [
+    "I have had a feaver and a dry coughh since yesterday",
+    "Feeling tierd with a terible headach and shiverring at night",
+    "my haedache is getting worse and I am burnnig up",
+    "no symptoms really, just checking in about my appointment",
+]
+
+
+def misspell(word, rng):
+    """Apply one random deletion, substitution, insertion or transposition"""
+    i = rng.randrange(len(word) - 1)
+    edit = rng.choice(("delete", "substitute", "insert", "transpose"))
+    if edit == "delete":
+        return word[:i] + word[i + 1:]
+    if edit == "substitute":
+        return word[:i] + rng.choice(string.ascii_lowercase.replace(word[i], "")) + word[i + 1:]
+    if edit == "insert":
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def typo_recall(chatbot, count, max_distance, seed):
+    rng = random.Random(seed)
+    exact = SymptomMatcher(chatbot.symptom_synonyms)
+    fuzzy = FuzzyIndex(chatbot.symptom_synonyms, max_distance=max_distance)
+    found_exact = found_fuzzy = expected_total = changed_clean = 0
+    for message in synthetic_messages(chatbot, count, seed=seed):
+        message = message.lower()
+        expected = set(exact.extract(message))
+        if set(exact.extract(fuzzy.correct(message))) != expected:
+            changed_clean += 1
+        typo = WORD_PATTERN.sub(
+            lambda m: misspell(m.group(), rng) if len(m.group()) >= 5 and m.group() in fuzzy.vocabulary
+            else m.group(), message)
+        expected_total += len(expected)
+        found_exact += len(expected & set(exact.extract(typo)))
+        found_fuzzy += len(expected & set(exact.extract(fuzzy.correct(typo))))
+    return found_exact / expected_total, found_fuzzy / expected_total, changed_clean
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--max-distance", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    chatbot = MedicalChatbotLSTM()
+    exact_recall, fuzzy_recall, changed = typo_recall(chatbot, args.messages, args.max_distance, args.seed)
+    print(f"symptom recall on misspelled messages: exact {exact_recall:.1%}, fuzzy {fuzzy_recall:.1%}")
+    print(f"clean messages whose symptoms change with fuzzy matching: {changed}/{args.messages}\n")
+
+    rng = random.Random(args.seed)
+    messages = [rng.choice(MESSAGES) for _ in range(args.messages)]
+    typo_messages = [rng.choice(TYPO_MESSAGES) for _ in range(args.messages)]
+    print(f"{'phrases':>8}{'words':>8}{'build ms':>10}{'exact us/msg':>14}{'warm us/msg':>13}"
+          f"{'cold us/msg':>13}{'cold typos us/msg':>19}{'us/typo':>9}")
+    for size in TABLE_SIZES:
+        table = synthetic_table(size, rng)
+        matcher = SymptomMatcher(table)
+        start = time.perf_counter()
+        fuzzy = FuzzyIndex(table, max_distance=args.max_distance)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        def cold(text):
+            fuzzy._corrections.clear()
+            return matcher.extract(fuzzy.correct(text))
+
+        exact_us = per_message_us(matcher.extract, messages)
+        warm_us = per_message_us(lambda text: matcher.extract(fuzzy.correct(text)), typo_messages)
+        cold_us = per_message_us(cold, messages)
+        cold_typo_us = per_message_us(cold, typo_messages)
+        tokens = ["feaver", "coughh", "tierd", "terible", "headach", "shiverring", "haedache", "burnnig"]
+        lookup_us = per_message_us(fuzzy.lookup, tokens * (args.messages // len(tokens)))
+        print(f"{matcher.phrase_count:>8}{len(fuzzy):>8}{build_ms:>10.1f}{exact_us:>14.1f}{warm_us:>13.1f}"
+              f"{cold_us:>13.1f}{cold_typo_us:>19.1f}{lookup_us:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
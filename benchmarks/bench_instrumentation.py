@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Measure what the instrumentation layer costs per chat_response: with it
+disabled (the default), enabled, and enabled with a trace sink. Runs on
+the uncached LSTM path and on a warm response cache, where a call is
+short enough for any per-call overhead to show.
+
+The disabled cost is one `is not None` guard per stage, which is also
+timed on its own.
+
+Usage: python benchmarks/bench_instrumentation.py [--model PREFIX] [--backend numpy] [--messages N]
+"""
+
+import argparse
+import time
+import timeit
+
+from common import DEFAULT_MODEL_PREFIX, synthetic_messages
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+# Guards evaluated by one uncached chat_response with instrumentation disabled
+GUARDS_PER_CALL = 12
+
+
+def per_call_us(chatbot, messages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for message in messages:
+            chatbot.chat_response(message)
+        best = min(best, time.perf_counter() - start)
+    return best / len(messages) * 1e6
+
+
+def compare(chatbot, messages, repeat):
+    """Per-call µs for each setting, interleaved so drift hits all of them"""
+    settings = {
+        "disabled": lambda: chatbot.disable_instrumentation(),
+        "enabled": lambda: chatbot.enable_instrumentation(),
+        "enabled + trace sink": lambda: chatbot.enable_instrumentation(trace_sink=lambda trace: None),
+    }
+    best = dict.fromkeys(settings, float("inf"))
+    for _ in range(repeat):
+        for name, apply in settings.items():
+            apply()
+            best[name] = min(best[name], per_call_us(chatbot, messages, 1))
+    chatbot.disable_instrumentation()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PREFIX, help="saved model prefix")
+    parser.add_argument("--backend", default="keras", choices=sorted(MedicalChatbotLSTM.BACKEND_FILES))
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    chatbot = MedicalChatbotLSTM()
+    if not chatbot.saved_model_exists(args.model, args.backend):
+        parser.error(f"No saved {args.backend} model at {args.model}_*. Train one with medical_chatbot_lstm.py first.")
+    chatbot.load_model(args.model, backend=args.backend)
+    messages = synthetic_messages(chatbot, args.messages)
+
+    runs = [("LSTM, no cache", compare(chatbot, messages, args.repeat))]
+    chatbot.enable_response_cache()
+    per_call_us(chatbot, messages, 1)
+    runs.append(("warm response cache", compare(chatbot, messages, args.repeat)))
+
+    print(f"{'path':<22}{'setting':<22}{'us/call':>10}{'overhead':>10}")
+    for path, results in runs:
+        baseline = results["disabled"]
+        for name, us in results.items():
+            overhead = "" if name == "disabled" else f"{(us - baseline) / baseline:>+9.1%}"
+            print(f"{path:<22}{name:<22}{us:>10.2f}{overhead:>10}")
+
+    guard_ns = min(timeit.repeat("m is not None", setup="m = None", number=1_000_000, repeat=5)) * 1000
+    print(f"\ndisabled guard: {guard_ns:.1f} ns each, ~{guard_ns * GUARDS_PER_CALL / 1000:.2f} us "
+          f"per uncached chat_response ({GUARDS_PER_CALL} guards)")
+
+
+if __name__ == "__main__":
+    main()
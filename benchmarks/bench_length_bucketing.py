@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Measure length-bucketed padding against fixed max_sequence_length padding:
+training epoch time on a synthetic corpus and inference throughput, and
+check that masking keeps predictions identical.
+
+Usage: python benchmarks/bench_length_bucketing.py [--samples N] [--messages N]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from common import synthetic_messages
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+
+def epoch_seconds(chatbot, X, y, batch_size, bucket_by_length, epochs=2):
+    """Fit a fresh model and return the time of the last epoch (after tracing)"""
+    import tensorflow as tf
+
+    class EpochTimer(tf.keras.callbacks.Callback):
+        def on_epoch_begin(self, epoch, logs=None):
+            self.start = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            self.last = time.perf_counter() - self.start
+
+    model = chatbot.build_lstm_model(len(chatbot.label_encoder.classes_))
+    timer = EpochTimer()
+    if bucket_by_length:
+        model.fit(chatbot._bucketed_dataset(X, y, batch_size, shuffle=True),
+                  epochs=epochs, callbacks=[timer], verbose=0)
+    else:
+        model.fit(X, y, batch_size=batch_size, epochs=epochs, callbacks=[timer], verbose=0)
+    return model, timer.last
+
+
+def throughput(chatbot, messages, batch_size=64):
+    chatbot.predict_diseases(messages[:batch_size])
+    start = time.perf_counter()
+    probabilities = []
+    for i in range(0, len(messages), batch_size):
+        probabilities.extend(p['probabilities'] for p in chatbot.predict_diseases(messages[i:i + batch_size]))
+    return len(messages) / (time.perf_counter() - start), np.stack(probabilities)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=200, help="num_samples for generate_training_data")
+    parser.add_argument("--messages", type=int, default=2048)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    from sklearn.preprocessing import LabelEncoder
+
+    np.random.seed(0)
+    chatbot = MedicalChatbotLSTM()
+    texts, labels = chatbot.generate_training_data(args.samples)
+    X = chatbot.preprocess_text(texts)
+    chatbot.label_encoder = LabelEncoder()
+    y = chatbot.label_encoder.fit_transform(labels)
+    lengths = np.count_nonzero(X, axis=1)
+    print(f"corpus: {len(X)} samples, mean length {lengths.mean():.1f} of {chatbot.max_sequence_length}")
+
+    _, fixed_epoch = epoch_seconds(chatbot, X, y, args.batch_size, bucket_by_length=False)
+    chatbot.model, bucketed_epoch = epoch_seconds(chatbot, X, y, args.batch_size, bucket_by_length=True)
+    print(f"training epoch: fixed {fixed_epoch:.2f} s, bucketed {bucketed_epoch:.2f} s "
+          f"({fixed_epoch / bucketed_epoch:.1f}x)")
+
+    messages = synthetic_messages(chatbot, args.messages)
+    chatbot.bucket_by_length = False
+    fixed_rate, fixed_probs = throughput(chatbot, messages)
+    chatbot.bucket_by_length = True
+    bucketed_rate, bucketed_probs = throughput(chatbot, messages)
+    print(f"inference: fixed {fixed_rate:.0f} msg/s, bucketed {bucketed_rate:.0f} msg/s "
+          f"({bucketed_rate / fixed_rate:.1f}x)")
+    print(f"max |fixed - bucketed| probability difference: {np.abs(fixed_probs - bucketed_probs).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
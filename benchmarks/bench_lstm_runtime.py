@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Compare the Keras model with the TensorFlow-free NumPy runtime:
+output parity, import time, resident memory and single/batch latency.
+
+Exits non-zero if the NumPy probabilities differ from Keras by more than
+--tolerance or pick a different class for any message.
+
+Usage: python benchmarks/bench_lstm_runtime.py [--model PREFIX] [--messages N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from common import DEFAULT_MODEL_PREFIX, ROOT_DIR, load_chatbot, synthetic_messages
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+IMPORT_CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+from common import peak_rss_mb
+from medical_chatbot_lstm import MedicalChatbotLSTM
+chatbot = MedicalChatbotLSTM()
+chatbot.load_model(sys.argv[1], backend=sys.argv[2])
+chatbot.predict_disease("I have fever and cough")
+print(json.dumps({
+    "load_s": time.perf_counter() - start,
+    "rss_mb": peak_rss_mb(),
+    "tensorflow_imported": "tensorflow" in sys.modules,
+}))
+"""
+
+
+def measure_process(model_prefix, backend):
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_CHILD, model_prefix, backend],
+        cwd=os.path.join(ROOT_DIR, "benchmarks"), capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def latency_ms(chatbot, messages, batch_size, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(0, len(messages), batch_size):
+            chatbot.predict_diseases(messages[i:i + batch_size])
+        best = min(best, time.perf_counter() - start)
+    return best / (len(messages) / batch_size) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PREFIX, help="saved model prefix")
+    parser.add_argument("--messages", type=int, default=256)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    keras_bot = load_chatbot(args.model)
+    if not os.path.exists(f"{args.model}_weights.npz"):
+        keras_bot.export_model(args.model)
+    numpy_bot = MedicalChatbotLSTM()
+    numpy_bot.load_model(args.model, backend="numpy")
+
+    # Parity
+    messages = synthetic_messages(keras_bot, args.messages)
+    keras_probs = np.stack([p['probabilities'] for p in keras_bot.predict_diseases(messages)])
+    numpy_probs = np.stack([p['probabilities'] for p in numpy_bot.predict_diseases(messages)])
+    max_diff = float(np.abs(keras_probs - numpy_probs).max())
+    same_class = bool((keras_probs.argmax(axis=1) == numpy_probs.argmax(axis=1)).all())
+    print(f"parity: max |keras - numpy| = {max_diff:.2e}, same top-1 for all: {same_class}")
+
+    # Process cost
+    print(f"\n{'backend':<8}{'load s':>8}{'peak RSS MB':>13}{'1 msg ms':>10}{'64 msg ms':>11}  TF imported")
+    for backend, chatbot in (("keras", keras_bot), ("numpy", numpy_bot)):
+        process = measure_process(args.model, backend)
+        single = latency_ms(chatbot, messages[:64], 1)
+        batch = latency_ms(chatbot, messages[:64 * 4], 64)
+        print(f"{backend:<8}{process['load_s']:>8.2f}{process['rss_mb']:>13.0f}{single:>10.2f}{batch:>11.2f}"
+              f"  {process['tensorflow_imported']}")
+
+    if max_diff > args.tolerance or not same_class:
+        sys.exit(f"FAIL: NumPy runtime deviates from Keras beyond tolerance {args.tolerance}")
+
+
+if __name__ == "__main__":
+    main()
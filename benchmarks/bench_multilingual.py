@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Multilingual symptom extraction with per-language matchers compiled on
+first use.
+
+Part one builds messages in every locale from its own synonym table. The
+same symptom pairs also go into English messages from the chatbot's
+synonyms. It reports the recall of the intended symptoms, and how many
+English messages are mistaken for another language.
+
+Part two reports what languages cost when nobody uses them: the time and
+traced memory of enable_multilingual() on a fresh chatbot, against the
+memory once every matcher is compiled. It then reports each language's
+one-off compile cost (its first message) and the steady per-message cost
+of extract_symptoms with multilingual extraction off and on.
+
+Usage: python benchmarks/bench_multilingual.py [--messages N]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+import tracemalloc
+
+import common  # noqa: F401  (puts the repository root on sys.path)
+from bench_symptom_matcher import per_message_us
+from medical_chatbot_lstm import MedicalChatbotLSTM
+from multilingual import LOCALES_DIR, MultilingualExtractor
+
+TEMPLATES = {
+    'en': ["I have {} and {}", "Experiencing {} with {} since yesterday"],
+    'te': ["నాకు {} మరియు {} ఉంది", "నిన్నటి నుండి {}, {}"],
+    'hi': ["मुझे {} और {} है", "कल से {} और {}"],
+    'es': ["tengo {} y {}", "desde ayer {} con {}"],
+    'fr': ["j'ai {} et {}", "depuis hier {} avec {}"],
+}
+
+
+def locale_synonyms(language):
+    with open(os.path.join(LOCALES_DIR, f'{language}.json'), encoding='utf-8') as f:
+        return json.load(f)['symptoms']
+
+
+def build_messages(synonyms, template_list, count, seed):
+    """Return [(message, {symptom, symptom})] with two distinct symptoms each"""
+    rng = random.Random(seed)
+    symptoms = sorted(synonyms)
+    messages = []
+    for _ in range(count):
+        pair = rng.sample(symptoms, 2)
+        text = rng.choice(template_list).format(*(rng.choice(synonyms[symptom]) for symptom in pair))
+        messages.append((text, set(pair)))
+    return messages
+
+
+def recall(chatbot, messages):
+    found = sum(len(expected & set(chatbot.extract_symptoms(text))) for text, expected in messages)
+    return found / sum(len(expected) for _, expected in messages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000, help="messages per language")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    languages = MultilingualExtractor().languages
+    chatbot = MedicalChatbotLSTM()
+    messages = {'en': build_messages(chatbot.symptom_synonyms, TEMPLATES['en'], args.messages, args.seed)}
+    for language in languages:
+        messages[language] = build_messages(locale_synonyms(language), TEMPLATES[language], args.messages, args.seed)
+
+    chatbot.enable_multilingual()
+    detected = sum(bool(chatbot.multilingual.detect_languages(text)) for text, _ in messages['en'])
+    print(f"{'language':<10}{'recall':>8}")
+    for language, pairs in messages.items():
+        print(f"{language:<10}{recall(chatbot, pairs):>8.1%}")
+    print(f"English messages detected as another language: {detected}/{args.messages}\n")
+
+    tracemalloc.start()
+    fresh = MedicalChatbotLSTM()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    fresh.enable_multilingual()
+    enable_ms = (time.perf_counter() - start) * 1000
+    idle_kb = (tracemalloc.get_traced_memory()[0] - before) / 1024
+
+    print(f"{'language':<10}{'first msg ms':>14}{'memory KB':>11}")
+    for language in languages:
+        used = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        fresh.extract_symptoms(messages[language][0][0])
+        first_ms = (time.perf_counter() - start) * 1000
+        print(f"{language:<10}{first_ms:>14.2f}{(tracemalloc.get_traced_memory()[0] - used) / 1024:>11.0f}")
+    loaded_kb = (tracemalloc.get_traced_memory()[0] - before) / 1024
+    tracemalloc.stop()
+    print(f"enable_multilingual(): {enable_ms:.2f} ms, {idle_kb:.1f} KB until a language is seen, "
+          f"{loaded_kb:.0f} KB with all {len(languages)} loaded\n")
+
+    print(f"{'language':<10}{'off us/msg':>12}{'on us/msg':>11}")
+    english_only = MedicalChatbotLSTM()
+    for language, pairs in messages.items():
+        texts = [text for text, _ in pairs]
+        print(f"{language:<10}{per_message_us(english_only.extract_symptoms, texts):>12.1f}"
+              f"{per_message_us(chatbot.extract_symptoms, texts):>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
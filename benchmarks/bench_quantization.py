@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Compare the int8 model (backend 'int8', written by quantize_model.py) with
+the float model it was quantized from:
+- top-1 agreement and accuracy on the validation split of train_model: the
+  synthetic corpus of ``--samples`` and ``--seed``, split 80/20 with the
+  same stratified split. Pass the seed the model was trained with to
+  rebuild its exact validation set.
+- file size and weight bytes in memory
+- predict_disease latency for one message, and predict_diseases
+  throughput in batches
+- RSS of a freshly forked worker after loading the model and answering a
+  few messages, and the private memory loading added
+
+Usage: python benchmarks/bench_quantization.py [--model PREFIX] [--float-backend numpy] [--seed 0]
+"""
+
+import argparse
+import multiprocessing
+import os
+
+import numpy as np
+
+from bench_shared_memory import memory_kb
+from bench_student import latency_ms, load, throughput, top1
+from common import DEFAULT_MODEL_PREFIX, percentile, synthetic_messages
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+
+def validation_split(chatbot, num_samples, seed):
+    """Texts and labels of the validation split train_model holds out"""
+    from sklearn.model_selection import train_test_split
+
+    texts, labels = chatbot.generate_training_data(num_samples, seed=seed)
+    # Stratifying on the label strings orders classes as the LabelEncoder ids do, so the split is the same
+    _, texts, _, labels = train_test_split(texts, labels, test_size=0.2, random_state=42, stratify=labels)
+    return texts, labels
+
+
+def _memory_worker(model_prefix, backend, messages, results):
+    before = memory_kb()
+    chatbot = load(model_prefix, backend)
+    for message in messages:
+        chatbot.predict_disease(message)
+    after = memory_kb()
+    results.put((after['rss'] / 1024, (after['uss'] - before['uss']) / 1024))
+
+
+def worker_memory_mb(model_prefix, backend, messages):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    process = context.Process(target=_memory_worker, args=(model_prefix, backend, messages, results))
+    process.start()
+    rss, added = results.get()
+    process.join()
+    return rss, added
+
+
+def weight_bytes(chatbot):
+    return sum(array.nbytes for name, array in chatbot.model.arrays.items()
+               if name.startswith(('embedding', 'lstm_', 'dense_')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PREFIX, help="saved model prefix")
+    parser.add_argument("--float-backend", default="numpy", choices=["numpy", "mmap", "bundle"])
+    parser.add_argument("--samples", type=int, default=10000, help="num_samples train_model was called with")
+    parser.add_argument("--seed", type=int, default=None, help="seed train_model was called with")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    for backend in (args.float_backend, "int8"):
+        if not MedicalChatbotLSTM.saved_model_exists(args.model, backend):
+            parser.error(f"No saved {backend} model at {args.model}_*. Run quantize_model.py first.")
+    backends = (args.float_backend, "int8")
+    float_bot = load(args.model, args.float_backend)
+    messages = synthetic_messages(float_bot, args.messages, seed=args.seed or 0)
+    # Workers fork before the validation corpus exists, so their RSS does not include it
+    memory = {backend: worker_memory_mb(args.model, backend, messages[:50]) for backend in backends}
+    int8_bot = load(args.model, "int8")
+
+    texts, labels = validation_split(float_bot, args.samples, args.seed)
+    float_top1, int8_top1 = np.array(top1(float_bot, texts)), np.array(top1(int8_bot, texts))
+    labels = np.array(labels)
+    print(f"validation split ({len(texts)} samples): agreement {np.mean(float_top1 == int8_top1):.2%}, "
+          f"accuracy float {np.mean(float_top1 == labels):.2%} / int8 {np.mean(int8_top1 == labels):.2%}")
+    message_agreement = np.mean(np.array(top1(float_bot, messages)) == np.array(top1(int8_bot, messages)))
+    print(f"chat messages ({len(messages)}): agreement {message_agreement:.2%}\n")
+
+    files = {args.float_backend: MedicalChatbotLSTM.BACKEND_FILES[args.float_backend][0], "int8": "_int8.npz"}
+    print(f"{'backend':<10}{'file KB':>9}{'weights KB':>12}{'p50 ms':>9}{'p99 ms':>9}{'batch msg/s':>13}"
+          f"{'worker RSS MB':>15}{'load MB':>9}")
+    for chatbot, backend in zip((float_bot, int8_bot), backends):
+        path = f"{args.model}{files[backend]}"
+        file_kb = (os.path.getsize(path) if os.path.isfile(path) else
+                   sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))) / 1024
+        latency_ms(chatbot, messages[:20])
+        timings = latency_ms(chatbot, messages)
+        rate = throughput(chatbot, texts, args.batch_size)
+        rss, added = memory[backend]
+        print(f"{backend:<10}{file_kb:>9.0f}{weight_bytes(chatbot) / 1024:>12.0f}{percentile(timings, 50):>9.3f}"
+              f"{percentile(timings, 99):>9.3f}{rate:>13.0f}{rss:>15.1f}{added:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Compare stateless multi-turn chat with the session store. The stateless
+path re-sends the whole conversation to chat_response on every turn. The
+session path sends chat_turn only the new message. Both paths must
+report the same accumulated symptoms and symptom analysis.
+
+It also measures memory per idle session when --sessions sessions are
+stored.
+
+Usage: python benchmarks/bench_sessions.py [--model PREFIX] [--backend numpy] [--turns N] [--sessions N]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from common import DEFAULT_MODEL_PREFIX, synthetic_messages
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+
+def conversations(chatbot, count, turns):
+    messages = synthetic_messages(chatbot, count * turns)
+    return [messages[i * turns:(i + 1) * turns] for i in range(count)]
+
+
+def stateless(chatbot, convos):
+    """Per-turn seconds and final symptom analyses when every turn re-sends the conversation"""
+    turn_seconds = [0.0] * len(convos[0])
+    finals = []
+    for convo in convos:
+        for turn in range(len(convo)):
+            start = time.perf_counter()
+            response = chatbot.chat_response(" ".join(convo[:turn + 1]))
+            turn_seconds[turn] += time.perf_counter() - start
+        finals.append(response)
+    return turn_seconds, finals
+
+
+def with_sessions(chatbot, convos):
+    chatbot.enable_sessions()
+    turn_seconds = [0.0] * len(convos[0])
+    finals = []
+    for session_id, convo in enumerate(convos):
+        for turn, message in enumerate(convo):
+            start = time.perf_counter()
+            response = chatbot.chat_turn(session_id, message)
+            turn_seconds[turn] += time.perf_counter() - start
+        finals.append(response)
+    return turn_seconds, finals
+
+
+def symptom_stage_seconds(chatbot, convos):
+    """Per-turn seconds of symptom extraction plus analysis alone, (stateless, session)"""
+    turns = len(convos[0])
+    full, incremental = [0.0] * turns, [0.0] * turns
+    store = chatbot.enable_sessions()
+    for session_id, convo in enumerate(convos):
+        for turn, message in enumerate(convo):
+            start = time.perf_counter()
+            chatbot.analyze_symptoms(chatbot.extract_symptoms(" ".join(convo[:turn + 1])), top_k=3)
+            full[turn] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            session, _ = store.update(session_id, chatbot.extract_symptoms(message), message)
+            store.predictions(session, top_k=3)
+            incremental[turn] += time.perf_counter() - start
+    return full, incremental
+
+
+def session_memory(chatbot, count, symptoms_per_session=4):
+    """Traced bytes per stored session"""
+    store = chatbot.enable_sessions(max_sessions=count)
+    symptoms = list(chatbot.symptom_synonyms)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for session_id in range(count):
+        picked = [symptoms[(session_id + k * 7) % len(symptoms)] for k in range(symptoms_per_session)]
+        store.update(f"session-{session_id:08d}", picked, "mild for 3 days")
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / count, store.stats()['bytes'] / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PREFIX, help="saved model prefix")
+    parser.add_argument("--backend", default="keras", choices=sorted(MedicalChatbotLSTM.BACKEND_FILES))
+    parser.add_argument("--conversations", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=200000, help="sessions for the memory measurement")
+    args = parser.parse_args()
+
+    chatbot = MedicalChatbotLSTM()
+    if not chatbot.saved_model_exists(args.model, args.backend):
+        parser.error(f"No saved {args.backend} model at {args.model}_*. Train one with medical_chatbot_lstm.py first.")
+    chatbot.load_model(args.model, backend=args.backend)
+    convos = conversations(chatbot, args.conversations, args.turns)
+    chatbot.chat_response(convos[0][0])
+
+    stateless_seconds, stateless_finals = stateless(chatbot, convos)
+    session_seconds, session_finals = with_sessions(chatbot, convos)
+    for expected, actual in zip(stateless_finals, session_finals):
+        assert sorted(expected['extracted_symptoms']) == sorted(actual['extracted_symptoms'])
+        assert ([(p['disease'], p['confidence']) for p in expected['disease_predictions'] if 'description' in p]
+                == [(p['disease'], p['confidence']) for p in actual['disease_predictions'] if 'description' in p])
+
+    symptom_full, symptom_incremental = symptom_stage_seconds(chatbot, convos)
+
+    print(f"{'':>5}{'chat_response / chat_turn (ms)':^36}{'symptom stages only (us)':^36}")
+    print(f"{'turn':>5}" + f"{'stateless':>12}{'session':>12}{'speedup':>12}" * 2)
+    for turn in range(args.turns):
+        row = f"{turn + 1:>5}"
+        for full, incremental, scale in ((stateless_seconds, session_seconds, 1e3),
+                                         (symptom_full, symptom_incremental, 1e6)):
+            full_t = full[turn] / len(convos) * scale
+            incremental_t = incremental[turn] / len(convos) * scale
+            row += f"{full_t:>12.2f}{incremental_t:>12.2f}{full_t / incremental_t:>11.1f}x"
+        print(row)
+
+    traced, estimated = session_memory(chatbot, args.sessions)
+    print(f"\n{args.sessions} sessions: {traced:.0f} bytes/session traced "
+          f"({traced * args.sessions / 2**20:.1f} MiB), {estimated:.0f} bytes/session by the store's estimate")
+
+
+if __name__ == "__main__":
+    main()
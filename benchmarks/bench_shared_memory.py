@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Per-worker memory of N live worker processes serving the same model, for
+each backend:
+- 'numpy': every worker reads its own copy of the .npz weights
+- 'mmap': workers memory-map one directory of .npy weights and the
+  flattened disease table
+- 'keras', if listed: the current TensorFlow path
+
+Workers are forked from a parent that has only imported the chatbot
+module, as score_messages.py does. Each one loads the model, answers a
+few messages and reads /proc/self/smaps_rollup while all of them are
+still alive. RSS counts shared pages in full in every process. PSS
+splits them between the processes that map them. USS (private pages)
+is what each extra worker really adds.
+
+Usage: python benchmarks/bench_shared_memory.py [--model PREFIX] [--workers 1 4 16] [--backends numpy mmap]
+"""
+
+import argparse
+import multiprocessing
+
+from common import DEFAULT_MODEL_PREFIX, synthetic_messages
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+
+def memory_kb():
+    """Rss, Pss and private (USS) kB of this process"""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def worker(model_prefix, backend, messages, results, release):
+    before = memory_kb()
+    chatbot = MedicalChatbotLSTM()
+    chatbot.load_model(model_prefix, backend=backend)
+    for message in messages:
+        chatbot.chat_response(message)
+    after = memory_kb()
+    results.put({key: (before[key], after[key]) for key in after})
+    # Stay alive until every worker has measured, so pages really are shared
+    release.wait()
+
+
+def measure(model_prefix, backend, workers, messages):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    release = context.Event()
+    processes = [context.Process(target=worker, args=(model_prefix, backend, messages, results, release))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    release.set()
+    for process in processes:
+        process.join()
+
+    def mean_mb(key, index):
+        return sum(sample[key][index] for sample in samples) / len(samples) / 1024
+
+    return {
+        "rss": mean_mb("rss", 1),
+        "pss": mean_mb("pss", 1),
+        "uss": mean_mb("uss", 1),
+        "model_uss": mean_mb("uss", 1) - mean_mb("uss", 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PREFIX, help="saved model prefix")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--backends", nargs="+", default=["numpy", "mmap"],
+                        choices=sorted(MedicalChatbotLSTM.BACKEND_FILES))
+    parser.add_argument("--messages", type=int, default=50)
+    args = parser.parse_args()
+
+    for backend in args.backends:
+        if not MedicalChatbotLSTM.saved_model_exists(args.model, backend):
+            parser.error(f"No saved {backend} model at {args.model}_*. "
+                         f"Export one with chatbot.export_model(prefix, backend='{backend}').")
+    messages = synthetic_messages(MedicalChatbotLSTM(), args.messages)
+
+    print(f"{'backend':<8}{'workers':>8}{'RSS MB':>9}{'PSS MB':>9}{'USS MB':>9}{'model USS MB':>14}{'total PSS MB':>14}")
+    for backend in args.backends:
+        for workers in args.workers:
+            result = measure(args.model, backend, workers, messages)
+            print(f"{backend:<8}{workers:>8}{result['rss']:>9.1f}{result['pss']:>9.1f}{result['uss']:>9.1f}"
+                  f"{result['model_uss']:>14.2f}{result['pss'] * workers:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
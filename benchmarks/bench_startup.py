@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Measure cold-start latency of the fast-start serving path: how long after
+process start the first rule-based answer arrives, and when the LSTM
+model becomes ready in the background.
+
+Usage: python benchmarks/bench_startup.py [--model PREFIX] [--target-ms 500] [--runs 3]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from common import DEFAULT_MODEL_PREFIX, ROOT_DIR, percentile
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+CHILD = r"""
+import json, sys, time
+start = float(sys.argv[1])
+from medical_chatbot_lstm import MedicalChatbotLSTM
+chatbot = MedicalChatbotLSTM()
+chatbot.load_model_async(sys.argv[2])
+response = chatbot.chat_response("I have a fever, a dry cough and body aches")
+first_answer = time.time() - start
+print(json.dumps({"first_answer": first_answer, "symptoms": response["extracted_symptoms"]}), flush=True)
+ready = chatbot.wait_until_loaded()
+print(json.dumps({"model_ready": time.time() - start}), flush=True)
+"""
+
+
+def run_once(model_prefix):
+    start = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD, repr(start), model_prefix],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    result = {}
+    for line in proc.stdout.splitlines():
+        if line.startswith("{"):
+            result.update(json.loads(line))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PREFIX, help="saved model prefix")
+    parser.add_argument("--target-ms", type=float, default=500.0, help="budget for the first rule-based answer")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    if not MedicalChatbotLSTM.saved_model_exists(args.model):
+        sys.exit(f"No saved model at {args.model}_*. Run `dvc pull` or train one first.")
+
+    runs = [run_once(args.model) for _ in range(args.runs)]
+    first = [run["first_answer"] * 1000 for run in runs]
+    ready = [run["model_ready"] * 1000 for run in runs]
+
+    print(f"first rule-based answer: p50 {percentile(first, 50):.0f} ms, max {max(first):.0f} ms")
+    print(f"LSTM model ready:        p50 {percentile(ready, 50):.0f} ms")
+
+    status = "PASS" if max(first) <= args.target_ms else "FAIL"
+    print(f"{status}: target {args.target_ms:.0f} ms for the first answer")
+    sys.exit(0 if status == "PASS" else 1)
+
+
+if __name__ == "__main__":
+    main()
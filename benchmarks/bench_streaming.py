@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Time to first useful byte of a running chat_server.py: POST /chat (the
+whole response at once) against POST /chat/stream (server-sent events).
+
+For /chat the first useful byte is the response body. For /chat/stream it is
+the first event: the emergency warning or the extracted symptoms.
+Emergency messages and ordinary symptom messages are timed separately,
+over keep-alive connections at each concurrency level. The script reports
+p50/p99 of the first useful byte and of the complete answer as the client
+sees them. For the stream it also reports the p50 of when the server wrote
+the first event (its ``elapsed_ms``). On a machine with few cores the client
+process competes with inference for the CPU, and that column leaves out its
+scheduling delay.
+
+Usage:
+    python chat_server.py --backend keras &
+    python benchmarks/bench_streaming.py [--url http://127.0.0.1:8000] [--concurrency 1 8]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlparse
+
+from common import percentile
+from load_test import PHRASES, read_response
+
+EMERGENCY_PHRASES = ['chest pain', 'shortness of breath', 'difficulty breathing']
+
+
+async def read_stream(reader, start):
+    """Read a chunked SSE response; return (ms to the first event, ms to the end, server ms of the first event)"""
+    status_line = await reader.readline()
+    if int(status_line.split()[1]) != 200:
+        raise RuntimeError(f"/chat/stream answered {status_line.decode().strip()}")
+    while await reader.readline() not in (b'\r\n', b''):
+        pass
+    first_ms = server_first_ms = None
+    while True:
+        size = int(await reader.readline(), 16)
+        chunk = await reader.readexactly(size + 2)
+        if size == 0:
+            return first_ms, (time.perf_counter() - start) * 1000, server_first_ms
+        if first_ms is None:
+            first_ms = (time.perf_counter() - start) * 1000
+            data = chunk.decode('utf-8').split('data: ', 1)[1]
+            server_first_ms = json.loads(data)['elapsed_ms']
+
+
+async def client(host, port, path, messages, first_ms, total_ms, server_first_ms):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for message in messages:
+            body = json.dumps({'message': message}).encode('utf-8')
+            request = (
+                f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n"
+            ).encode('latin-1') + body
+
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            if path == '/chat':
+                await read_response(reader)
+                first = total = (time.perf_counter() - start) * 1000
+            else:
+                first, total, server_first = await read_stream(reader, start)
+                server_first_ms.append(server_first)
+            first_ms.append(first)
+            total_ms.append(total)
+    finally:
+        writer.close()
+
+
+def build_messages(kind, count, offset):
+    messages = []
+    for i in range(count):
+        phrase = PHRASES[(offset + i) % len(PHRASES)]
+        if kind == 'emergency':
+            messages.append(f"I have {EMERGENCY_PHRASES[(offset + i) % len(EMERGENCY_PHRASES)]} and {phrase}")
+        else:
+            messages.append(f"I have {phrase} and {PHRASES[(offset + 3 * i + 1) % len(PHRASES)]}")
+    return messages
+
+
+async def run_level(host, port, path, kind, concurrency, requests_per_client):
+    first_ms, total_ms, server_first_ms = [], [], []
+    await asyncio.gather(*(
+        client(host, port, path, build_messages(kind, requests_per_client, worker_id),
+               first_ms, total_ms, server_first_ms)
+        for worker_id in range(concurrency)
+    ))
+    return first_ms, total_ms, server_first_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, nargs='+', default=[1, 8])
+    parser.add_argument("--requests", type=int, default=50, help="requests per client connection")
+    args = parser.parse_args()
+
+    url = urlparse(args.url)
+    # Warm up the model and the connection handling
+    asyncio.run(run_level(url.hostname, url.port, '/chat', 'symptoms', 1, 10))
+
+    print(f"{'clients':>8}  {'messages':<10}{'endpoint':<14}{'first p50':>10}{'first p99':>10}"
+          f"{'full p50':>10}{'full p99':>10}{'server first p50':>18}  (ms)")
+    for concurrency in args.concurrency:
+        for kind in ('emergency', 'symptoms'):
+            for path in ('/chat', '/chat/stream'):
+                first_ms, total_ms, server_first_ms = asyncio.run(
+                    run_level(url.hostname, url.port, path, kind, concurrency, args.requests))
+                server_first = f"{percentile(server_first_ms, 50):.2f}" if server_first_ms else "-"
+                print(f"{concurrency:>8}  {kind:<10}{path:<14}{percentile(first_ms, 50):>10.2f}"
+                      f"{percentile(first_ms, 99):>10.2f}{percentile(total_ms, 50):>10.2f}"
+                      f"{percentile(total_ms, 99):>10.2f}{server_first:>18}")
+
+
+if __name__ == "__main__":
+    main()
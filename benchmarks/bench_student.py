@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Compare the distilled student (backend 'student', written by
+distill_student.py) with its LSTM teacher:
+- top-1 agreement and accuracy on the distinct texts of a synthetic corpus
+  generated with a seed the student never saw, and agreement on
+  chat-style messages
+- predict_disease latency for one message, and predict_diseases
+  throughput in batches
+- weight bytes and the memory a freshly forked worker adds by loading
+  the model and answering a few messages
+
+Usage: python benchmarks/bench_student.py [--model PREFIX] [--teacher-backend numpy] [--seed 1]
+"""
+
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+
+from bench_shared_memory import memory_kb
+from common import DEFAULT_MODEL_PREFIX, percentile, synthetic_messages
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+
+def load(model_prefix, backend):
+    chatbot = MedicalChatbotLSTM()
+    chatbot.load_model(model_prefix, backend=backend)
+    return chatbot
+
+
+def corpus(chatbot, num_samples, seed):
+    """Distinct texts of a synthetic corpus with their most frequent disease"""
+    labels = {}
+    for text, label in zip(*chatbot.generate_training_data(num_samples, seed=seed)):
+        labels.setdefault(text, label)
+    return list(labels), list(labels.values())
+
+
+def top1(chatbot, texts):
+    return [prediction['disease'] for prediction in chatbot.predict_diseases(texts)]
+
+
+def latency_ms(chatbot, messages):
+    timings = []
+    for message in messages:
+        start = time.perf_counter()
+        chatbot.predict_disease(message)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def throughput(chatbot, texts, batch_size):
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        chatbot.predict_diseases(texts[offset:offset + batch_size])
+    return len(texts) / (time.perf_counter() - start)
+
+
+def _memory_worker(model_prefix, backend, messages, results):
+    before = memory_kb()
+    chatbot = load(model_prefix, backend)
+    for message in messages:
+        chatbot.predict_disease(message)
+    after = memory_kb()
+    results.put((after['uss'] - before['uss']) / 1024)
+
+
+def worker_memory_mb(model_prefix, backend, messages):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    process = context.Process(target=_memory_worker, args=(model_prefix, backend, messages, results))
+    process.start()
+    used = results.get()
+    process.join()
+    return used
+
+
+def weight_bytes(chatbot):
+    model = chatbot.model
+    if hasattr(model, 'table'):
+        return model.table.nbytes + model.bias.nbytes
+    return sum(array.nbytes for name, array in model.arrays.items()
+               if name.startswith(('embedding', 'lstm_', 'dense_')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PREFIX, help="saved model prefix")
+    parser.add_argument("--teacher-backend", default="numpy", choices=["numpy", "mmap", "bundle"])
+    parser.add_argument("--samples", type=int, default=10000, help="num_samples of the held-out corpus")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the held-out corpus")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    for backend in (args.teacher_backend, "student"):
+        if not MedicalChatbotLSTM.saved_model_exists(args.model, backend):
+            parser.error(f"No saved {backend} model at {args.model}_*. Run distill_student.py first.")
+    teacher = load(args.model, args.teacher_backend)
+    student = load(args.model, "student")
+
+    texts, labels = corpus(teacher, args.samples, args.seed)
+    messages = synthetic_messages(teacher, args.messages, seed=args.seed)
+    teacher_top1, student_top1 = np.array(top1(teacher, texts)), np.array(top1(student, texts))
+    labels = np.array(labels)
+    print(f"held-out corpus ({len(texts)} distinct texts): agreement {np.mean(teacher_top1 == student_top1):.1%}, "
+          f"accuracy teacher {np.mean(teacher_top1 == labels):.1%} / student {np.mean(student_top1 == labels):.1%}")
+    message_agreement = np.mean(np.array(top1(teacher, messages)) == np.array(top1(student, messages)))
+    print(f"chat messages ({len(messages)}): agreement {message_agreement:.1%}\n")
+
+    print(f"{'backend':<10}{'p50 ms':>9}{'p99 ms':>9}{'batch msg/s':>13}{'weights KB':>12}{'worker MB':>11}")
+    for name, chatbot, backend in (("teacher", teacher, args.teacher_backend), ("student", student, "student")):
+        latency_ms(chatbot, messages[:20])
+        timings = latency_ms(chatbot, messages)
+        rate = throughput(chatbot, texts, args.batch_size)
+        memory = worker_memory_mb(args.model, backend, messages[:50])
+        print(f"{name:<10}{percentile(timings, 50):>9.3f}{percentile(timings, 99):>9.3f}{rate:>13.0f}"
+              f"{weight_bytes(chatbot) / 1024:>12.0f}{memory:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Time symptom-based disease scoring as the database grows: the original
+full scan, the inverted SymptomIndex (all results and top-3), and the
+sparse matrix mode that scores a whole batch in one product.
+
+Usage: python benchmarks/bench_symptom_index.py [--queries N]
+"""
+
+import argparse
+import random
+import time
+
+import common  # noqa: F401  (puts the project root on sys.path)
+from symptom_index import SymptomIndex
+
+DATABASE_SIZES = [10, 100, 1000, 10000]
+SYMPTOM_VOCABULARY = 500
+
+
+def synthetic_database(size, rng):
+    symptoms = [f"symptom {i}" for i in range(SYMPTOM_VOCABULARY)]
+    return {
+        f"Disease {i}": {
+            'symptoms': rng.sample(symptoms, rng.randint(5, 12)),
+            'severity': rng.choice(['low', 'medium', 'high']),
+            'description': '',
+            'recommendations': ''
+        }
+        for i in range(size)
+    }
+
+
+def full_scan(database, symptoms):
+    predictions = []
+    for disease_name, disease_info in database.items():
+        disease_symptoms = set(disease_info['symptoms'])
+        overlap = disease_symptoms.intersection(symptoms)
+        if overlap:
+            predictions.append({'disease': disease_name, 'confidence': len(overlap) / len(disease_symptoms)})
+    predictions.sort(key=lambda x: x['confidence'], reverse=True)
+    return predictions
+
+
+def per_query_us(func, queries):
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'diseases':>9}{'scan us':>10}{'index us':>10}{'top3 us':>10}{'matrix us':>11}")
+    for size in DATABASE_SIZES:
+        database = synthetic_database(size, rng)
+        index = SymptomIndex(database)
+        vocabulary = list(index.symptom_ids)
+        queries = [rng.sample(vocabulary, rng.randint(1, 3)) for _ in range(args.queries)]
+
+        scan_us = per_query_us(lambda query: full_scan(database, set(query)), queries)
+        index_us = per_query_us(index.score, queries)
+        top3_us = per_query_us(lambda query: index.score(query, top_k=3), queries)
+
+        index.score_matrix(queries[:1])  # build the incidence matrix outside the timer
+        start = time.perf_counter()
+        index.score_matrix(queries)
+        matrix_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+        print(f"{size:>9}{scan_us:>10.1f}{index_us:>10.1f}{top3_us:>10.1f}{matrix_us:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
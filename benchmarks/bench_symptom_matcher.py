@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Per-message cost of symptom extraction as the synonym table grows,
+comparing the old nested substring loop with the compiled SymptomMatcher.
+
+Usage: python benchmarks/bench_symptom_matcher.py [--messages N]
+"""
+
+import argparse
+import random
+import string
+import time
+
+import common  # noqa: F401  (puts the project root on sys.path)
+from symptom_matcher import SymptomMatcher
+
+TABLE_SIZES = [100, 1000, 10000, 20000]
+BASE_SYNONYMS = {
+    'fever': ['fever', 'high temperature', 'hot', 'burning up', 'temperature'],
+    'cough': ['cough', 'coughing', 'dry cough', 'wet cough', 'hacking cough'],
+    'fatigue': ['fatigue', 'tired', 'exhausted', 'weak', 'lethargic', 'run down'],
+    'headache': ['headache', 'head pain', 'migraine', 'head ache'],
+    'chills': ['chills', 'shivering', 'cold', 'goosebumps'],
+}
+MESSAGES = [
+    "I have had a fever and a dry cough since yesterday",
+    "Feeling tired with a terrible headache and shivering at night",
+    "my head ache is getting worse and I am burning up",
+    "no symptoms really, just checking in about my appointment",
+]
+
+
+def synthetic_table(size, rng):
+    """Pad the real synonyms with random phrases up to ``size`` entries"""
+    table = {symptom: list(synonyms) for symptom, synonyms in BASE_SYNONYMS.items()}
+    count = sum(len(synonyms) for synonyms in table.values())
+    index = 0
+    while count < size:
+        words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+                 for _ in range(rng.randint(1, 3))]
+        table.setdefault(f"synthetic {index // 10}", []).append(' '.join(words))
+        index += 1
+        count += 1
+    return table
+
+
+def naive_extract(table, text):
+    symptoms = []
+    text_lower = text.lower()
+    for symptom, synonyms in table.items():
+        for synonym in synonyms:
+            if synonym in text_lower:
+                symptoms.append(symptom)
+                break
+    return list(set(symptoms))
+
+
+def per_message_us(func, messages):
+    start = time.perf_counter()
+    for message in messages:
+        func(message)
+    return (time.perf_counter() - start) / len(messages) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    messages = [rng.choice(MESSAGES) for _ in range(args.messages)]
+
+    print(f"{'phrases':>8}{'build ms':>10}{'naive us/msg':>14}{'matcher us/msg':>16}")
+    for size in TABLE_SIZES:
+        table = synthetic_table(size, rng)
+        start = time.perf_counter()
+        matcher = SymptomMatcher(table)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        naive_us = per_message_us(lambda text: naive_extract(table, text), messages)
+        matcher_us = per_message_us(matcher.extract, messages)
+        print(f"{matcher.phrase_count:>8}{build_ms:>10.1f}{naive_us:>14.1f}{matcher_us:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
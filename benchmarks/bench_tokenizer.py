@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Compare inference tokenization with the Keras Tokenizer against
+InferenceTokenizer: clean, map words to ids and pad to an int32 matrix.
+
+First checks that both produce bit-identical padded id matrices on a
+corpus of synthetic, mixed-case, punctuated, non-ASCII, out-of-vocabulary
+and over-long messages, then reports tokens/sec for single messages and
+for batches.
+
+Usage: python benchmarks/bench_tokenizer.py [--model PREFIX] [--messages N]
+"""
+
+import argparse
+import pickle
+import random
+import re
+import sys
+import time
+
+import numpy as np
+
+from common import DEFAULT_MODEL_PREFIX, synthetic_messages
+from lstm_runtime import InferenceTokenizer, clean_text, pad_sequences_post
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+EDGE_CASES = [
+    "", "   ", "!!!", "FEVER!!! and COUGH???", "fever\tcough\nheadache", "I have 102°F fever",
+    "Fièvre et toux", "İ have a Headache", "zzz qqq unknownword", "fever " * 80,
+]
+
+
+def keras_encode(tokenizer, texts, maxlen):
+    """The pre-InferenceTokenizer path: uncompiled re.sub, Keras lookup, fresh padded array"""
+    cleaned = [' '.join(re.sub(r'[^a-zA-Z\s]', '', text.lower()).split()) for text in texts]
+    return pad_sequences_post(tokenizer.texts_to_sequences(cleaned), maxlen)
+
+
+def fast_encode(tokenizer, texts, maxlen):
+    return tokenizer.pad(tokenizer.texts_to_sequences([clean_text(text) for text in texts]), maxlen)
+
+
+def tokens_per_second(encode, tokenizer, texts, batch_size, maxlen, token_count, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(0, len(texts), batch_size):
+            encode(tokenizer, texts[i:i + batch_size], maxlen)
+        best = min(best, time.perf_counter() - start)
+    return token_count / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PREFIX, help="saved model prefix (for the tokenizer)")
+    parser.add_argument("--messages", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(f"{args.model}_tokenizer.pkl", "rb") as f:
+        keras_tokenizer = pickle.load(f)
+    inference_tokenizer = InferenceTokenizer.from_tokenizer(keras_tokenizer)
+    chatbot = MedicalChatbotLSTM()
+    maxlen = chatbot.max_sequence_length
+
+    rng = random.Random(args.seed)
+    texts = synthetic_messages(chatbot, args.messages, seed=args.seed, filler_words=6) + EDGE_CASES
+    texts = [text.upper() if rng.random() < 0.1 else text for text in texts]
+
+    expected = keras_encode(keras_tokenizer, texts, maxlen)
+    actual = fast_encode(inference_tokenizer, texts, maxlen)
+    identical = actual.dtype == expected.dtype and np.array_equal(actual, expected)
+    print(f"bit-identical on {len(texts)} messages: {identical}")
+    if not identical:
+        sys.exit("FAIL: InferenceTokenizer output differs from the Keras tokenizer")
+
+    token_count = int(np.count_nonzero(expected))
+    print(f"\n{'batch':>6}{'keras tok/s':>14}{'inference tok/s':>17}{'speedup':>9}")
+    for batch_size in (1, 32, 512):
+        keras_rate = tokens_per_second(keras_encode, keras_tokenizer, texts, batch_size, maxlen, token_count)
+        fast_rate = tokens_per_second(fast_encode, inference_tokenizer, texts, batch_size, maxlen, token_count)
+        print(f"{batch_size:>6}{keras_rate:>14,.0f}{fast_rate:>17,.0f}{fast_rate / keras_rate:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Compare building the synthetic training set as lists (generate_training_data
++ preprocess_text, what train_model does) with the streaming generator
+(fit_tokenizer_on_stream + iter_training_batches), in one or more processes.
+
+Each approach runs in a fresh process so peak RSS is its own. Reports peak
+RSS and samples/sec for producing every padded training batch once.
+
+Usage: python benchmarks/bench_training_data.py [--samples N] [--workers N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from common import ROOT_DIR
+
+CHILD = r"""
+import json, sys, time
+from common import peak_rss_mb
+from medical_chatbot_lstm import MedicalChatbotLSTM
+from sklearn.preprocessing import LabelEncoder
+import tensorflow  # imported up front so both modes pay for it equally
+
+mode, num_samples, processes = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+baseline_mb = peak_rss_mb()
+chatbot = MedicalChatbotLSTM()
+start = time.perf_counter()
+if mode == "lists":
+    texts, labels = chatbot.generate_training_data(num_samples, seed=0)
+    X = chatbot.preprocess_text(texts)
+    y = LabelEncoder().fit_transform(labels)
+    count = len(y)
+else:
+    chatbot.fit_tokenizer_on_stream(num_samples, seed=0, processes=processes)
+    chatbot.label_encoder = LabelEncoder().fit(chatbot._training_classes())
+    count = 0
+    for X, y in chatbot.iter_training_batches(32, num_samples, seed=0, processes=processes):
+        count += len(y)
+elapsed = time.perf_counter() - start
+print(json.dumps({"samples": count, "seconds": elapsed,
+                  "baseline_mb": baseline_mb, "peak_mb": peak_rss_mb()}))
+"""
+
+
+def run(mode, samples, processes):
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, mode, str(samples), str(processes)],
+        cwd=os.path.join(ROOT_DIR, "benchmarks"), capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, nargs="+", default=[2000, 10000],
+                        help="num_samples values passed to the generator")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes for the parallel streaming run")
+    args = parser.parse_args()
+
+    modes = [("lists", 1), ("stream", 1)]
+    if args.workers > 1:
+        modes.append(("stream", args.workers))
+
+    print(f"{'num_samples':>11}  {'mode':<12}{'texts':>9}{'samples/s':>11}{'peak RSS MB':>13}{'over import MB':>16}")
+    for samples in args.samples:
+        for mode, processes in modes:
+            result = run(mode, samples, processes)
+            label = mode if processes == 1 else f"{mode} x{processes}"
+            rate = result["samples"] / result["seconds"]
+            print(f"{samples:>11}  {label:<12}{result['samples']:>9}{rate:>11.0f}"
+                  f"{result['peak_mb']:>13.0f}{result['peak_mb'] - result['baseline_mb']:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
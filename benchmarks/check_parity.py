@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Check that every TensorFlow-free backend answers like the Keras model it
+was exported from.
+
+For each backend the probabilities of ``--messages`` synthetic chat
+messages are compared with Keras. A backend passes when the largest
+absolute probability difference, its mean over messages (of each
+message's largest difference) and the share of messages with the same
+top-1 disease are within its entry in TOLERANCES:
+- numpy, mmap and bundle run the same float32 weights, so they must
+  match to rounding and agree on every message
+- int8 rounds every weight to 1/254 of its channel's range, which moves
+  probabilities by about 3e-3 per message and by up to a few 1e-2 for
+  messages between two diseases
+- student is a different (distilled) model, so only its top-1 agreement
+  is checked; on chat messages it agrees with the teacher about 70% of
+  the time
+
+Float and int8 files missing next to the Keras model are exported first;
+a missing student (distill_student.py) is reported as skipped. Exits
+non-zero if any backend fails.
+
+Usage: python benchmarks/check_parity.py [--model PREFIX] [--messages N] [--backends numpy int8 ...]
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from common import DEFAULT_MODEL_PREFIX, load_chatbot, synthetic_messages
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+# backend: (max |probability difference|, mean per-message max, minimum top-1 agreement); None is not checked
+TOLERANCES = {
+    'numpy': (1e-4, 1e-5, 1.0),
+    'mmap': (1e-4, 1e-5, 1.0),
+    'bundle': (1e-4, 1e-5, 1.0),
+    'int8': (5e-2, 5e-3, 0.97),
+    'student': (None, None, 0.6),
+}
+
+
+def probabilities(chatbot, messages):
+    return np.stack([prediction['probabilities'] for prediction in chatbot.predict_diseases(messages)])
+
+
+def limit(value):
+    return f"{value:.0e}" if value is not None else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PREFIX, help="saved model prefix")
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--backends", nargs="+", choices=sorted(TOLERANCES), default=list(TOLERANCES))
+    args = parser.parse_args()
+
+    keras_bot = load_chatbot(args.model)
+    messages = synthetic_messages(keras_bot, args.messages)
+    keras_probs = probabilities(keras_bot, messages)
+
+    failed = []
+    print(f"{'backend':<10}{'max |diff|':>12}{'limit':>8}{'mean |diff|':>13}{'limit':>8}{'top-1 agree':>13}"
+          f"{'minimum':>9}  result")
+    for backend in args.backends:
+        max_limit, mean_limit, min_agreement = TOLERANCES[backend]
+        if not MedicalChatbotLSTM.saved_model_exists(args.model, backend):
+            if backend == 'student':
+                print(f"{backend:<10}{'':>63}  skipped (no {args.model}_student.npz)")
+                continue
+            if backend == 'bundle':
+                keras_bot.save_bundle(args.model)
+            else:
+                keras_bot.export_model(args.model, backend=backend)
+
+        chatbot = MedicalChatbotLSTM()
+        chatbot.load_model(args.model, backend=backend)
+        backend_probs = probabilities(chatbot, messages)
+        message_diffs = np.abs(keras_probs - backend_probs).max(axis=1)
+        max_diff, mean_diff = float(message_diffs.max()), float(message_diffs.mean())
+        agreement = float(np.mean(keras_probs.argmax(axis=1) == backend_probs.argmax(axis=1)))
+
+        ok = (agreement >= min_agreement and (max_limit is None or max_diff <= max_limit)
+              and (mean_limit is None or mean_diff <= mean_limit))
+        if not ok:
+            failed.append(backend)
+        print(f"{backend:<10}{max_diff:>12.2e}{limit(max_limit):>8}{mean_diff:>13.2e}{limit(mean_limit):>8}"
+              f"{agreement:>13.2%}{min_agreement:>9.0%}  {'ok' if ok else 'FAIL'}")
+
+    if failed:
+        sys.exit(f"FAIL: {', '.join(failed)} deviate from Keras beyond their tolerances")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Shared helpers for the benchmark scripts in this directory"""
+
+import os
+import random
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+DEFAULT_MODEL_PREFIX = os.path.join(ROOT_DIR, "medical_chatbot_lstm")
+
+MESSAGE_TEMPLATES = [
+    "I have {} and {}",
+    "Experiencing {} with {} since yesterday",
+    "{}, {}",
+    "I've been feeling {} for a few days and now {} too",
+    "Doctor, I woke up with {} and {}. What should I do?",
+    "My kid has {} and {}",
+]
+
+FILLER_WORDS = (
+    "yesterday i went to work and later in the evening it got worse so i "
+    "stayed home took some rest drank water and tried to sleep but it did not help much"
+).split()
+
+
+def synthetic_messages(chatbot, count, seed=0, filler_words=0):
+    """Build a reproducible list of chat messages from the chatbot's synonyms
+
+    ``filler_words`` appends that many symptom-free words to each message
+    to produce longer inputs.
+    """
+    rng = random.Random(seed)
+    phrases = [synonym for synonyms in chatbot.symptom_synonyms.values() for synonym in synonyms]
+    messages = []
+    for _ in range(count):
+        template = rng.choice(MESSAGE_TEMPLATES)
+        message = template.format(rng.choice(phrases), rng.choice(phrases))
+        if filler_words:
+            message += " " + " ".join(rng.choice(FILLER_WORDS) for _ in range(filler_words))
+        messages.append(message)
+    return messages
+
+
+def load_chatbot(model_prefix=DEFAULT_MODEL_PREFIX):
+    """Load a trained MedicalChatbotLSTM or exit with a hint"""
+    from medical_chatbot_lstm import MedicalChatbotLSTM
+
+    if not os.path.exists(f"{model_prefix}_model.h5"):
+        sys.exit(
+            f"No trained model at {model_prefix}_model.h5. "
+            "Run `dvc pull` or train one with medical_chatbot_lstm.py first."
+        )
+    chatbot = MedicalChatbotLSTM()
+    chatbot.load_model(model_prefix)
+    return chatbot
+
+
+def percentile(values, q):
+    """Return the q-th percentile (0-100) of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB
+
+    Reads VmHWM from /proc because ru_maxrss survives exec on Linux and
+    would report the parent's peak for freshly spawned child processes.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
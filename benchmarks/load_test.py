@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Load-test a running chat_server.py: keep-alive connections post chat
+messages concurrently and the script reports successful requests/sec and p50/p99
+latency at each concurrency level.
+
+Usage:
+    python chat_server.py &
+    python benchmarks/load_test.py [--url http://127.0.0.1:8000] [--concurrency 1 4 16 64]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlparse
+
+from common import MESSAGE_TEMPLATES, percentile
+
+PHRASES = ['fever', 'dry cough', 'headache', 'runny nose', 'sore throat', 'chills', 'body aches', 'nausea']
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, requests, worker_id, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(requests):
+            template = MESSAGE_TEMPLATES[(worker_id + i) % len(MESSAGE_TEMPLATES)]
+            message = template.format(PHRASES[i % len(PHRASES)], PHRASES[(worker_id + 3 * i) % len(PHRASES)])
+            body = json.dumps({'message': message}).encode('utf-8')
+            request = (
+                f"POST /chat HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n"
+            ).encode('latin-1') + body
+
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await read_response(reader)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_level(host, port, concurrency, requests_per_client):
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, requests_per_client, worker_id, latencies, statuses)
+        for worker_id in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    return statuses.get(200, 0) / elapsed, latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=50, help="requests per client connection")
+    args = parser.parse_args()
+
+    url = urlparse(args.url)
+    print(f"{'clients':>8}{'ok/s':>10}{'p50 ms':>10}{'p99 ms':>10}  statuses")
+    for concurrency in args.concurrency:
+        throughput, latencies, statuses = asyncio.run(
+            run_level(url.hostname, url.port or 80, concurrency, args.requests)
+        )
+        print(f"{concurrency:>8}{throughput:>10.1f}{percentile(latencies, 50):>10.1f}"
+              f"{percentile(latencies, 99):>10.1f}  {dict(sorted(statuses.items()))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import os
+import pickle
+import threading
+
+import numpy as np
+
+DEFAULT_BOW_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'chatbot_model.pkl')
+
+
+class InferenceCascade:
+    """Route each message to the cheapest tier that can answer it
+
+    Tier 'rules': messages with emergency symptoms or no symptoms at all.
+    _generate_response answers those without looking at a model prediction.
+
+    Tier 'bow': the CountVectorizer + LogisticRegression pickled by
+    src/ml_model/train.py. Its answer is kept when the top class
+    probability reaches ``bow_threshold``.
+
+    Tier 'lstm': everything else. If no LSTM is loaded, the bag-of-words
+    answer is used whatever its confidence.
+    """
+
+    TIERS = ('rules', 'bow', 'lstm')
+
+    def __init__(self, bow_model=None, bow_threshold=0.6):
+        self.vectorizer, self.classifier = bow_model if bow_model is not None else (None, None)
+        self.bow_threshold = bow_threshold
+        self.hits = dict.fromkeys(self.TIERS, 0)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, bow_model_path=DEFAULT_BOW_MODEL_PATH, **kwargs):
+        with open(bow_model_path, 'rb') as f:
+            return cls(pickle.load(f), **kwargs)
+
+    def bow_predict(self, texts):
+        """Bag-of-words predictions for raw texts, in the same shape as predict_diseases"""
+        probabilities = self.classifier.predict_proba(self.vectorizer.transform(texts))
+        best = np.argmax(probabilities, axis=1)
+        return [
+            {
+                'disease': str(self.classifier.classes_[index]),
+                'confidence': float(row[index]),
+                'probabilities': row,
+                'source': 'Bag of Words'
+            }
+            for index, row in zip(best, probabilities)
+        ]
+
+    def record(self, tier, count=1):
+        if count:
+            with self._lock:
+                self.hits[tier] += count
+
+    def stats(self):
+        with self._lock:
+            hits = dict(self.hits)
+        total = sum(hits.values())
+        return {
+            'bow_threshold': self.bow_threshold,
+            'hits': hits,
+            'hit_rates': {tier: (count / total if total else 0.0) for tier, count in hits.items()},
+        }
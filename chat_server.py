@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Asyncio HTTP server exposing MedicalChatbotLSTM.chat_response as JSON
+
+Endpoints:
+    POST /chat     {"message": "...", "session_id": optional} -> chat_response(...) plus timing
+    POST /chat/stream  same body -> server-sent events from chat_response_stream(...)
+    GET  /health   readiness of the LSTM model and queue depth (503 if it failed to load)
+    GET  /metrics  Prometheus text format (stage histograms with --metrics)
+    GET  /traces   recent per-request stage traces (with --metrics)
+    GET  /         the web front end (index.html, script.js, styles.css)
+
+Inference runs in a thread pool so the event loop never blocks on
+model.predict. At most ``max_pending`` chat requests may be queued or in
+flight; beyond that the server answers 429 instead of queueing forever.
+
+/chat/stream writes each part of the response as an SSE event (chunked
+transfer encoding, so the connection stays reusable) the moment the
+chatbot yields it. The emergency warning and extracted symptoms arrive
+before the LSTM has run.
+
+SIGHUP reloads the model files in the background and swaps the new model
+in between requests, e.g. after replacing the .bundle file.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from cascade import DEFAULT_BOW_MODEL_PATH
+from instrumentation import METRIC_PREFIX, prometheus_family
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_FILES = {
+    '/': ('index.html', 'text/html; charset=utf-8'),
+    '/index.html': ('index.html', 'text/html; charset=utf-8'),
+    '/script.js': ('script.js', 'application/javascript; charset=utf-8'),
+    '/styles.css': ('styles.css', 'text/css; charset=utf-8'),
+}
+REASONS = {
+    200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 413: 'Payload Too Large', 429: 'Too Many Requests',
+    500: 'Internal Server Error', 503: 'Service Unavailable', 504: 'Gateway Timeout',
+}
+MAX_BODY_BYTES = 64 * 1024
+
+
+def to_jsonable(value):
+    """Convert NumPy scalars and arrays in a response into plain JSON types"""
+    if isinstance(value, dict):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ChatServer:
+    """Serve chat responses over HTTP/1.1 with keep-alive and backpressure"""
+
+    def __init__(self, chatbot, workers=4, max_pending=64, request_timeout=30.0, keep_alive_timeout=15.0):
+        self.chatbot = chatbot
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self.max_pending = max_pending
+        self.request_timeout = request_timeout
+        self.keep_alive_timeout = keep_alive_timeout
+        self.pending = 0
+        self.requests_served = 0
+        self.requests_rejected = 0
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.keep_alive_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HTTPError as exc:
+                    await self._send(writer, exc.status, {'error': str(exc)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = self._wants_keep_alive(headers)
+                if path == '/chat/stream' and method == 'POST':
+                    await self._chat_stream(writer, body, keep_alive)
+                    if not keep_alive:
+                        break
+                    continue
+                status, payload, extra_headers = await self._dispatch(method, path, body)
+                await self._send(writer, status, payload, keep_alive, extra_headers)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, version = request_line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {'_version': version}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise HTTPError(400, "Content-Length must be an integer")
+        if length < 0:
+            raise HTTPError(400, "Content-Length must not be negative")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target.split('?', 1)[0], headers, body
+
+    @staticmethod
+    def _wants_keep_alive(headers):
+        connection = headers.get('connection', '').lower()
+        if headers['_version'] == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    async def _dispatch(self, method, path, body):
+        if method == 'OPTIONS':
+            return 204, None, {}
+        if path in ('/chat', '/chat/stream'):
+            if method != 'POST':
+                return 405, {'error': "Use POST"}, {}
+            return await self._chat(body)
+        if path == '/health':
+            health = self.health()
+            # Without a model every answer comes from the rules, so load balancers should look elsewhere
+            return 503 if health['load_error'] and not health['model_ready'] else 200, health, {}
+        if path == '/metrics':
+            return 200, self.metrics_text().encode('utf-8'), {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+        if path == '/traces':
+            metrics = self.chatbot.instrumentation
+            if metrics is None:
+                return 404, {'error': "Instrumentation is disabled; start the server with --metrics"}, {}
+            return 200, {'traces': metrics.traces()}, {}
+        if path in STATIC_FILES and method == 'GET':
+            filename, content_type = STATIC_FILES[path]
+            with open(os.path.join(ROOT_DIR, filename), 'rb') as f:
+                return 200, f.read(), {'Content-Type': content_type}
+        return 404, {'error': f"No route for {path}"}, {}
+
+    def health(self):
+        """Server state; 'degraded' when the last model load or reload failed"""
+        return {
+            'status': 'degraded' if self.chatbot.load_error else 'ok',
+            'model_ready': self.chatbot.is_model_ready(),
+            'model_loading': self.chatbot.is_model_loading(),
+            'model_backend': self.chatbot.model_backend,
+            'bundle': self.chatbot.bundle_info,
+            'load_error': str(self.chatbot.load_error) if self.chatbot.load_error else None,
+            'pending': self.pending,
+            'max_pending': self.max_pending,
+            'requests_served': self.requests_served,
+            'requests_rejected': self.requests_rejected,
+            'cache': self.chatbot.cache_stats(),
+            'cascade': self.chatbot.cascade_stats(),
+            'sessions': self.chatbot.session_stats(),
+        }
+
+    def metrics_text(self):
+        lines = prometheus_family(f'{METRIC_PREFIX}_http_requests_total', 'counter', "Chat requests by outcome", [
+            ({'outcome': 'served'}, self.requests_served),
+            ({'outcome': 'rejected'}, self.requests_rejected),
+        ])
+        lines += prometheus_family(f'{METRIC_PREFIX}_http_pending_requests', 'gauge',
+                                   "Chat requests queued or in flight", [({}, self.pending)])
+        return '\n'.join(lines) + '\n' + self.chatbot.prometheus_metrics()
+
+    def _parse_chat(self, body):
+        """Return (message, session_id) from a chat request body or raise HTTPError"""
+        try:
+            payload = json.loads(body or b'{}')
+            message = payload.get('message', '')
+            session_id = payload.get('session_id')
+        except (ValueError, AttributeError):
+            raise HTTPError(400, "Body must be a JSON object")
+        if not isinstance(message, str) or not message.strip():
+            raise HTTPError(400, "'message' must be a non-empty string")
+        if session_id is not None and not isinstance(session_id, str):
+            raise HTTPError(400, "'session_id' must be a string")
+        if self.chatbot.session_store is None:
+            # Sessions are off: every message is answered on its own
+            session_id = None
+        if self.pending >= self.max_pending:
+            self.requests_rejected += 1
+            raise HTTPError(429, "Server is busy, please retry")
+        return message, session_id
+
+    async def _chat(self, body):
+        received = time.perf_counter()
+        try:
+            message, session_id = self._parse_chat(body)
+        except HTTPError as exc:
+            return exc.status, {'error': str(exc)}, {'Retry-After': '1'} if exc.status == 429 else {}
+
+        started = None
+        trace = None
+
+        def run():
+            nonlocal started, trace
+            started = time.perf_counter()
+            if session_id is not None:
+                response = self.chatbot.chat_turn(session_id, message)
+            else:
+                response = self.chatbot.chat_response(message)
+            if self.chatbot.instrumentation is not None:
+                trace = self.chatbot.instrumentation.last_trace()
+            return response
+
+        try:
+            response = await asyncio.wait_for(self._submit(run), self.request_timeout)
+        except asyncio.TimeoutError:
+            return 504, {'error': "Timed out waiting for the model"}, {}
+        except Exception as exc:
+            return 500, {'error': f"Chat response failed: {exc}"}, {}
+
+        finished = time.perf_counter()
+        queue_ms = ((started or finished) - received) * 1000
+        total_ms = (finished - received) * 1000
+        response = to_jsonable(response)
+        response['timing'] = {
+            'queue_ms': round(queue_ms, 3),
+            'inference_ms': round(total_ms - queue_ms, 3),
+            'total_ms': round(total_ms, 3),
+        }
+        metrics = self.chatbot.instrumentation
+        if metrics is not None:
+            metrics.observe('queue_wait', queue_ms / 1000)
+            if trace is not None:
+                response['timing']['trace_id'] = trace.trace_id
+        self.requests_served += 1
+        timing = f"queue;dur={queue_ms:.3f}, inference;dur={total_ms - queue_ms:.3f}"
+        return 200, response, {'Server-Timing': timing}
+
+    async def _chat_stream(self, writer, body, keep_alive):
+        """Answer POST /chat/stream with one SSE event per part of chat_response_stream"""
+        received = time.perf_counter()
+        try:
+            message, session_id = self._parse_chat(body)
+        except HTTPError as exc:
+            extra_headers = {'Retry-After': '1'} if exc.status == 429 else {}
+            await self._send(writer, exc.status, {'error': str(exc)}, keep_alive, extra_headers)
+            return
+
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+
+        def run():
+            # The whole generator runs on one inference thread, so its trace stays on that thread
+            try:
+                for event in self.chatbot.chat_response_stream(message, session_id):
+                    loop.call_soon_threadsafe(events.put_nowait, event)
+                    # Let the event loop send this part before the next stage takes the GIL
+                    time.sleep(0)
+            except Exception as exc:
+                loop.call_soon_threadsafe(events.put_nowait, ('error', {'error': str(exc)}))
+            finally:
+                loop.call_soon_threadsafe(events.put_nowait, None)
+
+        try:
+            self._submit(run)
+        except Exception as exc:
+            await self._send(writer, 500, {'error': f"Chat response failed: {exc}"}, keep_alive)
+            return
+
+        headers = self._base_headers(keep_alive)
+        headers.update({'Content-Type': 'text/event-stream; charset=utf-8', 'Cache-Control': 'no-cache',
+                        'Transfer-Encoding': 'chunked'})
+        self._write_head(writer, 200, headers)
+
+        first_event = True
+        deadline = received + self.request_timeout
+        while True:
+            try:
+                event = await asyncio.wait_for(events.get(), deadline - time.perf_counter())
+            except asyncio.TimeoutError:
+                event = ('error', {'error': "Timed out waiting for the model"})
+            if event is None:
+                break
+            name, data = event
+            elapsed_ms = (time.perf_counter() - received) * 1000
+            try:
+                chunk = self._sse_chunk(name, {**to_jsonable(data), 'elapsed_ms': round(elapsed_ms, 3)})
+            except Exception as exc:
+                # The head is sent, so the failure is reported as an event and the connection stays usable
+                name = 'error'
+                chunk = self._sse_chunk(name, {'error': f"Chat response failed: {exc}"})
+            writer.write(f"{len(chunk):x}\r\n".encode('latin-1') + chunk + b'\r\n')
+            await writer.drain()
+            if first_event:
+                first_event = False
+                if self.chatbot.instrumentation is not None:
+                    self.chatbot.instrumentation.observe('stream_first_event', elapsed_ms / 1000)
+            if name == 'error':
+                break
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+        self.requests_served += 1
+
+    def _submit(self, fn):
+        """Run ``fn`` on the inference pool, holding a pending slot until it returns
+
+        The slot is released by the worker's done-callback, so a request that
+        timed out or whose client went away still counts until its thread is free.
+        """
+        loop = asyncio.get_running_loop()
+        future = self.executor.submit(fn)
+        self.pending += 1
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release_slot))
+        return asyncio.wrap_future(future)
+
+    def _release_slot(self):
+        self.pending -= 1
+
+    @staticmethod
+    def _sse_chunk(name, data):
+        return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8')
+
+    @staticmethod
+    def _base_headers(keep_alive):
+        return {
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+            'Access-Control-Allow-Headers': 'Content-Type',
+            'Connection': 'keep-alive' if keep_alive else 'close',
+        }
+
+    @staticmethod
+    def _write_head(writer, status, headers):
+        head = f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        head += ''.join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write(head.encode('latin-1') + b'\r\n')
+
+    async def _send(self, writer, status, payload, keep_alive, extra_headers=None):
+        headers = self._base_headers(keep_alive)
+        if isinstance(payload, bytes):
+            body = payload
+        elif payload is None:
+            body = b''
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            headers['Content-Type'] = 'application/json; charset=utf-8'
+        headers.update(extra_headers or {})
+        headers['Content-Length'] = str(len(body))
+
+        self._write_head(writer, status, headers)
+        writer.write(body)
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8000, model=None, backend='bundle'):
+        """Serve until cancelled; with ``model``, SIGHUP hot-reloads it from disk"""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        if model is not None:
+            def reload():
+                print(f"🔄 Reloading {backend} model from {model}")
+                self.chatbot.reload_model_async(model, backend=backend)
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload)
+        print(f"🩺 Chat server listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def trace_writer(path):
+    """Trace sink that appends one JSON line per request"""
+    f = open(path, 'a', buffering=1, encoding='utf-8')
+    lock = threading.Lock()
+
+    def write(trace):
+        line = json.dumps(trace)
+        with lock:
+            f.write(line + '\n')
+
+    return write
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP server for the medical chatbot")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default="medical_chatbot_lstm", help="prefix of the saved model files")
+    parser.add_argument("--backend", choices=sorted(MedicalChatbotLSTM.BACKEND_FILES), default="keras",
+                        help="inference backend; 'numpy' serves without importing TensorFlow")
+    parser.add_argument("--workers", type=int, default=4, help="inference threads")
+    parser.add_argument("--max-pending", type=int, default=64, help="queued requests before answering 429")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request inference timeout in seconds")
+    parser.add_argument("--cache-entries", type=int, default=10000,
+                        help="entries per response-cache level (0 disables the cache)")
+    parser.add_argument("--cascade-threshold", type=float, default=None,
+                        help="enable the rules -> bag-of-words -> LSTM cascade with this bag-of-words confidence cut-off")
+    parser.add_argument("--bow-model", default=DEFAULT_BOW_MODEL_PATH,
+                        help="bag-of-words model pickled by src/ml_model/train.py")
+    parser.add_argument("--max-sessions", type=int, default=0,
+                        help="keep up to this many chat sessions for multi-turn state, e.g. 200000 (0 disables)")
+    parser.add_argument("--typo-distance", type=int, default=0,
+                        help="correct misspelled symptom words up to this many edits away, e.g. 2 (0 disables)")
+    parser.add_argument("--languages", nargs="*", default=None,
+                        help="also extract symptoms in these locales/ languages (no values: all of them; "
+                             "default: English only)")
+    parser.add_argument("--session-ttl", type=float, default=1800.0, help="seconds an idle session is kept")
+    parser.add_argument("--metrics", action="store_true",
+                        help="record per-stage latency histograms and traces for /metrics and /traces")
+    parser.add_argument("--trace-log", help="append every request trace as a JSON line to this file")
+    parser.add_argument("--micro-batch-ms", type=float, default=0.0,
+                        help="coalesce concurrent predictions for up to this many ms (0 disables)")
+    args = parser.parse_args()
+
+    chatbot = MedicalChatbotLSTM()
+    if not chatbot.saved_model_exists(args.model, args.backend):
+        parser.error(f"No saved {args.backend} model at {args.model}_*. Train one with medical_chatbot_lstm.py first.")
+    # Start serving rule-based answers immediately; the LSTM joins once loaded
+    chatbot.load_model_async(args.model, backend=args.backend)
+    if args.cache_entries > 0:
+        chatbot.enable_response_cache(max_entries=args.cache_entries)
+    if args.micro_batch_ms > 0:
+        chatbot.enable_micro_batching(max_wait_ms=args.micro_batch_ms)
+    if args.typo_distance > 0:
+        chatbot.enable_typo_tolerance(max_distance=args.typo_distance)
+    if args.languages is not None:
+        try:
+            chatbot.enable_multilingual(args.languages or None)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.max_sessions > 0:
+        chatbot.enable_sessions(ttl=args.session_ttl, max_sessions=args.max_sessions)
+    if args.cascade_threshold is not None:
+        chatbot.enable_cascade(args.bow_model, bow_threshold=args.cascade_threshold)
+    if args.metrics or args.trace_log:
+        chatbot.enable_instrumentation(trace_sink=trace_writer(args.trace_log) if args.trace_log else None)
+
+    server = ChatServer(chatbot, workers=args.workers, max_pending=args.max_pending, request_timeout=args.timeout)
+    try:
+        asyncio.run(server.serve(args.host, args.port, model=args.model, backend=args.backend))
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+
+
+if __name__ == "__main__":
+    main()
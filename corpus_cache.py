@@ -0,0 +1,56 @@
+import hashlib
+import json
+import os
+import shutil
+
+from lstm_runtime import load_array_dir, save_array_dir
+
+# Bump when generate_training_data or preprocess_text changes what they produce
+CORPUS_CACHE_VERSION = 1
+
+
+def corpus_key(**inputs):
+    """Content hash of everything that determines a generated, tokenized corpus"""
+    canonical = json.dumps({'version': CORPUS_CACHE_VERSION, **inputs}, sort_keys=True, default=list)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:24]
+
+
+class CorpusCache:
+    """Padded training sequences, label ids and the fitted tokenizer on disk, by corpus key
+
+    Each entry is a directory ``<key>/`` of ``.npy`` arrays, loaded
+    memory-mapped, plus the tokenizer as JSON. Entries are written to a
+    temporary directory and renamed into place, so a crashed or concurrent
+    writer never leaves a half-written entry behind.
+    """
+
+    TOKENIZER_FILE = 'tokenizer.json'
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, key):
+        return os.path.join(self.directory, key)
+
+    def load(self, key):
+        """Return (arrays, tokenizer JSON) for ``key``, or None on a miss"""
+        path = self.path(key)
+        try:
+            with open(os.path.join(path, self.TOKENIZER_FILE), encoding='utf-8') as f:
+                tokenizer_json = f.read()
+        except FileNotFoundError:
+            return None
+        return load_array_dir(path), tokenizer_json
+
+    def save(self, key, arrays, tokenizer_json):
+        path = self.path(key)
+        tmp_path = f'{path}.tmp-{os.getpid()}'
+        save_array_dir(arrays, tmp_path)
+        with open(os.path.join(tmp_path, self.TOKENIZER_FILE), 'w', encoding='utf-8') as f:
+            f.write(tokenizer_json)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            # Another process stored the same corpus first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        return path
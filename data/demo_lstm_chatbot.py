@@ -7,8 +7,15 @@ This script demonstrates the chatbot functionality without training the model
 import numpy as np
 import re
 import json
+import os
+import sys
 from collections import Counter
 
+# Shared matching code lives next to medical_chatbot_lstm.py in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from symptom_matcher import SymptomMatcher
+from symptom_index import SymptomIndex
+
 class SimpleMedicalChatbot:
     """Simplified medical chatbot for demonstration"""
  
@@ -17,6 +24,7 @@ class SimpleMedicalChatbot:
         # Load disease database from JSON file
         with open(db_path, "r") as f:
             self.disease_database = json.load(f)
+        self.symptom_index = SymptomIndex(self.disease_database)
 
         # Keep your symptom synonyms as they are (inside code or move to JSON later)
         self.symptom_synonyms = {
@@ -33,49 +41,16 @@ class SimpleMedicalChatbot:
             "chest pain": ["chest pain", "chest discomfort", "chest tightness"],
             "loss of appetite": ["loss of appetite", "not hungry", "no appetite", "can't eat"]
         }
+        self.symptom_matcher = SymptomMatcher(self.symptom_synonyms)
 
     
     def extract_symptoms(self, text):
         """Extract symptoms from text using synonym matching"""
-        symptoms = []
-        text_lower = text.lower()
-        
-        for symptom, synonyms in self.symptom_synonyms.items():
-            for synonym in synonyms:
-                if synonym in text_lower:
-                    symptoms.append(symptom)
-                    break
-        
-        return list(set(symptoms))
+        return self.symptom_matcher.extract(text)
     
-    def analyze_symptoms(self, symptoms):
+    def analyze_symptoms(self, symptoms, top_k=None):
         """Analyze symptoms and provide disease predictions"""
-        predictions = []
-        
-        for disease_name, disease_info in self.disease_database.items():
-            disease_symptoms = set(disease_info['symptoms'])
-            user_symptoms = set(symptoms)
-            
-            # Calculate overlap
-            overlap = len(disease_symptoms.intersection(user_symptoms))
-            total_disease_symptoms = len(disease_symptoms)
-            
-            if overlap > 0:
-                confidence = overlap / total_disease_symptoms
-                predictions.append({
-                    'disease': disease_name,
-                    'confidence': confidence,
-                    'matched_symptoms': list(disease_symptoms.intersection(user_symptoms)),
-                    'total_symptoms': total_disease_symptoms,
-                    'severity': disease_info['severity'],
-                    'description': disease_info['description'],
-                    'recommendations': disease_info['recommendations']
-                })
-        
-        # Sort by confidence
-        predictions.sort(key=lambda x: x['confidence'], reverse=True)
-        
-        return predictions
+        return self.symptom_index.score(symptoms, top_k=top_k)
     
     def simulate_lstm_prediction(self, text, symptoms):
         """Simulate LSTM prediction based on symptom patterns"""
@@ -115,7 +90,7 @@ class SimpleMedicalChatbot:
         lstm_prediction = self.simulate_lstm_prediction(user_input, symptoms)
         
         # Get symptom-based analysis
-        symptom_predictions = self.analyze_symptoms(symptoms)
+        symptom_predictions = self.analyze_symptoms(symptoms, top_k=3)
         
         # Combine predictions
         response = self._generate_response(user_input, symptoms, lstm_prediction, symptom_predictions)
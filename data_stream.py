@@ -0,0 +1,51 @@
+from collections import deque
+
+
+def ordered_parallel_map(func, args_iter, processes, window=None, initializer=None, initargs=()):
+    """Yield func(*args) for each args tuple, computed in a process pool, in input order
+
+    Unlike Pool.imap, at most ``window`` tasks are submitted ahead of the
+    consumer, so a slow consumer never lets finished results pile up.
+    ``initializer(*initargs)`` runs once in each worker, e.g. to load a model.
+    """
+    from multiprocessing import Pool
+
+    window = window or 2 * processes
+    with Pool(processes, initializer=initializer, initargs=initargs) as pool:
+        pending = deque()
+        for args in args_iter:
+            pending.append(pool.apply_async(func, args))
+            if len(pending) >= window:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def shuffle_stream(items, buffer_size, rng):
+    """Approximately shuffle an iterable using a buffer of ``buffer_size`` items
+
+    The same scheme as tf.data's shuffle: every item is emitted from a
+    random slot of the buffer and replaced by the next incoming one.
+    """
+    buffer = []
+    for item in items:
+        if len(buffer) < buffer_size:
+            buffer.append(item)
+            continue
+        slot = rng.randint(buffer_size)
+        yield buffer[slot]
+        buffer[slot] = item
+    rng.shuffle(buffer)
+    yield from buffer
+
+
+def chunked(items, size):
+    """Yield lists of up to ``size`` consecutive items"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,92 @@
+import hashlib
+import json
+from collections.abc import Mapping
+
+import numpy as np
+
+from lstm_runtime import load_array_dir, save_array_dir
+
+# Array names in the shared directory, next to the model weights
+TABLE_ARRAYS = (
+    'disease_names', 'disease_severities', 'disease_descriptions', 'disease_recommendations',
+    'disease_symptom_indptr', 'disease_symptom_ids', 'symptom_names',
+)
+
+
+def disease_table_arrays(disease_database):
+    """Flatten a disease database into fixed-width string and CSR index arrays"""
+    names = list(disease_database)
+    symptom_ids = {}
+    indptr = [0]
+    ids = []
+    for name in names:
+        for symptom in disease_database[name]['symptoms']:
+            ids.append(symptom_ids.setdefault(symptom, len(symptom_ids)))
+        indptr.append(len(ids))
+
+    def strings(values):
+        return np.array(list(values), dtype=np.str_)
+
+    return {
+        'disease_names': strings(names),
+        'disease_severities': strings(disease_database[name]['severity'] for name in names),
+        'disease_descriptions': strings(disease_database[name]['description'] for name in names),
+        'disease_recommendations': strings(disease_database[name]['recommendations'] for name in names),
+        'disease_symptom_indptr': np.array(indptr, dtype=np.int32),
+        'disease_symptom_ids': np.array(ids, dtype=np.int32),
+        'symptom_names': strings(symptom_ids),
+    }
+
+
+def disease_database_version(disease_database):
+    """Short content hash of a disease database, whatever its storage"""
+    canonical = json.dumps({name: disease_database[name] for name in disease_database}, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+class DiseaseTable(Mapping):
+    """Read-only disease database backed by flat, memory-mappable arrays
+
+    Looks like the dict built by _create_disease_database: ``table[name]``
+    returns {'symptoms', 'severity', 'description', 'recommendations'}, but
+    the strings stay in the arrays (shared pages when they are mapped from
+    disk) and each entry is only built when it is read.
+    """
+
+    def __init__(self, arrays):
+        self.arrays = {name: arrays[name] for name in TABLE_ARRAYS}
+        self._ids = {name: disease_id for disease_id, name in enumerate(self.arrays['disease_names'].tolist())}
+
+    @classmethod
+    def from_database(cls, disease_database):
+        return cls(disease_table_arrays(disease_database))
+
+    @classmethod
+    def load(cls, directory):
+        """Memory-map a table written by save"""
+        return cls(load_array_dir(directory))
+
+    @staticmethod
+    def has_table(arrays):
+        return all(name in arrays for name in TABLE_ARRAYS)
+
+    def save(self, directory):
+        return save_array_dir(self.arrays, directory)
+
+    def __getitem__(self, name):
+        disease_id = self._ids[name]
+        arrays = self.arrays
+        start, end = arrays['disease_symptom_indptr'][disease_id:disease_id + 2]
+        symptom_names = arrays['symptom_names']
+        return {
+            'symptoms': [str(symptom_names[i]) for i in arrays['disease_symptom_ids'][start:end]],
+            'severity': str(arrays['disease_severities'][disease_id]),
+            'description': str(arrays['disease_descriptions'][disease_id]),
+            'recommendations': str(arrays['disease_recommendations'][disease_id]),
+        }
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Distill the saved LSTM into a compact student model
+
+Loads the teacher with any LSTM backend, has it label the synthetic corpus
+from generate_training_data, trains a HashedNgramStudent on its
+probabilities and writes ``<model>_student.npz``. Serve the result with
+``--backend student`` in chat_server.py, score_messages.py or
+medical_chatbot_lstm.py.
+
+Usage: python distill_student.py [--model PREFIX] [--backend numpy] [--epochs 30] [--temperature 1]
+"""
+
+import argparse
+import json
+
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="medical_chatbot_lstm", help="prefix of the saved model files")
+    parser.add_argument("--backend", choices=["keras", "numpy", "mmap", "bundle"], default="keras",
+                        help="backend the teacher LSTM is loaded with")
+    parser.add_argument("--samples", type=int, default=10000, help="num_samples for generate_training_data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--buckets", type=int, default=2 ** 12, help="hash buckets for token bigrams")
+    parser.add_argument("--temperature", type=float, default=1.0, help="softening of the teacher probabilities")
+    parser.add_argument("--hard-weight", type=float, default=0.1, help="share of the loss from the corpus labels")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--learning-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    chatbot = MedicalChatbotLSTM()
+    if not chatbot.saved_model_exists(args.model, args.backend):
+        parser.error(f"No saved {args.backend} model at {args.model}_*. Train one with medical_chatbot_lstm.py first.")
+    chatbot.load_model(args.model, backend=args.backend)
+
+    _, report = chatbot.distill_student(args.model, num_samples=args.samples, seed=args.seed,
+                                        buckets=args.buckets, temperature=args.temperature,
+                                        hard_weight=args.hard_weight, epochs=args.epochs,
+                                        learning_rate=args.learning_rate)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import re
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+# Frequent English words one edit away from a synonym word ("never" ->
+# "fever", "tried" -> "tired", "height" -> "weight"); never corrected
+COMMON_WORDS = frozenset("""
+    about after again also always another because been before being better both cause could
+    doing during each eight either every fewer fight first going having hired light might
+    never other right since sight still there their these think those thought though three
+    through tight times today tried tries under until where which while would should worse
+    height hours weeks years month months started feeling really things
+""".split())
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (adjacent transpositions count as one
+    edit), or ``limit + 1`` as soon as it must exceed ``limit``"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # Typos are local, so trimming the shared prefix and suffix usually
+    # leaves a few letters for the quadratic part
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return len(a) + len(b)
+
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            value = previous[j - 1] + (a[i - 1] != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1] and previous2[j - 2] + 1 < value:
+                value = previous2[j - 2] + 1
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _deletes(word, max_distance):
+    """Every string reachable from ``word`` by up to ``max_distance`` deletions, itself included"""
+    variants = frontier = {word}
+    for _ in range(max_distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants = variants | frontier
+    return variants
+
+
+class FuzzyIndex:
+    """Symmetric-delete (SymSpell-style) index over the words of every synonym
+
+    Each word of at least ``min_length`` letters is stored under every
+    string reachable by deleting up to ``max_distance`` characters from its
+    first ``prefix_length`` letters. A misspelled token is looked up by
+    generating the same deletions of its own prefix, so the work per token
+    depends on the token's length and not on how many synonyms there are.
+    Candidates are confirmed with a bounded edit distance.
+
+    Longer words tolerate more edits: a word of length n may be reached
+    with up to ``min(max_distance, n // 4)`` edits. Tokens that are
+    synonym words already, shorter than ``min_length`` or in
+    ``known_words`` are never corrected. Short synonyms like "hot" or
+    "cold" would otherwise match half the dictionary.
+
+    ``correct`` rewrites misspelled tokens to the synonym words they are
+    closest to, so the exact SymptomMatcher can then find multi-word
+    phrases like "shortnes of breth". It remembers up to ``cache_size``
+    corrections, so a repeated unknown word costs one dict lookup.
+    """
+
+    def __init__(self, symptom_synonyms, max_distance=2, min_length=5, prefix_length=7,
+                 known_words=COMMON_WORDS, cache_size=10000):
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.prefix_length = prefix_length
+        self.cache_size = cache_size
+        # token -> corrected token; user vocabulary is heavily repeated
+        self._corrections = {}
+        self.words = []
+        self._deletes = {}
+
+        vocabulary = {}
+        for synonyms in symptom_synonyms.values():
+            for synonym in synonyms:
+                for word in WORD_PATTERN.findall(synonym.lower()):
+                    vocabulary.setdefault(word, None)
+        self.vocabulary = frozenset(vocabulary)
+        self.known_words = self.vocabulary | frozenset(known_words)
+
+        for word in vocabulary:
+            if len(word) < min_length or self._allowed_edits(word) == 0:
+                continue
+            word_id = len(self.words)
+            self.words.append(word)
+            for variant in _deletes(word[:prefix_length], max_distance):
+                self._deletes.setdefault(variant, []).append(word_id)
+
+    def __len__(self):
+        return len(self.words)
+
+    def _allowed_edits(self, word):
+        return min(self.max_distance, len(word) // 4)
+
+    def lookup(self, token):
+        """Return (word, distance) for the closest synonym word, or None
+
+        Ties go to the word that appears first in the synonym table.
+        """
+        token = token.lower()
+        if token in self.known_words:
+            return (token, 0) if token in self.vocabulary else None
+        if len(token) < self.min_length:
+            return None
+
+        best = None
+        seen = set()
+        for variant in _deletes(token[:self.prefix_length], self.max_distance):
+            for word_id in self._deletes.get(variant, ()):
+                if word_id in seen:
+                    continue
+                seen.add(word_id)
+                word = self.words[word_id]
+                limit = self._allowed_edits(word)
+                if best is not None:
+                    limit = min(limit, best[1] - 1 if word_id > best[2] else best[1])
+                distance = edit_distance(token, word, limit)
+                if distance <= limit:
+                    best = (word, distance, word_id)
+        return best[:2] if best is not None else None
+
+    def _replace(self, match):
+        token = match.group()
+        if token in self.known_words or len(token) < self.min_length:
+            return token
+        corrected = self._corrections.get(token)
+        if corrected is None:
+            found = self.lookup(token)
+            corrected = found[0] if found is not None else token
+            if len(self._corrections) >= self.cache_size:
+                self._corrections.clear()
+            self._corrections[token] = corrected
+        return corrected
+
+    def correct(self, text):
+        """Lowercase ``text`` and replace misspelled words with the synonym words they match"""
+        return WORD_PATTERN.sub(self._replace, text.lower())
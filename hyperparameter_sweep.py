@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Hyperparameter sweep for the LSTM
+
+Trains every combination of the given ``lstm_units``, ``embedding_dim``,
+``max_sequence_length``, ``vocab_size`` and batch size on the same seeded
+synthetic corpus, one trial per worker process. Each trial stops early once
+validation accuracy plateaus and is exported for the NumPy backend. It is
+then scored on the distinct texts of a corpus generated with a different
+seed, and timed answering single messages.
+
+Everything lives under ``--sweep-dir``:
+
+    trials/<key>.json         result of a finished trial, reused by later sweeps
+    trials/<key>_weights.npz  its weights; serve with --backend numpy --model trials/<key>
+    trials/<key>.log          its training output
+    checkpoints/<key>/        epoch checkpoint of an unfinished trial
+    corpus/                   tokenized corpora shared by trials (see corpus_cache.py)
+    results.json              every trial of the last sweep
+
+The key hashes the trial's hyperparameters and training settings, so
+rerunning an interrupted sweep skips the finished trials and resumes the
+others from their last epoch. Training time then covers only the resumed
+epochs.
+
+Usage: python hyperparameter_sweep.py --lstm-units 64 128 --embedding-dim 64 128 --workers 4
+"""
+
+import argparse
+import contextlib
+import hashlib
+import itertools
+import json
+import os
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from data_stream import ordered_parallel_map
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+SWEEP_PARAMETERS = ('lstm_units', 'embedding_dim', 'max_sequence_length', 'vocab_size', 'batch_size')
+# Bump when the trial procedure changes so old results are not reused
+TRIAL_VERSION = 1
+
+
+def trial_configs(grid):
+    """Every combination of the values in ``grid``, a dict of parameter -> list of values"""
+    values = itertools.product(*(grid[parameter] for parameter in SWEEP_PARAMETERS))
+    return [dict(zip(SWEEP_PARAMETERS, combination)) for combination in values]
+
+
+def trial_key(config, training):
+    canonical = json.dumps({'version': TRIAL_VERSION, **config, **training}, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def held_out_corpus(chatbot, num_samples, seed):
+    """Distinct texts of a synthetic corpus with their most frequent disease"""
+    label_counts = defaultdict(Counter)
+    for text, label in zip(*chatbot.generate_training_data(num_samples, seed=seed)):
+        label_counts[text][label] += 1
+    return list(label_counts), [counts.most_common(1)[0][0] for counts in label_counts.values()]
+
+
+def _init_worker(threads):
+    # Trials share the cores, so each keeps TensorFlow to its own slice of them
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def run_trial(config, training, sweep_dir, latency_messages=200):
+    """Train, export and score one configuration; returns its result dict"""
+    key = trial_key(config, training)
+    prefix = os.path.join(sweep_dir, 'trials', key)
+
+    # Progress bars of parallel trials would interleave on the console
+    with open(f'{prefix}.log', 'a') as log, contextlib.redirect_stdout(log):
+        chatbot = MedicalChatbotLSTM()
+        chatbot.lstm_units = config['lstm_units']
+        chatbot.embedding_dim = config['embedding_dim']
+        chatbot.max_sequence_length = config['max_sequence_length']
+        chatbot.vocab_size = config['vocab_size']
+
+        start = time.perf_counter()
+        history = chatbot.train_model(
+            epochs=training['epochs'], batch_size=config['batch_size'], num_samples=training['num_samples'],
+            seed=training['seed'], patience=training['patience'],
+            cache_dir=os.path.join(sweep_dir, 'corpus'), checkpoint_dir=os.path.join(sweep_dir, 'checkpoints', key),
+        )
+        training_seconds = time.perf_counter() - start
+        chatbot.export_model(prefix)
+
+        serving = MedicalChatbotLSTM()
+        serving.load_model(prefix, backend='numpy')
+        texts, labels = held_out_corpus(serving, training['eval_samples'], training['seed'] + 1)
+        predicted = [prediction['disease'] for prediction in serving.predict_diseases(texts)]
+        timings = []
+        for text in texts[:latency_messages]:
+            message_start = time.perf_counter()
+            serving.predict_disease(text)
+            timings.append((time.perf_counter() - message_start) * 1000)
+
+    result = {
+        'key': key,
+        **config,
+        'epochs_trained': history.epoch[-1] + 1 if history.epoch else 0,
+        'accuracy': float(np.mean(np.array(predicted) == np.array(labels))),
+        'training_seconds': training_seconds,
+        'latency_p50_ms': float(np.percentile(timings, 50)),
+        'weights_kb': os.path.getsize(f'{prefix}_weights.npz') / 1024,
+    }
+    with open(f'{prefix}.json', 'w') as f:
+        json.dump(result, f, indent=2)
+    return result
+
+
+def _cached_result(sweep_dir, key):
+    try:
+        with open(os.path.join(sweep_dir, 'trials', f'{key}.json')) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def run_sweep(grid, training, sweep_dir, workers=1):
+    """Run every trial in ``grid`` not already finished in ``sweep_dir``; returns all results"""
+    os.makedirs(os.path.join(sweep_dir, 'trials'), exist_ok=True)
+    results, pending = [], []
+    for config in trial_configs(grid):
+        cached = _cached_result(sweep_dir, trial_key(config, training))
+        if cached is not None:
+            results.append({**cached, 'cached': True})
+        else:
+            pending.append(config)
+    print(f"{len(pending)} trials to run, {len(results)} cached, {workers} workers")
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    finished = ordered_parallel_map(run_trial, ((config, training, sweep_dir) for config in pending),
+                                    processes=workers, initializer=_init_worker, initargs=(threads,))
+    for result in finished:
+        print(f"finished {result['key']}: accuracy {result['accuracy']:.1%} in {result['training_seconds']:.0f}s")
+        results.append({**result, 'cached': False})
+
+    with open(os.path.join(sweep_dir, 'results.json'), 'w') as f:
+        json.dump(results, f, indent=2)
+    return results
+
+
+def format_table(results):
+    header = (f"{'units':>6}{'embed':>6}{'maxlen':>7}{'vocab':>6}{'batch':>6}{'epochs':>7}{'accuracy':>10}"
+              f"{'train s':>9}{'p50 ms':>8}{'weights KB':>11}  key")
+    rows = [header]
+    for r in sorted(results, key=lambda r: (-r['accuracy'], r['latency_p50_ms'])):
+        rows.append(f"{r['lstm_units']:>6}{r['embedding_dim']:>6}{r['max_sequence_length']:>7}{r['vocab_size']:>6}"
+                    f"{r['batch_size']:>6}{r['epochs_trained']:>7}{r['accuracy']:>10.1%}{r['training_seconds']:>9.0f}"
+                    f"{r['latency_p50_ms']:>8.3f}{r['weights_kb']:>11.0f}  {r['key']}"
+                    f"{' (cached)' if r['cached'] else ''}")
+    return '\n'.join(rows)
+
+
+def main():
+    defaults = MedicalChatbotLSTM()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lstm-units", type=int, nargs="+", default=[64, defaults.lstm_units])
+    parser.add_argument("--embedding-dim", type=int, nargs="+", default=[64, defaults.embedding_dim])
+    parser.add_argument("--max-sequence-length", type=int, nargs="+", default=[defaults.max_sequence_length])
+    parser.add_argument("--vocab-size", type=int, nargs="+", default=[defaults.vocab_size])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[32])
+    parser.add_argument("--epochs", type=int, default=20, help="upper bound; trials stop early on a plateau")
+    parser.add_argument("--patience", type=int, default=3, help="epochs without a better validation accuracy")
+    parser.add_argument("--samples", type=int, default=10000, help="num_samples of the training corpus")
+    parser.add_argument("--eval-samples", type=int, default=2000, help="num_samples of the held-out corpus")
+    parser.add_argument("--seed", type=int, default=0, help="training corpus seed; the held-out corpus uses seed + 1")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="trials trained in parallel")
+    parser.add_argument("--sweep-dir", default="sweep", help="directory for trial results, checkpoints and corpora")
+    args = parser.parse_args()
+
+    grid = {'lstm_units': args.lstm_units, 'embedding_dim': args.embedding_dim,
+            'max_sequence_length': args.max_sequence_length, 'vocab_size': args.vocab_size,
+            'batch_size': args.batch_size}
+    training = {'epochs': args.epochs, 'patience': args.patience, 'num_samples': args.samples,
+                'eval_samples': args.eval_samples, 'seed': args.seed}
+    results = run_sweep(grid, training, args.sweep_dir, workers=args.workers)
+    print()
+    print(format_table(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import bisect
+import itertools
+import threading
+import time
+from collections import deque
+
+# Upper bounds in seconds, from 50 µs (symptom matching) up to a slow cold model call
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+METRIC_PREFIX = 'chatbot'
+
+COUNTER_HELP = {
+    'chat_responses_total': "Chat responses generated",
+    'emergency_responses_total': "Responses that short-circuited to the emergency warning",
+    'rules_only_responses_total': "Responses answered from rules alone because no LSTM was loaded",
+}
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Yield (upper bound, count of observations <= bound), ending with +Inf"""
+        return zip(self.buckets + (float('inf'),), itertools.accumulate(self.counts))
+
+
+class Trace:
+    """Stage timings of one chat request"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, **attributes):
+        self.trace_id = next(self._ids)
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.spans = []
+        self.attributes = attributes
+        self.total_seconds = None
+
+    def as_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'started_at': self.started_at,
+            'total_ms': round(self.total_seconds * 1000, 4) if self.total_seconds is not None else None,
+            'stages': [{'stage': stage, 'ms': round(seconds * 1000, 4)} for stage, seconds in self.spans],
+            'attributes': self.attributes,
+        }
+
+
+class Instrumentation:
+    """Per-stage latency histograms, counters and per-request traces
+
+    The chatbot holds ``instrumentation = None`` unless it is enabled, and
+    every hot-path hook is guarded by that ``is None`` check, so the
+    disabled cost is one attribute load and comparison per stage.
+
+    Stages are timed with ``lap``: pass the perf_counter value the stage
+    started at, get the current one back to start the next stage. Laps on
+    a thread that has an open trace are also recorded as spans of it.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, trace_history=100, trace_sink=None):
+        self.buckets = tuple(buckets)
+        self.histograms = {}
+        self.counters = {}
+        self.recent_traces = deque(maxlen=trace_history)
+        self.trace_sink = trace_sink
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace.spans.append((stage, seconds))
+
+    def lap(self, stage, start):
+        """Record the time since ``start`` under ``stage`` and return the current time"""
+        now = time.perf_counter()
+        self.observe(stage, now - start)
+        return now
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def start_trace(self, **attributes):
+        """Open a trace on this thread; stages lapped until finish_trace belong to it"""
+        trace = Trace(**attributes)
+        self._local.trace = trace
+        return trace
+
+    def finish_trace(self, trace, **attributes):
+        trace.total_seconds = time.perf_counter() - trace._start
+        trace.attributes.update(attributes)
+        if getattr(self._local, 'trace', None) is trace:
+            self._local.trace = None
+        self._local.last_trace = trace
+        with self._lock:
+            self.recent_traces.append(trace)
+        if self.trace_sink is not None:
+            self.trace_sink(trace.as_dict())
+        return trace
+
+    def last_trace(self):
+        """The trace most recently finished on this thread, or None"""
+        return getattr(self._local, 'last_trace', None)
+
+    def traces(self):
+        """Most recent traces as dicts, oldest first"""
+        with self._lock:
+            return [trace.as_dict() for trace in self.recent_traces]
+
+    def prometheus_lines(self):
+        """Prometheus text exposition lines for the stage histograms and counters"""
+        with self._lock:
+            histograms = {stage: (list(h.cumulative()), h.sum, h.count) for stage, h in self.histograms.items()}
+            counters = dict(self.counters)
+
+        lines = []
+        if histograms:
+            name = f'{METRIC_PREFIX}_stage_seconds'
+            lines.append(f'# HELP {name} Latency of each chat pipeline stage')
+            lines.append(f'# TYPE {name} histogram')
+            for stage, (buckets, total, count) in sorted(histograms.items()):
+                for bound, cumulative in buckets:
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {_format_value(total)}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+
+        families = {}
+        for (counter, labels), value in counters.items():
+            families.setdefault(counter, []).append((labels, value))
+        for counter, samples in sorted(families.items()):
+            name = f'{METRIC_PREFIX}_{counter}'
+            lines.append(f'# HELP {name} {COUNTER_HELP.get(counter, counter)}')
+            lines.append(f'# TYPE {name} counter')
+            for labels, value in sorted(samples):
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return lines
+
+
+def prometheus_family(name, metric_type, help_text, samples):
+    """Exposition lines for one metric family given [(labels dict, value)]"""
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}']
+    for labels, value in samples:
+        lines.append(f'{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}')
+    return lines
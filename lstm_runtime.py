@@ -0,0 +1,296 @@
+"""
+TensorFlow-free inference for the chatbot LSTM
+
+``export_lstm`` writes the weights of a trained MedicalChatbotLSTM, together
+with its tokenizer vocabulary and class labels, to a single ``.npz`` file.
+``NumpyLSTM`` loads that file and runs the Embedding -> LSTM -> LSTM ->
+Dense -> Dense forward pass with NumPy only, so serving processes never
+import TensorFlow.
+
+The same arrays can also be written as a directory of ``.npy`` files
+(``save_array_dir``). Loading that directory memory-maps every array
+read-only, so worker processes serving the same model share the weight
+pages through the OS page cache instead of each holding a private copy.
+"""
+
+import os
+import re
+import threading
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+_NON_LETTERS = re.compile(r'[^a-zA-Z\s]')
+
+
+def clean_text(text):
+    """Lowercase, keep only ASCII letters and whitespace, collapse runs of whitespace"""
+    return ' '.join(_NON_LETTERS.sub('', text.lower()).split())
+
+
+def pad_sequences_post(sequences, maxlen, out=None):
+    """Same result as keras pad_sequences(padding='post') with default 'pre' truncation"""
+    if out is None:
+        out = np.zeros((len(sequences), maxlen), dtype=np.int32)
+    else:
+        out[:] = 0
+    for row, sequence in enumerate(sequences):
+        sequence = sequence[-maxlen:]
+        out[row, :len(sequence)] = sequence
+    return out
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _softmax(x):
+    x = x - x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+    return x
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'softmax': _softmax,
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+}
+
+
+class InferenceTokenizer:
+    """Keras Tokenizer.texts_to_sequences for inference, on text cleaned by clean_text
+
+    The vocabulary is frozen at construction into one dict holding only the
+    ids the model can see (below ``num_words``). ``pad`` writes into an
+    int32 buffer that is allocated once per thread and padded length and
+    reused afterwards. Output is identical to the Keras tokenizer followed
+    by pad_sequences(padding='post').
+    """
+
+    def __init__(self, word_index, num_words=None, oov_token=None):
+        self.word_index = dict(word_index)
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self._oov_index = self.word_index.get(oov_token) if oov_token is not None else None
+        self._lookup = {word: index for word, index in self.word_index.items()
+                        if not num_words or index < num_words}
+        self._local = threading.local()
+
+    @classmethod
+    def from_tokenizer(cls, tokenizer):
+        """Build from a fitted Keras Tokenizer (or return an InferenceTokenizer unchanged)"""
+        if isinstance(tokenizer, cls):
+            return tokenizer
+        if getattr(tokenizer, 'char_level', False) or getattr(tokenizer, 'analyzer', None) is not None:
+            raise ValueError("Only word-level tokenizers without a custom analyzer are supported")
+        return cls(tokenizer.word_index, tokenizer.num_words, tokenizer.oov_token)
+
+    def texts_to_sequences(self, texts):
+        get = self._lookup.get
+        oov_index = self._oov_index
+        if oov_index is None:
+            return [[index for index in map(get, text.split()) if index is not None] for text in texts]
+        return [[get(word, oov_index) for word in text.split()] for text in texts]
+
+    def pad(self, sequences, maxlen):
+        """Post-pad (pre-truncate) sequences into this thread's reusable buffer for ``maxlen``
+
+        The result is a view that the next ``pad`` call with the same
+        ``maxlen`` on the same thread overwrites.
+        """
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = self._local.buffers = {}
+        buffer = buffers.get(maxlen)
+        if buffer is None or len(buffer) < len(sequences):
+            capacity = max(len(sequences), 2 * len(buffer) if buffer is not None else 64)
+            buffer = buffers[maxlen] = np.empty((capacity, maxlen), dtype=np.int32)
+        return pad_sequences_post(sequences, maxlen, out=buffer[:len(sequences)])
+
+
+class ClassLabels:
+    """The part of sklearn's LabelEncoder that inference needs"""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+
+    def inverse_transform(self, indices):
+        return self.classes_[np.asarray(indices)]
+
+
+def save_array_dir(arrays, directory):
+    """Write each array to ``directory/<name>.npy`` so it can be memory-mapped"""
+    os.makedirs(directory, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f'{name}.npy'), np.asarray(array))
+    return directory
+
+
+def load_array_dir(directory):
+    """Memory-map every ``.npy`` file in ``directory`` read-only"""
+    # Plain ndarray views of the maps: np.memmap's subclass hooks would run on every operation
+    return {
+        filename[:-len('.npy')]: np.asarray(np.load(os.path.join(directory, filename), mmap_mode='r'))
+        for filename in sorted(os.listdir(directory)) if filename.endswith('.npy')
+    }
+
+
+def lstm_arrays(chatbot):
+    """The trained model, vocabulary and labels of a chatbot as named arrays"""
+    if isinstance(chatbot.model, NumpyLSTM):
+        # Already in this format, e.g. loaded from an earlier export
+        return chatbot.model.float_arrays()
+
+    arrays = {}
+    dense_activations = []
+    lstm_count = dense_count = 0
+    mask_zero = False
+
+    for layer in chatbot.model.layers:
+        kind = type(layer).__name__
+        weights = layer.get_weights()
+        if kind == 'Embedding':
+            arrays['embedding'] = weights[0]
+            mask_zero = bool(getattr(layer, 'mask_zero', False))
+        elif kind == 'LSTM':
+            kernel, recurrent_kernel, bias = weights
+            arrays[f'lstm_{lstm_count}_kernel'] = kernel
+            arrays[f'lstm_{lstm_count}_recurrent_kernel'] = recurrent_kernel
+            arrays[f'lstm_{lstm_count}_bias'] = bias
+            lstm_count += 1
+        elif kind == 'Dense':
+            arrays[f'dense_{dense_count}_kernel'] = weights[0]
+            arrays[f'dense_{dense_count}_bias'] = weights[1]
+            dense_activations.append(layer.get_config()['activation'])
+            dense_count += 1
+        elif kind not in ('Dropout', 'InputLayer'):
+            raise ValueError(f"Cannot export layer type {kind}")
+
+    word_index = chatbot.tokenizer.word_index
+    arrays['vocab_words'] = np.array(list(word_index), dtype=np.str_)
+    arrays['vocab_ids'] = np.array(list(word_index.values()), dtype=np.int32)
+    arrays['classes'] = np.asarray(chatbot.label_encoder.classes_).astype(np.str_)
+    arrays['dense_activations'] = np.array(dense_activations, dtype=np.str_)
+    arrays['config'] = np.array([
+        FORMAT_VERSION,
+        chatbot.max_sequence_length,
+        chatbot.tokenizer.num_words or 0,
+        int(mask_zero),
+    ], dtype=np.int64)
+    arrays['oov_token'] = np.array(chatbot.tokenizer.oov_token or '', dtype=np.str_)
+    return arrays
+
+
+def vocabulary_arrays(arrays):
+    """The tokenizer, label and config arrays shared by every exported model format"""
+    return {name: arrays[name] for name in ('vocab_words', 'vocab_ids', 'classes', 'config', 'oov_token')}
+
+
+def tokenizer_and_labels(arrays):
+    """Rebuild the InferenceTokenizer and class labels from exported arrays"""
+    num_words = int(arrays['config'][2])
+    oov_token = str(arrays['oov_token']) or None
+    word_index = dict(zip(arrays['vocab_words'].tolist(), arrays['vocab_ids'].tolist()))
+    return InferenceTokenizer(word_index, num_words or None, oov_token), ClassLabels(arrays['classes'])
+
+
+def export_lstm(chatbot, path):
+    """Write the trained model, vocabulary and labels of a chatbot to one .npz file"""
+    np.savez(path, **lstm_arrays(chatbot))
+    return path
+
+
+class NumpyLSTM:
+    """NumPy forward pass matching the Keras model built by build_lstm_model"""
+
+    def __init__(self, arrays):
+        version, max_sequence_length, _, mask_zero = (int(v) for v in arrays['config'])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported weight file version {version}")
+        self.max_sequence_length = max_sequence_length
+        self.mask_zero = bool(mask_zero)
+        self.arrays = arrays
+
+        self.embedding = arrays['embedding']
+        self.lstm_layers = []
+        while f'lstm_{len(self.lstm_layers)}_kernel' in arrays:
+            prefix = f'lstm_{len(self.lstm_layers)}'
+            self.lstm_layers.append((
+                arrays[f'{prefix}_kernel'],
+                arrays[f'{prefix}_recurrent_kernel'],
+                arrays[f'{prefix}_bias'],
+            ))
+        self.dense_layers = [
+            (arrays[f'dense_{i}_kernel'], arrays[f'dense_{i}_bias'], ACTIVATIONS[str(activation)])
+            for i, activation in enumerate(arrays['dense_activations'])
+        ]
+
+        self.tokenizer, self.label_encoder = tokenizer_and_labels(arrays)
+
+    def float_arrays(self):
+        """The arrays export_lstm writes for this model"""
+        return dict(self.arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Load an exported .npz file, or memory-map a directory written by save_array_dir"""
+        if os.path.isdir(path):
+            return cls(load_array_dir(path))
+        with np.load(path) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def _embed(self, sequences):
+        return self.embedding[sequences]
+
+    def _matmul(self, x, weights):
+        # Subclasses storing weights differently override this and _embed
+        return x @ weights
+
+    def _lstm(self, inputs, kernel, recurrent_kernel, bias, mask, return_sequences):
+        # Input projections for every timestep in one matrix product
+        return self._recurrence(self._matmul(inputs, kernel) + bias, recurrent_kernel, mask, return_sequences)
+
+    def _recurrence(self, projected, recurrent_kernel, mask, return_sequences, recurrent_scale=None):
+        """Run the LSTM steps over input projections; ``recurrent_scale`` multiplies each h @ recurrent_kernel"""
+        batch, steps, _ = projected.shape
+        units = recurrent_kernel.shape[0]
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = np.empty((batch, steps, units), dtype=np.float32) if return_sequences else None
+
+        for t in range(steps):
+            z = h @ recurrent_kernel
+            if recurrent_scale is not None:
+                z *= recurrent_scale
+            z += projected[:, t]
+            i = _sigmoid(z[:, :units])
+            f = _sigmoid(z[:, units:2 * units])
+            g = np.tanh(z[:, 2 * units:3 * units])
+            o = _sigmoid(z[:, 3 * units:])
+            new_c = f * c + i * g
+            new_h = o * np.tanh(new_c)
+            if mask is not None:
+                # Masked steps carry the previous state forward, as Keras does
+                step_mask = mask[:, t:t + 1]
+                new_c = np.where(step_mask, new_c, c)
+                new_h = np.where(step_mask, new_h, h)
+            c, h = new_c, new_h
+            if return_sequences:
+                outputs[:, t] = h
+        return outputs if return_sequences else h
+
+    def predict_on_batch(self, sequences):
+        """Return class probabilities for a batch of padded token id sequences"""
+        sequences = np.asarray(sequences)
+        mask = sequences != 0 if self.mask_zero else None
+        x = self._embed(sequences)
+        for position, (kernel, recurrent_kernel, bias) in enumerate(self.lstm_layers):
+            return_sequences = position < len(self.lstm_layers) - 1
+            x = self._lstm(x, kernel, recurrent_kernel, bias, mask, return_sequences)
+        for kernel, bias, activation in self.dense_layers:
+            x = activation(self._matmul(x, kernel) + bias)
+        return x
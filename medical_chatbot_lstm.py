@@ -1,39 +1,121 @@
+import argparse
 import numpy as np
-import pandas as pd
-import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout, Embedding
-from tensorflow.keras.preprocessing.text import Tokenizer
-from tensorflow.keras.preprocessing.sequence import pad_sequences
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
+import os
 import pickle
 import json
-import re
-from collections import Counter
+import threading
+import time
+from collections import Counter, namedtuple
+from cascade import DEFAULT_BOW_MODEL_PATH, InferenceCascade
+from data_stream import chunked, ordered_parallel_map, shuffle_stream
+from instrumentation import METRIC_PREFIX, Instrumentation, prometheus_family
+from micro_batching import MicroBatcher
+from symptom_matcher import SymptomMatcher
+from fuzzy_index import FuzzyIndex
+from multilingual import LOCALES_DIR, MultilingualExtractor
+from symptom_index import SymptomIndex
+from response_cache import ResponseCache
+from session_store import SessionStore
+from disease_table import DiseaseTable, disease_database_version
+from lstm_runtime import (InferenceTokenizer, NumpyLSTM, clean_text, export_lstm, load_array_dir, lstm_arrays,
+                          pad_sequences_post, save_array_dir)
+from model_bundle import read_bundle, write_bundle
+from corpus_cache import CorpusCache, corpus_key
+from student_model import HashedNgramStudent, train_student
+from quantization import QuantizedLSTM, quantize_arrays
 import warnings
 warnings.filterwarnings('ignore')
-import pickle
-import os
 
-# Example: after training your model (replace `model` with your actual model variable)
-os.makedirs("models", exist_ok=True)
-with open("models/chatbot_model.pkl", "wb") as f:
-    pickle.dump(model, f)
+# Everything one prediction reads plus where it came from, published by load_model with a single assignment
+ServingState = namedtuple('ServingState', 'model tokenizer label_encoder max_sequence_length '
+                                          'backend bundle_info load_seconds', defaults=(None, None, None))
 
-print("✅ Model saved at models/chatbot_model.pkl")
+# TensorFlow/Keras and scikit-learn are imported inside the methods that need
+# them. Importing them takes seconds, and the rule-based path
+# (extract_symptoms/analyze_symptoms) should answer without waiting for that.
 
 class MedicalChatbotLSTM:
+    # Stand-in LSTM result used while the model is still loading, or when the
+    # cascade skips the models; its confidence is below the 0.3 cut-off so
+    # _generate_response ignores it
+    PENDING_LSTM_PREDICTION = {'disease': 'No Disease', 'confidence': 0.0, 'probabilities': None, 'source': 'Rules'}
+    
+    # Symptoms that make _generate_response answer with the emergency warning alone
+    EMERGENCY_SYMPTOMS = ('shortness of breath', 'chest pain', 'difficulty breathing', 'unconsciousness')
+    
+    # Artifacts each inference backend loads, as suffixes of the saved model prefix
+    BACKEND_FILES = {
+        'keras': ('_model.h5', '_tokenizer.pkl', '_label_encoder.pkl'),
+        'numpy': ('_weights.npz',),
+        'mmap': ('_mmap',),
+        'bundle': ('.bundle',),
+        'student': ('_student.npz',),
+        'int8': ('_int8.npz',),
+    }
+    
+    # Negative training samples (no clear disease)
+    NEGATIVE_TEXTS = (
+        "I feel fine today",
+        "Just a little tired",
+        "Minor headache",
+        "Slight discomfort",
+        "Feeling okay",
+        "No major issues",
+        "Just need some rest",
+        "Feeling a bit off"
+    )
+    
+    # Training sentence templates for two symptoms and for one symptom
+    PAIR_TEMPLATES = (
+        "I have {} and {}",
+        "Experiencing {} with {}",
+        "Suffering from {} and {}",
+        "Feeling {} and {}",
+        "Having {} along with {}",
+        "I'm experiencing {} and {}",
+        "Symptoms include {} and {}",
+        "I feel {} and {}"
+    )
+    SINGLE_TEMPLATES = (
+        "I have {}",
+        "Experiencing {}",
+        "Suffering from {}",
+        "Feeling {}",
+        "Having {}",
+        "I'm experiencing {}",
+        "Symptom: {}",
+        "I feel {}"
+    )
+    
     def __init__(self):
+        self._serving = None
         self.model = None
-        self.tokenizer = Tokenizer()
-        self.label_encoder = LabelEncoder()
+        self.tokenizer = None
+        self._inference_tokenizer = None
+        self.label_encoder = None
         self.max_sequence_length = 50
         self.vocab_size = 1000
         self.embedding_dim = 128
         self.lstm_units = 128
+        self.inference_batch_size = 512
+        # Sequences are padded only up to the smallest bucket that fits them
+        self.length_buckets = (8, 16, 32)
+        self.bucket_by_length = True
+        self._micro_batcher = None
+        self._loading_thread = None
+        self._reload_thread = None
+        self._reload_lock = threading.Lock()
+        self.response_cache = None
+        self.instrumentation = None
+        self.cascade = None
+        self.session_store = None
+        self.load_error = None
         self.disease_database = self._create_disease_database()
+        self.symptom_index = SymptomIndex(self.disease_database)
         self.symptom_synonyms = self._create_symptom_synonyms()
+        self.symptom_matcher = SymptomMatcher(self.symptom_synonyms)
+        self.fuzzy_index = None
+        self.multilingual = None
         
     def _create_disease_database(self):
         """Create comprehensive disease database with symptoms"""
@@ -132,99 +214,106 @@ class MedicalChatbotLSTM:
             'skin rash': ['skin rash', 'rash', 'red spots', 'skin irritation', 'dermatitis']
         }
     
-    def generate_training_data(self, num_samples=10000):
+    def generate_training_data(self, num_samples=10000, seed=None, processes=1):
         """Generate synthetic training data for the LSTM model"""
         print("Generating training data...")
         
         texts = []
         labels = []
         
-        for disease, info in self.disease_database.items():
-            symptoms = info['symptoms']
-            
-            # Generate multiple variations for each disease
-            for _ in range(num_samples // len(self.disease_database)):
-                # Create symptom combinations
-                num_symptoms = np.random.randint(2, min(6, len(symptoms) + 1))
-                selected_symptoms = np.random.choice(symptoms, num_symptoms, replace=False)
-                
-                # Create natural language text
-                text_variations = self._create_text_variations(selected_symptoms)
-                
-                for text in text_variations:
-                    texts.append(text)
-                    labels.append(disease)
-        
-        # Add some negative samples (no clear disease)
-        negative_texts = [
-            "I feel fine today",
-            "Just a little tired",
-            "Minor headache",
-            "Slight discomfort",
-            "Feeling okay",
-            "No major issues",
-            "Just need some rest",
-            "Feeling a bit off"
-        ]
-        
-        for text in negative_texts:
+        for text, label in self.iter_training_samples(num_samples, seed=seed, processes=processes):
             texts.append(text)
-            labels.append('No Disease')
+            labels.append(label)
         
         return texts, labels
     
-    def _create_text_variations(self, symptoms):
+    def iter_training_samples(self, num_samples=10000, seed=None, processes=1, chunk_iterations=50):
+        """Yield (text, disease) training samples lazily
+        
+        The corpus is produced in units of ``chunk_iterations`` symptom
+        combinations per disease, interleaved across diseases. With a
+        ``seed`` every unit gets its own RNG derived from (seed, unit), so
+        the stream is identical whether it is generated in this process or
+        by ``processes`` worker processes.
+        """
+        if processes > 1 and seed is None:
+            # Forked workers would inherit the same global RNG state and repeat each other
+            seed = int(np.random.randint(2 ** 31))
+        
+        units = self._training_units(num_samples, seed, chunk_iterations)
+        if processes > 1:
+            results = ordered_parallel_map(self._generate_disease_samples, units, processes)
+        else:
+            results = (self._generate_disease_samples(*unit) for unit in units)
+        
+        for disease, texts in results:
+            for text in texts:
+                yield text, disease
+        
+        for text in self.NEGATIVE_TEXTS:
+            yield text, 'No Disease'
+    
+    def _training_units(self, num_samples, seed, chunk_iterations):
+        """(disease, symptoms, iterations, seed) work units for iter_training_samples"""
+        iterations = num_samples // len(self.disease_database)
+        for start in range(0, iterations, chunk_iterations):
+            for disease_id, (disease, info) in enumerate(self.disease_database.items()):
+                unit_seed = None
+                if seed is not None:
+                    unit_seed = np.random.SeedSequence(seed, spawn_key=(start, disease_id)).generate_state(1)[0]
+                yield disease, info['symptoms'], min(chunk_iterations, iterations - start), unit_seed
+    
+    @staticmethod
+    def _generate_disease_samples(disease, symptoms, iterations, seed=None):
+        """Text variations for ``iterations`` random symptom combinations of one disease"""
+        rng = np.random if seed is None else np.random.RandomState(seed)
+        texts = []
+        
+        for _ in range(iterations):
+            # Create symptom combinations
+            num_symptoms = rng.randint(2, min(6, len(symptoms) + 1))
+            selected_symptoms = rng.choice(symptoms, num_symptoms, replace=False)
+            
+            # Create natural language text
+            texts.extend(MedicalChatbotLSTM._create_text_variations(selected_symptoms))
+        
+        return disease, texts
+    
+    @staticmethod
+    def _create_text_variations(symptoms):
         """Create natural language variations of symptom descriptions"""
         variations = []
         
-        # Template-based variations
-        templates = [
-            "I have {} and {}",
-            "Experiencing {} with {}",
-            "Suffering from {} and {}",
-            "Feeling {} and {}",
-            "Having {} along with {}",
-            "I'm experiencing {} and {}",
-            "Symptoms include {} and {}",
-            "I feel {} and {}"
-        ]
-        
         # Create variations with different symptom combinations
         for i in range(len(symptoms)):
             for j in range(i + 1, len(symptoms)):
-                for template in templates:
+                for template in MedicalChatbotLSTM.PAIR_TEMPLATES:
                     text = template.format(symptoms[i], symptoms[j])
                     variations.append(text.lower())
         
         # Add single symptom descriptions
         for symptom in symptoms:
-            variations.extend([
-                f"I have {symptom}",
-                f"Experiencing {symptom}",
-                f"Suffering from {symptom}",
-                f"Feeling {symptom}",
-                f"Having {symptom}",
-                f"I'm experiencing {symptom}",
-                f"Symptom: {symptom}",
-                f"I feel {symptom}"
-            ])
+            variations.extend(template.format(symptom) for template in MedicalChatbotLSTM.SINGLE_TEMPLATES)
         
         return variations
     
+    def _clean_text(self, text):
+        """Normalize text the same way for training and inference"""
+        # Lowercase, remove special characters but keep spaces, remove extra spaces
+        return clean_text(text)
+    
     def preprocess_text(self, texts):
         """Preprocess text data for LSTM model"""
         # Clean text
-        cleaned_texts = []
-        for text in texts:
-            # Convert to lowercase
-            text = text.lower()
-            # Remove special characters but keep spaces
-            text = re.sub(r'[^a-zA-Z\s]', '', text)
-            # Remove extra spaces
-            text = ' '.join(text.split())
-            cleaned_texts.append(text)
+        cleaned_texts = [self._clean_text(text) for text in texts]
+        
+        from tensorflow.keras.preprocessing.text import Tokenizer
+        from tensorflow.keras.preprocessing.sequence import pad_sequences
         
         # Tokenize
+        if self.tokenizer is None:
+            # Words ranked below vocab_size would fall outside the embedding table
+            self.tokenizer = Tokenizer(num_words=self.vocab_size)
         self.tokenizer.fit_on_texts(cleaned_texts)
         sequences = self.tokenizer.texts_to_sequences(cleaned_texts)
         
@@ -233,10 +322,103 @@ class MedicalChatbotLSTM:
         
         return padded_sequences
     
+    def fit_tokenizer_on_stream(self, num_samples=10000, seed=None, processes=1, chunk_size=10000):
+        """Fit the tokenizer chunk by chunk without holding the whole corpus
+        
+        Keras accumulates word counts across fit_on_texts calls, so the
+        vocabulary equals the one preprocess_text builds from the full list.
+        """
+        from tensorflow.keras.preprocessing.text import Tokenizer
+        
+        if self.tokenizer is None:
+            self.tokenizer = Tokenizer(num_words=self.vocab_size)
+        samples = self.iter_training_samples(num_samples, seed=seed, processes=processes)
+        for chunk in chunked(samples, chunk_size):
+            self.tokenizer.fit_on_texts([self._clean_text(text) for text, _ in chunk])
+        return self.tokenizer
+    
+    def _training_classes(self):
+        """Every label iter_training_samples can produce"""
+        return sorted(set(self.disease_database) | {'No Disease'})
+    
+    @staticmethod
+    def _is_validation_sample(index, validation_split):
+        # Deterministic by stream position, so both subsets can be regenerated every epoch
+        return index % 100 < validation_split * 100
+    
+    def iter_training_batches(self, batch_size=32, num_samples=10000, seed=None, processes=1,
+                              subset=None, validation_split=0.2, shuffle_buffer=10000,
+                              shuffle_seed=None, bucket_by_length=True):
+        """Yield (padded int32 token ids, label ids) batches generated on the fly
+        
+        Needs a fitted tokenizer and label encoder. ``subset`` selects the
+        'train' or 'validation' part of the stream. Memory stays bounded by
+        ``shuffle_buffer`` samples plus the units being generated, however
+        large ``num_samples`` is. With ``bucket_by_length`` each batch is
+        padded only to its length bucket, as in _bucketed_dataset.
+        """
+        label_ids = {label: index for index, label in enumerate(self.label_encoder.classes_)}
+        if bucket_by_length:
+            bucket_sizes = self._bucket_boundaries() + [self.max_sequence_length]
+        else:
+            bucket_sizes = [self.max_sequence_length]
+        
+        samples = self.iter_training_samples(num_samples, seed=seed, processes=processes)
+        if subset is not None:
+            want_validation = subset == 'validation'
+            samples = (
+                sample for index, sample in enumerate(samples)
+                if self._is_validation_sample(index, validation_split) == want_validation
+            )
+        if shuffle_buffer:
+            samples = shuffle_stream(samples, shuffle_buffer, np.random.RandomState(shuffle_seed))
+        
+        bins = {size: ([], []) for size in bucket_sizes}
+        for chunk in chunked(samples, batch_size * len(bucket_sizes)):
+            sequences = self.tokenizer.texts_to_sequences([self._clean_text(text) for text, _ in chunk])
+            for sequence, (_, label) in zip(sequences, chunk):
+                length = min(len(sequence), self.max_sequence_length)
+                size = next(size for size in bucket_sizes if length <= size)
+                bin_sequences, bin_labels = bins[size]
+                bin_sequences.append(sequence)
+                bin_labels.append(label_ids[label])
+                if len(bin_sequences) == batch_size:
+                    yield pad_sequences_post(bin_sequences, size), np.array(bin_labels, dtype=np.int64)
+                    bins[size] = ([], [])
+        
+        for size, (bin_sequences, bin_labels) in bins.items():
+            if bin_sequences:
+                yield pad_sequences_post(bin_sequences, size), np.array(bin_labels, dtype=np.int64)
+    
+    def _streaming_dataset(self, batch_size, num_samples, seed, processes, subset, shuffle_buffer, bucket_by_length):
+        """tf.data wrapper around iter_training_batches, regenerated every epoch"""
+        import itertools
+        import tensorflow as tf
+        
+        epochs = itertools.count()
+        
+        def batches():
+            # A fresh shuffle order per epoch over the same generated corpus
+            shuffle_seed = seed + next(epochs) if shuffle_buffer else None
+            return self.iter_training_batches(
+                batch_size, num_samples, seed=seed, processes=processes, subset=subset,
+                shuffle_buffer=shuffle_buffer, shuffle_seed=shuffle_seed, bucket_by_length=bucket_by_length
+            )
+        
+        dataset = tf.data.Dataset.from_generator(batches, output_signature=(
+            tf.TensorSpec(shape=(None, None), dtype=tf.int32),
+            tf.TensorSpec(shape=(None,), dtype=tf.int64),
+        ))
+        return dataset.prefetch(tf.data.AUTOTUNE)
+    
     def build_lstm_model(self, num_classes):
         """Build LSTM model architecture"""
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import LSTM, Dense, Dropout, Embedding
+        
         model = Sequential([
-            Embedding(self.vocab_size, self.embedding_dim, input_length=self.max_sequence_length),
+            # mask_zero lets the LSTMs skip padding, so any padded length gives the same output
+            Embedding(self.vocab_size, self.embedding_dim, mask_zero=True),
             LSTM(self.lstm_units, return_sequences=True),
             Dropout(0.3),
             LSTM(self.lstm_units // 2),
@@ -245,6 +427,8 @@ class MedicalChatbotLSTM:
             Dropout(0.3),
             Dense(num_classes, activation='softmax')
         ])
+        # Built up front so BackupAndRestore can load a checkpoint into it before fit()
+        model.build((None, None))
         
         model.compile(
             optimizer='adam',
@@ -254,18 +438,63 @@ class MedicalChatbotLSTM:
         
         return model
     
-    def train_model(self, epochs=50, batch_size=32):
-        """Train the LSTM model"""
-        print("Training LSTM model...")
+    def _bucket_boundaries(self, max_sequence_length=None):
+        max_sequence_length = max_sequence_length or self.max_sequence_length
+        return [bucket for bucket in self.length_buckets if bucket < max_sequence_length]
+    
+    def _bucketed_dataset(self, X, y, batch_size, shuffle):
+        """tf.data pipeline that batches sequences of similar length, padded to the batch maximum"""
+        import tensorflow as tf
         
-        # Generate training data
-        texts, labels = self.generate_training_data()
+        # Post-padded and ids start at 1, so the non-zero count is the length
+        lengths = np.count_nonzero(X, axis=1)
+        dataset = tf.data.Dataset.from_tensor_slices((X, lengths, y))
+        if shuffle:
+            dataset = dataset.shuffle(len(X), seed=42, reshuffle_each_iteration=True)
         
-        # Preprocess text
-        X = self.preprocess_text(texts)
+        # Strip the fixed padding (keeping one masked step for empty texts) and re-pad per batch
+        dataset = dataset.map(lambda x, length, label: (x[:tf.maximum(length, 1)], label))
+        boundaries = [bucket + 1 for bucket in self._bucket_boundaries()]
+        dataset = dataset.bucket_by_sequence_length(
+            element_length_func=lambda x, label: tf.shape(x)[0],
+            bucket_boundaries=boundaries,
+            bucket_batch_sizes=[batch_size] * (len(boundaries) + 1)
+        )
+        return dataset.prefetch(tf.data.AUTOTUNE)
+    
+    def train_model(self, epochs=50, batch_size=32, num_samples=10000, bucket_by_length=True,
+                    streaming=False, seed=None, processes=1, shuffle_buffer=10000, cache_dir=None,
+                    checkpoint_dir=None, patience=None):
+        """Train the LSTM model
         
-        # Encode labels
-        y = self.label_encoder.fit_transform(labels)
+        With ``streaming`` the corpus is never materialized: the tokenizer is
+        fitted in one pass over the generator and every epoch regenerates
+        the batches from the same ``seed``. Otherwise ``cache_dir`` keeps the
+        tokenized corpus between runs (see prepare_training_data).
+        
+        ``checkpoint_dir`` saves the model and optimizer after every epoch;
+        rerunning an interrupted call with the same arguments and ``seed``
+        resumes from the last finished epoch. ``patience`` stops once
+        validation accuracy has not improved for that many epochs and keeps
+        the best weights.
+        """
+        # Predictions follow the attributes being trained, not a loaded snapshot;
+        # training continues from the loaded model's tokenizer and settings
+        state = self._serving
+        if state is not None:
+            self._model, self._tokenizer, self._label_encoder, self._max_sequence_length = state[:4]
+        self._serving = None
+        if streaming:
+            return self._train_streaming(epochs, batch_size, num_samples, bucket_by_length,
+                                         seed, processes, shuffle_buffer, checkpoint_dir, patience)
+        
+        from sklearn.model_selection import train_test_split
+        
+        print("Training LSTM model...")
+        
+        start = time.perf_counter()
+        X, y = self.prepare_training_data(num_samples, seed=seed, processes=processes, cache_dir=cache_dir)
+        print(f"Training corpus ready in {time.perf_counter() - start:.2f}s")
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
@@ -277,105 +506,733 @@ class MedicalChatbotLSTM:
         self.model = self.build_lstm_model(num_classes)
         
         # Train model
-        history = self.model.fit(
-            X_train, y_train,
-            epochs=epochs,
-            batch_size=batch_size,
-            validation_data=(X_test, y_test),
-            verbose=1
-        )
+        callbacks = self._training_callbacks(checkpoint_dir, patience)
+        if bucket_by_length:
+            # Batches padded only to their longest sequence instead of max_sequence_length
+            train_data = self._bucketed_dataset(X_train, y_train, batch_size, shuffle=True)
+            test_data = self._bucketed_dataset(X_test, y_test, batch_size, shuffle=False)
+            history = self.model.fit(train_data, epochs=epochs, validation_data=test_data,
+                                     callbacks=callbacks, verbose=1)
+        else:
+            test_data = None
+            history = self.model.fit(
+                X_train, y_train,
+                epochs=epochs,
+                batch_size=batch_size,
+                validation_data=(X_test, y_test),
+                callbacks=callbacks,
+                verbose=1
+            )
+        
+        self._invalidate_caches()
         
         # Evaluate model
-        test_loss, test_accuracy = self.model.evaluate(X_test, y_test, verbose=0)
+        if test_data is not None:
+            test_loss, test_accuracy = self.model.evaluate(test_data, verbose=0)
+        else:
+            test_loss, test_accuracy = self.model.evaluate(X_test, y_test, verbose=0)
+        print(f"\nTest Accuracy: {test_accuracy:.4f}")
+        
+        return history
+    
+    def prepare_training_data(self, num_samples=10000, seed=None, processes=1, cache_dir=None):
+        """Generate, tokenize and pad the training corpus; returns (sequences, label ids)
+        
+        Fits ``self.tokenizer`` and ``self.label_encoder`` along the way. With
+        ``cache_dir`` and a ``seed`` the result is stored on disk, keyed by a
+        hash of the disease database, synonyms, templates, seed and
+        preprocessing settings. A later call with the same inputs loads the
+        memory-mapped arrays and the tokenizer instead of regenerating. A
+        tokenizer that is already fitted keeps accumulating word counts, as
+        preprocess_text does, so the cache is only used without one.
+        """
+        from sklearn.preprocessing import LabelEncoder
+        
+        cache = None
+        if cache_dir is not None and seed is not None and self.tokenizer is None:
+            cache = CorpusCache(cache_dir)
+            key = self._corpus_cache_key(num_samples, seed)
+            cached = cache.load(key)
+            if cached is not None:
+                from tensorflow.keras.preprocessing.text import tokenizer_from_json
+                
+                arrays, tokenizer_json = cached
+                self.tokenizer = tokenizer_from_json(tokenizer_json)
+                self.label_encoder = LabelEncoder().fit(arrays['classes'])
+                print(f"Loaded the training corpus from {cache.path(key)}")
+                return arrays['sequences'], arrays['labels']
+        
+        # Generate training data
+        texts, labels = self.generate_training_data(num_samples, seed=seed, processes=processes)
+        
+        # Preprocess text
+        X = self.preprocess_text(texts)
+        
+        # Encode labels
+        self.label_encoder = LabelEncoder()
+        y = self.label_encoder.fit_transform(labels)
+        
+        if cache is not None:
+            path = cache.save(key, {'sequences': X, 'labels': y, 'classes': self.label_encoder.classes_.astype(str)},
+                              self.tokenizer.to_json())
+            print(f"Training corpus cached in {path}")
+        return X, y
+    
+    def _corpus_cache_key(self, num_samples, seed):
+        # Everything generate_training_data and preprocess_text read; the number
+        # of processes is left out because it does not change the output. Code
+        # changes to either bump CORPUS_CACHE_VERSION instead
+        return corpus_key(
+            disease_database=disease_database_version(self.disease_database),
+            symptom_synonyms=self.symptom_synonyms,
+            pair_templates=self.PAIR_TEMPLATES,
+            single_templates=self.SINGLE_TEMPLATES,
+            negative_texts=self.NEGATIVE_TEXTS,
+            num_samples=num_samples,
+            seed=seed,
+            max_sequence_length=self.max_sequence_length,
+            vocab_size=self.vocab_size,
+        )
+    
+    def _training_callbacks(self, checkpoint_dir=None, patience=None):
+        """Keras callbacks for resumable training and early stopping"""
+        from tensorflow.keras.callbacks import BackupAndRestore, EarlyStopping
+        
+        callbacks = []
+        if checkpoint_dir is not None:
+            # Restores the last finished epoch on the next fit() and is deleted once fit() completes
+            callbacks.append(BackupAndRestore(checkpoint_dir))
+        if patience:
+            callbacks.append(EarlyStopping(monitor='val_accuracy', patience=patience,
+                                           restore_best_weights=True, verbose=1))
+        return callbacks
+    
+    def _train_streaming(self, epochs, batch_size, num_samples, bucket_by_length, seed, processes, shuffle_buffer,
+                         checkpoint_dir=None, patience=None):
+        from sklearn.preprocessing import LabelEncoder
+        
+        print("Training LSTM model on streamed data...")
+        
+        if seed is None:
+            # Each epoch regenerates the corpus, so it must come out the same every time
+            seed = int(np.random.randint(2 ** 31))
+        
+        self.fit_tokenizer_on_stream(num_samples, seed=seed, processes=processes)
+        self.label_encoder = LabelEncoder().fit(self._training_classes())
+        
+        train_data = self._streaming_dataset(batch_size, num_samples, seed, processes, 'train',
+                                             shuffle_buffer, bucket_by_length)
+        test_data = self._streaming_dataset(batch_size, num_samples, seed, processes, 'validation',
+                                            0, bucket_by_length)
+        
+        self.model = self.build_lstm_model(len(self.label_encoder.classes_))
+        history = self.model.fit(train_data, epochs=epochs, validation_data=test_data,
+                                 callbacks=self._training_callbacks(checkpoint_dir, patience), verbose=1)
+        
+        self._invalidate_caches()
+        
+        test_loss, test_accuracy = self.model.evaluate(test_data, verbose=0)
         print(f"\nTest Accuracy: {test_accuracy:.4f}")
         
         return history
     
     def predict_disease(self, text):
         """Predict disease from text input"""
+        if self._micro_batcher is not None:
+            # Coalesced with concurrent callers into one forward pass
+            return self._micro_batcher.submit(text).result()
+        
+        return self.predict_diseases([text])[0]
+    
+    def predict_diseases(self, texts):
+        """Predict diseases for a batch of texts using one forward pass per chunk"""
         if self.model is None:
             raise ValueError("Model not trained. Please train the model first.")
         
-        # Preprocess input text
-        cleaned_text = text.lower()
-        cleaned_text = re.sub(r'[^a-zA-Z\s]', '', cleaned_text)
-        cleaned_text = ' '.join(cleaned_text.split())
+        texts = list(texts)
+        if not texts:
+            return []
         
-        # Tokenize and pad
-        sequence = self.tokenizer.texts_to_sequences([cleaned_text])
-        padded_sequence = pad_sequences(sequence, maxlen=self.max_sequence_length, padding='post')
+        metrics = self.instrumentation
+        if metrics is not None:
+            stage_start = time.perf_counter()
         
-        # Predict
-        prediction = self.model.predict(padded_sequence)
-        predicted_class = np.argmax(prediction[0])
-        confidence = np.max(prediction[0])
+        # Preprocess all input texts at once
+        cleaned_texts = [self._clean_text(text) for text in texts]
         
-        # Get disease name
-        disease_name = self.label_encoder.inverse_transform([predicted_class])[0]
+        if metrics is not None:
+            metrics.lap('clean_text', stage_start)
         
-        return {
-            'disease': disease_name,
-            'confidence': confidence,
-            'probabilities': prediction[0]
-        }
+        cache = self.response_cache
+        if cache is None:
+            return self._predict_cleaned(cleaned_texts)
+        
+        # Only texts that miss the level-1 cache go through the model
+        generation = cache.predictions.generation
+        results = [cache.predictions.get(cleaned_text) for cleaned_text in cleaned_texts]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            computed = self._predict_cleaned([cleaned_texts[i] for i in missing])
+            for i, prediction in zip(missing, computed):
+                results[i] = prediction
+                cache.predictions.put(cleaned_texts[i], prediction, generation)
+        
+        return results
+    
+    def _predict_cleaned(self, cleaned_texts):
+        """Run the LSTM on already-cleaned texts"""
+        metrics = self.instrumentation
+        if metrics is not None:
+            stage_start = time.perf_counter()
+        
+        # One snapshot for the whole batch, so a hot reload never mixes two models
+        state = self._serving_state()
+        tokenizer = self._get_inference_tokenizer(state.tokenizer)
+        sequences = tokenizer.texts_to_sequences(cleaned_texts)
+        
+        if metrics is not None:
+            stage_start = metrics.lap('texts_to_sequences', stage_start)
+        
+        if self.bucket_by_length and self._model_masks_padding(state.model):
+            groups = self._length_groups(sequences, tokenizer, state.max_sequence_length)
+        else:
+            # Without masking the padded steps change the output, so keep the trained length
+            groups = [(np.arange(len(sequences)), tokenizer.pad(sequences, state.max_sequence_length))]
+        
+        if metrics is not None:
+            stage_start = metrics.lap('pad_sequences', stage_start)
+        
+        # Predict in chunks; predict_on_batch skips the per-call setup cost of predict()
+        predictions = None
+        for indices, padded_sequences in groups:
+            for start in range(0, len(padded_sequences), self.inference_batch_size):
+                chunk = padded_sequences[start:start + self.inference_batch_size]
+                probabilities = np.asarray(state.model.predict_on_batch(chunk))
+                if predictions is None:
+                    predictions = np.empty((len(sequences), probabilities.shape[1]), dtype=probabilities.dtype)
+                predictions[indices[start:start + self.inference_batch_size]] = probabilities
+        
+        if metrics is not None:
+            stage_start = metrics.lap('model_predict', stage_start)
+        
+        predicted_classes = np.argmax(predictions, axis=1)
+        confidences = predictions[np.arange(len(predictions)), predicted_classes]
+        
+        # Get disease names
+        disease_names = state.label_encoder.inverse_transform(predicted_classes)
+        source = getattr(state.model, 'source', 'LSTM')
+        
+        if metrics is not None:
+            metrics.lap('inverse_transform', stage_start)
+        
+        return [
+            {
+                'disease': disease_name,
+                'confidence': confidence,
+                'probabilities': probabilities,
+                'source': source
+            }
+            for disease_name, confidence, probabilities in zip(disease_names, confidences, predictions)
+        ]
+    
+    def _serving_state(self):
+        """The model published by load_model, or the attributes of one trained in process"""
+        state = self._serving
+        if state is None:
+            return ServingState(self._model, self._tokenizer, self._label_encoder, self._max_sequence_length)
+        return state
+    
+    # The model attributes read through to the published state, so a reload
+    # is never seen half done. Assigning them sets the in-process model that
+    # train_model builds; it is used while nothing is published.
+    @property
+    def model(self):
+        return self._serving_state().model
+    
+    @model.setter
+    def model(self, model):
+        self._model = model
+    
+    @property
+    def tokenizer(self):
+        return self._serving_state().tokenizer
+    
+    @tokenizer.setter
+    def tokenizer(self, tokenizer):
+        self._tokenizer = tokenizer
+    
+    @property
+    def label_encoder(self):
+        return self._serving_state().label_encoder
+    
+    @label_encoder.setter
+    def label_encoder(self, label_encoder):
+        self._label_encoder = label_encoder
+    
+    @property
+    def max_sequence_length(self):
+        return self._serving_state().max_sequence_length
+    
+    @max_sequence_length.setter
+    def max_sequence_length(self, max_sequence_length):
+        self._max_sequence_length = max_sequence_length
+    
+    @property
+    def model_backend(self):
+        return self._serving_state().backend
+    
+    @property
+    def bundle_info(self):
+        return self._serving_state().bundle_info
+    
+    @property
+    def model_load_seconds(self):
+        return self._serving_state().load_seconds
+    
+    def _model_masks_padding(self, model=None):
+        """True if the loaded model ignores zero padding (Embedding mask_zero)"""
+        model = model if model is not None else self.model
+        mask_zero = getattr(model, 'mask_zero', None)
+        if mask_zero is None:
+            layers = getattr(model, 'layers', None)
+            mask_zero = bool(layers) and getattr(layers[0], 'mask_zero', False)
+        return bool(mask_zero)
+    
+    def _get_inference_tokenizer(self, tokenizer=None):
+        """InferenceTokenizer for the current tokenizer, rebuilt when the tokenizer changes"""
+        tokenizer = tokenizer if tokenizer is not None else self.tokenizer
+        inference_tokenizer = self._inference_tokenizer
+        if inference_tokenizer is None or inference_tokenizer[0] is not tokenizer:
+            inference_tokenizer = (tokenizer, InferenceTokenizer.from_tokenizer(tokenizer))
+            self._inference_tokenizer = inference_tokenizer
+        return inference_tokenizer[1]
+    
+    def _length_groups(self, sequences, tokenizer, max_sequence_length=None):
+        """Group sequences by length bucket, each padded only to its bucket size"""
+        max_sequence_length = max_sequence_length or self.max_sequence_length
+        bucket_sizes = self._bucket_boundaries(max_sequence_length) + [max_sequence_length]
+        members = {}
+        for index, sequence in enumerate(sequences):
+            length = min(len(sequence), max_sequence_length)
+            bucket = next(size for size in bucket_sizes if length <= size)
+            members.setdefault(bucket, []).append(index)
+        
+        return [
+            (np.array(indices), tokenizer.pad([sequences[i] for i in indices], bucket))
+            for bucket, indices in sorted(members.items())
+        ]
+    
+    def enable_micro_batching(self, max_batch_size=64, max_wait_ms=5.0):
+        """Coalesce concurrent predict_disease calls into batched forward passes"""
+        self.disable_micro_batching()
+        self._micro_batcher = MicroBatcher(
+            self.predict_diseases,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms
+        )
+        self._micro_batcher.start()
+        return self._micro_batcher
+    
+    def disable_micro_batching(self):
+        """Stop the micro-batching worker and return to direct predictions"""
+        if self._micro_batcher is not None:
+            self._micro_batcher.stop()
+            self._micro_batcher = None
     
     def extract_symptoms(self, text):
         """Extract symptoms from text using synonym matching"""
-        symptoms = []
-        text_lower = text.lower()
-        
-        for symptom, synonyms in self.symptom_synonyms.items():
-            for synonym in synonyms:
-                if synonym in text_lower:
-                    symptoms.append(symptom)
-                    break
+        corrected = self.fuzzy_index.correct(text) if self.fuzzy_index is not None else text
+        symptoms = self.symptom_matcher.extract(corrected)
+        if self.multilingual is not None:
+            symptoms.extend(symptom for symptom in self.multilingual.extract(text) if symptom not in symptoms)
+        return symptoms
+    
+    def extract_symptom_matches(self, text):
+        """Return every exact synonym match in text with its symptom and character span"""
+        return self.symptom_matcher.find_matches(text)
+    
+    def load_disease_database(self, db_path):
+        """Replace the built-in disease database with one loaded from JSON"""
+        with open(db_path, 'r') as f:
+            self.disease_database = json.load(f)
+        self.symptom_index = SymptomIndex(self.disease_database)
+        self._invalidate_caches()
+    
+    def analyze_symptoms(self, symptoms, top_k=None):
+        """Analyze symptoms and provide disease predictions, best first"""
+        cache = self.response_cache
+        if cache is None:
+            return self.symptom_index.score(symptoms, top_k=top_k)
         
-        return list(set(symptoms))  # Remove duplicates
+        key = (frozenset(symptoms), top_k)
+        generation = cache.analyses.generation
+        predictions = cache.analyses.get(key)
+        if predictions is None:
+            predictions = self.symptom_index.score(symptoms, top_k=top_k)
+            cache.analyses.put(key, predictions, generation)
+        else:
+            # Every order of the same symptoms shares the entry; matched_symptoms follows this caller's order
+            ordered = dict.fromkeys(symptoms)
+            for prediction in predictions:
+                matched = set(prediction['matched_symptoms'])
+                prediction['matched_symptoms'] = [symptom for symptom in ordered if symptom in matched]
+        return predictions
     
-    def analyze_symptoms(self, symptoms):
-        """Analyze symptoms and provide disease predictions"""
-        predictions = []
+    def analyze_symptoms_batch(self, symptom_lists, top_k=None):
+        """Analyze many symptom lists with a single sparse matrix product"""
+        if self.response_cache is not None:
+            # Cached lookups beat the matrix product once the cache is warm
+            return [self.analyze_symptoms(symptoms, top_k=top_k) for symptoms in symptom_lists]
+        return self.symptom_index.score_batch(symptom_lists, top_k=top_k)
+    
+    def enable_response_cache(self, max_entries=10000, max_bytes=64 * 1024 * 1024, ttl=None):
+        """Cache LSTM predictions by normalized text and analyses by symptom set"""
+        self.response_cache = ResponseCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+        return self.response_cache
+    
+    def disable_response_cache(self):
+        self.response_cache = None
+    
+    def cache_stats(self):
+        """Hit/miss/eviction counters for both cache levels, or None if disabled"""
+        return self.response_cache.stats() if self.response_cache is not None else None
+    
+    def enable_instrumentation(self, trace_history=100, trace_sink=None):
+        """Record per-stage latency histograms, counters and per-request traces"""
+        self.instrumentation = Instrumentation(trace_history=trace_history, trace_sink=trace_sink)
+        return self.instrumentation
+    
+    def disable_instrumentation(self):
+        self.instrumentation = None
+    
+    def prometheus_metrics(self):
+        """Stage histograms, counters, cache and model-load metrics in Prometheus text format"""
+        lines = self.instrumentation.prometheus_lines() if self.instrumentation is not None else []
         
-        for disease_name, disease_info in self.disease_database.items():
-            disease_symptoms = set(disease_info['symptoms'])
-            user_symptoms = set(symptoms)
-            
-            # Calculate overlap
-            overlap = len(disease_symptoms.intersection(user_symptoms))
-            total_disease_symptoms = len(disease_symptoms)
-            
-            if overlap > 0:
-                confidence = overlap / total_disease_symptoms
-                predictions.append({
-                    'disease': disease_name,
-                    'confidence': confidence,
-                    'matched_symptoms': list(disease_symptoms.intersection(user_symptoms)),
-                    'total_symptoms': total_disease_symptoms,
-                    'severity': disease_info['severity'],
-                    'description': disease_info['description'],
-                    'recommendations': disease_info['recommendations']
-                })
+        if self.model_load_seconds is not None:
+            lines += prometheus_family(
+                f'{METRIC_PREFIX}_model_load_seconds', 'gauge', "Duration of the last load_model call",
+                [({'backend': self.model_backend}, self.model_load_seconds)]
+            )
         
-        # Sort by confidence
-        predictions.sort(key=lambda x: x['confidence'], reverse=True)
+        cascade_stats = self.cascade_stats()
+        if cascade_stats is not None:
+            lines += prometheus_family(
+                f'{METRIC_PREFIX}_cascade_answers_total', 'counter', "Messages answered by each cascade tier",
+                [({'tier': tier}, count) for tier, count in cascade_stats['hits'].items()]
+            )
         
-        return predictions
+        session_stats = self.session_stats()
+        if session_stats is not None:
+            lines += prometheus_family(f'{METRIC_PREFIX}_sessions', 'gauge', "Live chat sessions",
+                                       [({}, session_stats['sessions'])])
+            lines += prometheus_family(f'{METRIC_PREFIX}_session_bytes', 'gauge',
+                                       "Approximate memory held by chat sessions", [({}, session_stats['bytes'])])
+        
+        stats = self.cache_stats()
+        if stats is not None:
+            for field, metric_type in (('hits', 'counter'), ('misses', 'counter'), ('evictions', 'counter'),
+                                       ('entries', 'gauge'), ('bytes', 'gauge')):
+                name = f'{METRIC_PREFIX}_cache_{field}' + ('_total' if metric_type == 'counter' else '')
+                lines += prometheus_family(
+                    name, metric_type, f"Response cache {field} per level",
+                    [({'level': level}, level_stats[field]) for level, level_stats in stats.items()]
+                )
+        
+        return '\n'.join(lines) + '\n'
+    
+    def enable_cascade(self, bow_model_path=DEFAULT_BOW_MODEL_PATH, bow_threshold=0.6):
+        """Answer from rules or the bag-of-words model when they suffice, the LSTM otherwise"""
+        self.cascade = InferenceCascade.load(bow_model_path, bow_threshold=bow_threshold)
+        # Cached responses were produced by the previous routing
+        self._invalidate_caches()
+        return self.cascade
+    
+    def disable_cascade(self):
+        self.cascade = None
+        self._invalidate_caches()
+    
+    def cascade_stats(self):
+        """Per-tier hit counts and rates, or None if the cascade is disabled"""
+        return self.cascade.stats() if self.cascade is not None else None
+    
+    def enable_sessions(self, ttl=1800.0, max_sessions=200000, max_bytes=None):
+        """Keep per-session symptoms and context for chat_turn"""
+        self.session_store = SessionStore(self.symptom_index, max_sessions=max_sessions,
+                                          max_bytes=max_bytes, ttl=ttl)
+        return self.session_store
+    
+    def disable_sessions(self):
+        self.session_store = None
+    
+    def end_session(self, session_id):
+        if self.session_store is not None:
+            self.session_store.end(session_id)
+    
+    def session_stats(self):
+        """Session count, memory and evictions, or None if sessions are disabled"""
+        return self.session_store.stats() if self.session_store is not None else None
+    
+    def enable_typo_tolerance(self, max_distance=2, min_length=5):
+        """Also match misspelled synonym words ("feaver", "headach") in extract_symptoms"""
+        self.fuzzy_index = FuzzyIndex(self.symptom_synonyms, max_distance=max_distance, min_length=min_length)
+        self._invalidate_caches()
+        return self.fuzzy_index
+    
+    def disable_typo_tolerance(self):
+        self.fuzzy_index = None
+        self._invalidate_caches()
+    
+    def enable_multilingual(self, languages=None, locales_dir=LOCALES_DIR):
+        """Also extract symptoms written in the languages of ``locales_dir`` (default: all of them)"""
+        self.multilingual = MultilingualExtractor(languages, locales_dir)
+        self._invalidate_caches()
+        return self.multilingual
+    
+    def disable_multilingual(self):
+        self.multilingual = None
+        self._invalidate_caches()
+    
+    def _model_text(self, user_input, symptoms):
+        """Text the disease model sees for ``user_input``
+        
+        The LSTM was trained on English only, so a message in another
+        language is replaced by an English sentence naming its symptoms.
+        """
+        if self.multilingual is None or not symptoms or not self.multilingual.detect_languages(user_input):
+            return user_input
+        return "I have " + " and ".join(symptoms)
+    
+    def _invalidate_caches(self):
+        """Drop cached results after the model or disease database changes"""
+        # Training refits the tokenizer in place, so its frozen copy is stale too
+        self._inference_tokenizer = None
+        if self.response_cache is not None:
+            self.response_cache.invalidate()
+        if self.session_store is not None:
+            self.session_store.invalidate(self.symptom_index)
     
     def chat_response(self, user_input):
         """Generate chat response based on user input"""
-        # Extract symptoms
-        symptoms = self.extract_symptoms(user_input)
+        return self._final_response(self._chat_stages(user_input))
+    
+    def chat_turn(self, session_id, user_input):
+        """Generate a chat response that builds on the earlier turns of a session
+        
+        Only the new message goes through symptom extraction and the LSTM.
+        Symptoms, duration, severity and frequency accumulate in the session
+        store, and the symptom analysis is updated from the new symptoms alone.
+        """
+        if self.session_store is None:
+            raise ValueError("Sessions are not enabled. Call enable_sessions() first.")
+        return self._final_response(self._chat_stages(user_input, session_id))
+    
+    def _session_info(self, session_id, session, new_symptoms):
+        return {
+            'session_id': session_id,
+            'turn': session.turns,
+            'new_symptoms': new_symptoms,
+            'context': self.session_store.context(session),
+        }
+    
+    def chat_response_stream(self, user_input, session_id=None):
+        """Yield a chat response in parts, as (event, data), as soon as each is known
+        
+        - 'symptoms': the extracted symptoms and emergency flag, right after
+          symptom extraction; for an emergency it carries the warning message
+        - 'symptom_analysis': the response from the symptom-overlap ranking
+          alone, as given while the LSTM loads
+        - 'response': the final response, the same chat_response (or
+          chat_turn with ``session_id``) returns
+        
+        The model does not change the answer to an emergency or to a message
+        without symptoms, so those skip the LSTM and get their final response
+        straight after 'symptoms'.
+        """
+        if session_id is not None and self.session_store is None:
+            raise ValueError("Sessions are not enabled. Call enable_sessions() first.")
+        return self._chat_stages(user_input, session_id, partial=True)
+    
+    @staticmethod
+    def _final_response(parts):
+        for _, response in parts:
+            pass
+        return response
+    
+    def _chat_stages(self, user_input, session_id=None, partial=False):
+        """Run the stages of one chat response, yielding (event, data); the last part is 'response'
+        
+        chat_response, chat_turn and chat_response_stream all go through
+        here, so they record the same stages, cascade tiers and counters.
+        With ``partial`` the parts known before the LSTM runs are yielded too.
+        """
+        store = self.session_store
+        metrics = self.instrumentation
+        if metrics is not None:
+            trace = metrics.start_trace()
+            stage_start = time.perf_counter()
+        
+        # Extract symptoms, folding them into the session if there is one
+        if session_id is not None:
+            session, new_symptoms = store.update(session_id, self.extract_symptoms(user_input), user_input)
+            symptoms = store.symptoms(session)
+        else:
+            symptoms = self.extract_symptoms(user_input)
         
-        # Get LSTM prediction
-        lstm_prediction = self.predict_disease(user_input)
+        if metrics is not None:
+            stage_start = metrics.lap('extract_symptoms', stage_start)
         
-        # Get symptom-based analysis
-        symptom_predictions = self.analyze_symptoms(symptoms)
+        emergency = self._has_emergency(symptoms)
+        answered_by_rules = emergency or not symptoms
+        if partial:
+            first = {'extracted_symptoms': symptoms, 'emergency_warning': emergency}
+            if answered_by_rules:
+                first['message'] = self._generate_response(user_input, symptoms, self.PENDING_LSTM_PREDICTION,
+                                                           [])['message']
+            yield 'symptoms', first
+            
+            # Time spent by the consumer between parts is not part of any stage
+            if metrics is not None:
+                stage_start = time.perf_counter()
+        
+        # Get symptom-based analysis (only the top 3 are used in the response)
+        if session_id is not None:
+            symptom_predictions = store.predictions(session, top_k=3)
+        else:
+            symptom_predictions = self.analyze_symptoms(symptoms, top_k=3)
+        
+        if metrics is not None:
+            stage_start = metrics.lap('analyze_symptoms', stage_start)
+        
+        if partial and not answered_by_rules:
+            preliminary = self._generate_response(user_input, symptoms, self.PENDING_LSTM_PREDICTION,
+                                                  symptom_predictions)
+            if session_id is not None:
+                preliminary['session'] = self._session_info(session_id, session, new_symptoms)
+            yield 'symptom_analysis', preliminary
+            
+            if metrics is not None:
+                stage_start = time.perf_counter()
+        
+        # Get LSTM prediction, or answer from the rules alone until a model is ready
+        rules_only = not self.is_model_ready()
+        lstm_prediction = self._model_prediction(user_input, symptoms, rules_only)
+        
+        if metrics is not None:
+            stage_start = metrics.lap('predict_disease', stage_start)
         
         # Combine predictions
         response = self._generate_response(user_input, symptoms, lstm_prediction, symptom_predictions)
+        if session_id is not None:
+            response['session'] = self._session_info(session_id, session, new_symptoms)
         
-        return response
+        if metrics is not None:
+            metrics.lap('generate_response', stage_start)
+            self._finish_trace(metrics, trace, user_input, response, rules_only)
+        
+        yield 'response', response
+    
+    def _model_prediction(self, user_input, symptoms, rules_only):
+        user_input = self._model_text(user_input, symptoms)
+        if self.cascade is not None:
+            return self._cascade_predictions([user_input], [symptoms])[0]
+        if rules_only or not symptoms or self._has_emergency(symptoms):
+            # As the cascade's 'rules' tier: _generate_response ignores the model for these messages
+            return self.PENDING_LSTM_PREDICTION
+        return self.predict_disease(user_input)
+    
+    def _finish_trace(self, metrics, trace, user_input, response, rules_only):
+        """Close the trace of one chat_response and count how it was answered"""
+        metrics.finish_trace(
+            trace,
+            symptoms=len(response['extracted_symptoms']),
+            emergency=response['emergency_warning'],
+            rules_only=rules_only,
+            message_chars=len(user_input),
+        )
+        metrics.observe('chat_response', trace.total_seconds)
+        metrics.increment('chat_responses_total')
+        if response['emergency_warning']:
+            metrics.increment('emergency_responses_total')
+        if rules_only:
+            metrics.increment('rules_only_responses_total')
+    
+    def chat_responses(self, user_inputs):
+        """Generate chat responses for a batch of user inputs"""
+        user_inputs = list(user_inputs)
+        
+        # Extract symptoms for every message
+        symptoms_list = [self.extract_symptoms(user_input) for user_input in user_inputs]
+        model_texts = [self._model_text(user_input, symptoms)
+                       for user_input, symptoms in zip(user_inputs, symptoms_list)]
+        
+        # Get LSTM predictions in a single batched pass
+        if self.cascade is not None:
+            lstm_predictions = self._cascade_predictions(model_texts, symptoms_list)
+        elif not self.is_model_ready():
+            lstm_predictions = [self.PENDING_LSTM_PREDICTION] * len(user_inputs)
+        else:
+            lstm_predictions = self.predict_diseases(model_texts)
+        
+        # Score every symptom list against the database in one matrix product
+        symptom_predictions_list = self.analyze_symptoms_batch(symptoms_list, top_k=3)
+        
+        responses = []
+        for user_input, symptoms, lstm_prediction, symptom_predictions in zip(
+                user_inputs, symptoms_list, lstm_predictions, symptom_predictions_list):
+            responses.append(
+                self._generate_response(user_input, symptoms, lstm_prediction, symptom_predictions)
+            )
+        
+        if self.instrumentation is not None:
+            self.instrumentation.increment('chat_responses_total', len(responses))
+            self.instrumentation.increment('emergency_responses_total',
+                                           sum(response['emergency_warning'] for response in responses))
+        
+        return responses
+    
+    def _has_emergency(self, symptoms):
+        return any(symptom in symptoms for symptom in self.EMERGENCY_SYMPTOMS)
+    
+    def _cascade_predictions(self, user_inputs, symptoms_list):
+        """Model predictions from the cheapest cascade tier that is confident enough"""
+        cascade = self.cascade
+        results = [None] * len(user_inputs)
+        
+        # Tier 'rules': _generate_response ignores the model for these messages anyway
+        pending = []
+        for i, symptoms in enumerate(symptoms_list):
+            if not symptoms or self._has_emergency(symptoms):
+                results[i] = self.PENDING_LSTM_PREDICTION
+            else:
+                pending.append(i)
+        cascade.record('rules', len(user_inputs) - len(pending))
+        
+        lstm_ready = self.is_model_ready()
+        if pending and cascade.classifier is not None:
+            bow_predictions = cascade.bow_predict([user_inputs[i] for i in pending])
+            uncertain = []
+            for i, prediction in zip(pending, bow_predictions):
+                if prediction['confidence'] >= cascade.bow_threshold or not lstm_ready:
+                    results[i] = prediction
+                else:
+                    uncertain.append(i)
+            cascade.record('bow', len(pending) - len(uncertain))
+            pending = uncertain
+        
+        if pending:
+            if not lstm_ready:
+                lstm_predictions = [self.PENDING_LSTM_PREDICTION] * len(pending)
+            elif len(pending) == 1:
+                # Single messages still go through the micro-batcher when it is on
+                lstm_predictions = [self.predict_disease(user_inputs[pending[0]])]
+            else:
+                lstm_predictions = self.predict_diseases([user_inputs[i] for i in pending])
+            for i, prediction in zip(pending, lstm_predictions):
+                results[i] = prediction
+            cascade.record('lstm' if lstm_ready else 'rules', len(pending))
+        
+        return results
     
     def _generate_response(self, user_input, symptoms, lstm_prediction, symptom_predictions):
         """Generate comprehensive response"""
@@ -389,10 +1246,7 @@ class MedicalChatbotLSTM:
         }
         
         # Check for emergency symptoms
-        emergency_symptoms = ['shortness of breath', 'chest pain', 'difficulty breathing', 'unconsciousness']
-        has_emergency = any(symptom in symptoms for symptom in emergency_symptoms)
-        
-        if has_emergency:
+        if self._has_emergency(symptoms):
             response['emergency_warning'] = True
             response['message'] = "⚠️ EMERGENCY: You're experiencing symptoms that require immediate medical attention. Please call emergency services (911) immediately or go to the nearest emergency room."
             return response
@@ -409,7 +1263,7 @@ class MedicalChatbotLSTM:
                 combined_predictions.append({
                     'disease': lstm_prediction['disease'],
                     'confidence': lstm_prediction['confidence'],
-                    'source': 'LSTM'
+                    'source': lstm_prediction.get('source', 'LSTM')
                 })
             
             # Add symptom-based predictions
@@ -462,36 +1316,325 @@ class MedicalChatbotLSTM:
         
         print(f"Model saved to {filepath}")
     
-    def load_model(self, filepath):
+    def export_model(self, filepath, backend='numpy'):
+        """Export weights, vocabulary and labels for a TensorFlow-free backend
+        
+        'numpy' writes one .npz file. 'mmap' writes a directory of .npy
+        files, with the disease database flattened into it, that worker
+        processes memory-map and share. 'int8' writes one .npz file with the
+        weights quantized to int8 per output channel (see quantization.py).
+        """
+        if backend == 'numpy':
+            path = export_lstm(self, f"{filepath}_weights.npz")
+        elif backend == 'int8':
+            path = f"{filepath}_int8.npz"
+            np.savez(path, **quantize_arrays(lstm_arrays(self)))
+        elif backend == 'mmap':
+            arrays = lstm_arrays(self)
+            arrays.update(DiseaseTable.from_database(self.disease_database).arrays)
+            path = save_array_dir(arrays, f"{filepath}_mmap")
+        else:
+            raise ValueError(f"Cannot export for backend '{backend}'. Choose 'numpy', 'mmap' or 'int8'.")
+        print(f"Model exported to {path}")
+        return path
+    
+    def distill_student(self, filepath=None, num_samples=10000, seed=0, validation_split=0.2,
+                        synonym_variants=4, **train_kwargs):
+        """Train a HashedNgramStudent on the current model's probabilities
+        
+        The teacher labels the distinct texts of a synthetic corpus from
+        generate_training_data. The corpus repeats the same few thousand texts
+        many times, so each is labelled once, with its share of every disease
+        as the hard target. The corpus only names symptoms canonically, so
+        ``synonym_variants`` copies of each text with symptoms swapped for
+        random synonyms are added, labelled by the teacher alone.
+        ``train_kwargs`` go to student_model.train_student.
+        
+        With ``filepath`` the student is saved as ``<filepath>_student.npz``
+        for the 'student' backend. Returns (student, report), where the
+        report compares student and teacher on the held-out
+        ``validation_split`` of the corpus and of the synonym variants.
+        """
+        if self.model is None or isinstance(self.model, HashedNgramStudent):
+            raise ValueError("Distillation needs a trained or loaded LSTM as the teacher")
+        
+        state = self._serving_state()
+        teacher_arrays = lstm_arrays(self)
+        class_ids = {label: index for index, label in enumerate(state.label_encoder.classes_)}
+        label_counts = {}
+        for text, label in zip(*self.generate_training_data(num_samples, seed=seed)):
+            counts = label_counts.setdefault(self._clean_text(text), np.zeros(len(class_ids)))
+            counts[class_ids[label]] += 1
+        
+        rng = np.random.default_rng(seed)
+        corpus_texts = list(label_counts)
+        validation_count = int(len(corpus_texts) * validation_split)
+        splits = {'validation': [], 'train': []}
+        for position, text_index in enumerate(rng.permutation(len(corpus_texts))):
+            splits['validation' if position < validation_count else 'train'].append(corpus_texts[text_index])
+        # Variants stay in the split of the text they come from
+        variants = {}
+        for split, texts in splits.items():
+            for text in texts:
+                for _ in range(synonym_variants):
+                    variant = self._clean_text(self._synonym_variant(text, rng))
+                    if variant not in label_counts:
+                        variants.setdefault(variant, split)
+        
+        cleaned_texts = splits['train'] + splits['validation'] + list(variants)
+        teacher_probabilities = np.stack([prediction['probabilities']
+                                          for prediction in self._predict_cleaned(cleaned_texts)])
+        # Variants have no corpus label, so the teacher's answer is their hard target too
+        hard_targets = teacher_probabilities.copy()
+        for i, text in enumerate(splits['train'] + splits['validation']):
+            hard_targets[i] = label_counts[text] / label_counts[text].sum()
+        
+        tokenizer = self._get_inference_tokenizer(state.tokenizer)
+        sequences = np.array(tokenizer.pad(tokenizer.texts_to_sequences(cleaned_texts), state.max_sequence_length))
+        num_words = int(teacher_arrays['vocab_ids'].max()) + 1
+        if int(teacher_arrays['config'][2]):
+            # The tokenizer drops ids at or above its num_words, so no feature row is needed for them
+            num_words = min(num_words, int(teacher_arrays['config'][2]))
+        
+        corpus_train = np.arange(len(splits['train']))
+        corpus_validation = np.arange(len(splits['train']), len(splits['train']) + len(splits['validation']))
+        variant_splits = np.array([variants[text] for text in variants])
+        variant_train = len(corpus_texts) + np.flatnonzero(variant_splits == 'train')
+        variant_validation = len(corpus_texts) + np.flatnonzero(variant_splits == 'validation')
+        train = np.concatenate([corpus_train, variant_train])
+        
+        print(f"Distilling a student from {len(train)} teacher-labelled samples...")
+        start = time.perf_counter()
+        student = train_student(sequences[train], teacher_probabilities[train], hard_targets[train],
+                                teacher_arrays, num_words, seed=seed, **train_kwargs)
+        train_seconds = time.perf_counter() - start
+        
+        teacher_classes = np.argmax(teacher_probabilities, axis=1)
+        student_classes = np.argmax(student.predict_on_batch(sequences), axis=1)
+        labels = np.argmax(hard_targets, axis=1)
+        
+        def agreement(indices):
+            return float(np.mean(student_classes[indices] == teacher_classes[indices])) if len(indices) else None
+        
+        report = {
+            'train_samples': len(train),
+            'validation_samples': len(corpus_validation) + len(variant_validation),
+            'train_seconds': train_seconds,
+            'agreement': agreement(corpus_validation),
+            'synonym_agreement': agreement(variant_validation),
+            'student_accuracy': float(np.mean(student_classes[corpus_validation] == labels[corpus_validation])),
+            'teacher_accuracy': float(np.mean(teacher_classes[corpus_validation] == labels[corpus_validation])),
+            'student_bytes': int(student.table.nbytes + student.bias.nbytes),
+            'teacher_bytes': int(sum(array.nbytes for name, array in teacher_arrays.items()
+                                     if name.startswith(('embedding', 'lstm_', 'dense_')))),
+        }
+        print(f"Student agrees with the teacher on {report['agreement']:.1%} of held-out corpus texts "
+              f"(accuracy {report['student_accuracy']:.1%} vs {report['teacher_accuracy']:.1%})")
+        
+        if filepath is not None:
+            path = student.save(f"{filepath}_student.npz")
+            print(f"Student model saved to {path}")
+        return student, report
+    
+    def _synonym_variant(self, text, rng):
+        """``text`` with every symptom mention replaced by a random synonym of it"""
+        for match in reversed(self.symptom_matcher.find_matches(text)):
+            synonyms = self.symptom_synonyms[match.symptom]
+            text = text[:match.start] + synonyms[rng.integers(len(synonyms))] + text[match.end:]
+        return text
+    
+    def save_bundle(self, filepath):
+        """Write weights, vocabulary, labels, config and disease database to ``<filepath>.bundle``
+        
+        Works from a Keras model or from one loaded with a TensorFlow-free
+        backend, so existing .npz exports can be converted without TensorFlow.
+        """
+        arrays = lstm_arrays(self)
+        arrays.update(DiseaseTable.from_database(self.disease_database).arrays)
+        metadata = {
+            'config': {
+                'max_sequence_length': self.max_sequence_length,
+                'vocab_size': self.vocab_size,
+                'embedding_dim': self.embedding_dim,
+                'lstm_units': self.lstm_units,
+                'num_classes': len(self.label_encoder.classes_),
+            },
+            'disease_db_version': disease_database_version(self.disease_database),
+        }
+        path = f"{filepath}.bundle"
+        header = write_bundle(path, arrays, metadata)
+        print(f"Model bundle saved to {path} ({header['content_hash'][:12]})")
+        return path
+    
+    def load_model(self, filepath, backend='keras'):
         """Load the trained model and preprocessing objects"""
+        if backend not in self.BACKEND_FILES:
+            raise ValueError(f"Unknown backend '{backend}'. Choose from {sorted(self.BACKEND_FILES)}.")
+        
+        start = time.perf_counter()
+        state, disease_database, bundle_info = getattr(self, f'_load_{backend}_backend')(filepath)
+        
+        if disease_database is not None:
+            # Serve the database exported with the model
+            symptom_index = SymptomIndex(disease_database)
+            self.disease_database = disease_database
+            self.symptom_index = symptom_index
+        
+        state = state._replace(backend=backend, bundle_info=bundle_info, load_seconds=time.perf_counter() - start)
+        
+        # Everything reads the snapshot, so the swap is this one assignment;
+        # requests already running finish on the model they started with
+        self._serving = state
+        self._invalidate_caches()
+        print(f"Model loaded from {filepath} ({backend} backend) in {state.load_seconds:.2f}s")
+    
+    def _load_keras_backend(self, filepath):
+        import tensorflow as tf
+        
         # Load model
-        self.model = tf.keras.models.load_model(f"{filepath}_model.h5")
+        model = tf.keras.models.load_model(f"{filepath}_model.h5")
         
         # Load tokenizer
         with open(f"{filepath}_tokenizer.pkl", 'rb') as f:
-            self.tokenizer = pickle.load(f)
+            tokenizer = pickle.load(f)
         
         # Load label encoder
         with open(f"{filepath}_label_encoder.pkl", 'rb') as f:
-            self.label_encoder = pickle.load(f)
+            label_encoder = pickle.load(f)
+        
+        return ServingState(model, tokenizer, label_encoder, self.max_sequence_length), None, None
+    
+    def _load_numpy_backend(self, filepath):
+        return self._runtime_state(NumpyLSTM.load(f"{filepath}_weights.npz")), None, None
+    
+    def _load_mmap_backend(self, filepath):
+        arrays = load_array_dir(f"{filepath}_mmap")
+        # The database exported with the model is read from the same shared pages
+        disease_database = DiseaseTable(arrays) if DiseaseTable.has_table(arrays) else None
+        return self._runtime_state(NumpyLSTM(arrays)), disease_database, None
+    
+    def _load_int8_backend(self, filepath):
+        return self._runtime_state(QuantizedLSTM.load(f"{filepath}_int8.npz")), None, None
+    
+    def _load_student_backend(self, filepath):
+        return self._runtime_state(HashedNgramStudent.load(f"{filepath}_student.npz")), None, None
+    
+    def _load_bundle_backend(self, filepath):
+        arrays, header = read_bundle(f"{filepath}.bundle")
+        bundle_info = {
+            'path': f"{filepath}.bundle",
+            'content_hash': header['content_hash'],
+            'disease_db_version': header['metadata']['disease_db_version'],
+            'config': header['metadata']['config'],
+        }
+        return self._runtime_state(NumpyLSTM(arrays)), DiseaseTable(arrays), bundle_info
+    
+    @staticmethod
+    def _runtime_state(runtime):
+        return ServingState(runtime, runtime.tokenizer, runtime.label_encoder, runtime.max_sequence_length)
+    
+    def reload_model_async(self, filepath, backend='bundle'):
+        """Load a model in the background and swap it in without pausing requests
+        
+        Unlike load_model_async, the current model keeps answering until the
+        new one is fully loaded; is_model_loading() stays False throughout.
+        Failures are stored in ``load_error`` and leave the current model in place.
+        """
+        def reload():
+            with self._reload_lock:
+                try:
+                    self.load_model(filepath, backend=backend)
+                    self.load_error = None
+                except Exception as exc:
+                    self.load_error = exc
+                    print(f"Failed to reload model from {filepath}: {exc}")
+        
+        self._reload_thread = threading.Thread(target=reload, name="model-reloader", daemon=True)
+        self._reload_thread.start()
+        return self._reload_thread
+    
+    def load_model_async(self, filepath, backend='keras'):
+        """Load the model in a background thread; rule-based answers work meanwhile"""
+        def load():
+            try:
+                self.load_model(filepath, backend=backend)
+            except Exception as exc:
+                self.load_error = exc
+                print(f"Failed to load model from {filepath}: {exc}")
+        
+        self.load_error = None
+        self._loading_thread = threading.Thread(target=load, name="model-loader", daemon=True)
+        self._loading_thread.start()
+        return self._loading_thread
+    
+    def is_model_loading(self):
+        """True while a background load started by load_model_async is running"""
+        return self._loading_thread is not None and self._loading_thread.is_alive()
+    
+    def is_model_ready(self):
+        """True when a model can answer: published by load_model or trained in process
         
-        print(f"Model loaded from {filepath}")
+        Stays False while load_model_async runs and after it fails, so chat
+        responses keep coming from the rules alone instead of a missing model.
+        """
+        return self._serving is not None or self._model is not None
+    
+    def wait_until_loaded(self, timeout=None):
+        """Block until a background load finishes; returns True if a model is ready"""
+        if self._loading_thread is not None:
+            self._loading_thread.join(timeout)
+        return self.model is not None
+    
+    @classmethod
+    def saved_model_exists(cls, filepath, backend='keras'):
+        """Check that every artifact the backend loads is present"""
+        return all(os.path.exists(f"{filepath}{suffix}") for suffix in cls.BACKEND_FILES[backend])
 
 
 def main():
     """Main function to demonstrate the medical chatbot"""
+    parser = argparse.ArgumentParser(description="Medical chatbot with LSTM algorithm")
+    parser.add_argument("--model", default="medical_chatbot_lstm", help="prefix of the saved model files")
+    parser.add_argument("--train", action="store_true", help="retrain even if a saved model exists")
+    parser.add_argument("--backend", choices=sorted(MedicalChatbotLSTM.BACKEND_FILES), default="keras",
+                        help="inference backend used with a saved model")
+    parser.add_argument("--streaming", action="store_true",
+                        help="train from a generator instead of materializing the synthetic corpus")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the synthetic training data")
+    parser.add_argument("--data-workers", type=int, default=1, help="processes generating training data")
+    parser.add_argument("--corpus-cache", default=None, metavar="DIR",
+                        help="reuse the tokenized training corpus from DIR (needs --seed)")
+    parser.add_argument("--checkpoint-dir", default=None, metavar="DIR",
+                        help="checkpoint every epoch to DIR and resume an interrupted run from it")
+    parser.add_argument("--patience", type=int, default=0,
+                        help="stop after this many epochs without a better validation accuracy, e.g. 3 "
+                             "(default 0 trains all epochs)")
+    args = parser.parse_args()
+    
     print("🏥 Medical Chatbot with LSTM Algorithm")
     print("=" * 50)
     
     # Initialize chatbot
     chatbot = MedicalChatbotLSTM()
     
-    # Train model (this will take some time)
-    print("\nTraining the LSTM model...")
-    chatbot.train_model(epochs=20, batch_size=32)  # Reduced epochs for faster training
-    
-    # Save model
-    chatbot.save_model("medical_chatbot_lstm")
+    if args.train or not chatbot.saved_model_exists(args.model, args.backend):
+        # Train model (this will take some time)
+        print("\nTraining the LSTM model...")
+        chatbot.train_model(epochs=20, batch_size=32,  # Reduced epochs for faster training
+                            streaming=args.streaming, seed=args.seed, processes=args.data_workers,
+                            cache_dir=args.corpus_cache, checkpoint_dir=args.checkpoint_dir,
+                            patience=args.patience)
+        
+        # Save model
+        chatbot.save_model(args.model)
+        chatbot.export_model(args.model)
+        chatbot.export_model(args.model, backend='mmap')
+        chatbot.export_model(args.model, backend='int8')
+        chatbot.save_bundle(args.model)
+    else:
+        # Fast start: chat right away, the LSTM joins in once it has loaded
+        print("\nLoading the saved LSTM model in the background...")
+        chatbot.load_model_async(args.model, backend=args.backend)
     
     # Interactive chat
     print("\n🤖 Chat with the Medical AI Assistant")
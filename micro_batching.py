@@ -0,0 +1,112 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-item requests into batched calls
+
+    Callers submit one item at a time and get a Future back. A background
+    worker waits up to ``max_wait_ms`` for more items to arrive, then hands
+    the whole batch (at most ``max_batch_size`` items) to ``predict_batch``
+    and resolves each Future with its own result.
+    """
+
+    _STOP = object()
+
+    def __init__(self, predict_batch, max_batch_size=64, max_wait_ms=5.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._worker = None
+        self.batches_run = 0
+        self.items_processed = 0
+
+    def start(self):
+        """Start the background worker thread"""
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._worker.start()
+        return self
+
+    def stop(self):
+        """Drain pending requests and stop the worker thread"""
+        if self._worker is not None:
+            self._queue.put(self._STOP)
+            self._worker.join()
+            self._worker = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def submit(self, item):
+        """Queue one item for prediction and return a Future for its result"""
+        if self._worker is None:
+            raise RuntimeError("MicroBatcher is not running. Call start() first.")
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    @property
+    def mean_batch_size(self):
+        return self.items_processed / self.batches_run if self.batches_run else 0.0
+
+    def _collect(self, first):
+        """Gather items until the batch is full or the wait window closes"""
+        batch = [first]
+        stop = False
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is self._STOP:
+                stop = True
+                break
+            batch.append(entry)
+        return batch, stop
+
+    def _run(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is self._STOP:
+                break
+            batch, stop = self._collect(first)
+
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+            try:
+                results = self.predict_batch(items)
+            except Exception as exc:
+                for future in futures:
+                    future.set_exception(exc)
+            else:
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+
+            self.batches_run += 1
+            self.items_processed += len(batch)
+
+        # Anything still queued after stop() runs unbatched so no caller hangs
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is self._STOP:
+                continue
+            item, future = entry
+            try:
+                future.set_result(self.predict_batch([item])[0])
+            except Exception as exc:
+                future.set_exception(exc)
@@ -0,0 +1,123 @@
+"""
+Single-file, versioned model bundle
+
+Layout::
+
+    MAGIC (8 bytes) | header length (uint64 LE) | header JSON | padding | arrays
+
+The header holds the format version, the config (max_sequence_length,
+vocab_size, ...), the disease database version, a SHA-256 content hash
+and, for each array, its dtype, shape and byte offset. Every array
+starts on a 64-byte boundary, so ``read_bundle`` returns zero-copy
+read-only views into one memory map of the file instead of parsing
+pickles. ``write_bundle`` writes to a temporary file and renames it into
+place, so a reader never sees a half-written bundle.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b'MCBUNDLE'
+BUNDLE_VERSION = 1
+ALIGNMENT = 64
+
+
+class BundleError(ValueError):
+    """The file is not a bundle, has an unsupported version or fails its checksum"""
+
+
+def _raw_bytes(array):
+    """A flat uint8 view of a contiguous array (the buffer protocol rejects unicode dtypes)"""
+    return array.reshape(-1).view(np.uint8)
+
+
+def _content_hash(arrays, metadata):
+    digest = hashlib.sha256(json.dumps(metadata, sort_keys=True).encode())
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(f'{name}|{array.dtype.str}|{array.shape}|'.encode())
+        digest.update(_raw_bytes(array))
+    return digest.hexdigest()
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_bundle(path, arrays, metadata):
+    """Write named arrays and JSON-serializable metadata to ``path`` atomically"""
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    entries = {}
+    offset = 0
+    for name in sorted(arrays):
+        array = arrays[name]
+        entries[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = _aligned(offset + array.nbytes)
+
+    header = {
+        'bundle_version': BUNDLE_VERSION,
+        'metadata': metadata,
+        'content_hash': _content_hash(arrays, metadata),
+        'arrays': entries,
+    }
+    header_bytes = json.dumps(header).encode()
+    data_start = _aligned(len(MAGIC) + 8 + len(header_bytes))
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        for name in sorted(arrays):
+            f.seek(data_start + entries[name]['offset'])
+            f.write(_raw_bytes(arrays[name]))
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+    return header
+
+
+def read_header(path):
+    """Return the header of a bundle without mapping its arrays"""
+    with open(path, 'rb') as f:
+        return _parse_header(f.read(len(MAGIC) + 8), f)[0]
+
+
+def _parse_header(prefix, f):
+    if prefix[:len(MAGIC)] != MAGIC:
+        raise BundleError("Not a model bundle")
+    (header_length,) = struct.unpack('<Q', prefix[len(MAGIC):])
+    header = json.loads(f.read(header_length))
+    if header.get('bundle_version') != BUNDLE_VERSION:
+        raise BundleError(f"Unsupported bundle version {header.get('bundle_version')}")
+    return header, _aligned(len(MAGIC) + 8 + header_length)
+
+
+def read_bundle(path, verify=True):
+    """Memory-map a bundle; returns (arrays, header)
+
+    The arrays are read-only views of the map. ``verify`` recomputes the
+    content hash, which touches every page once.
+    """
+    with open(path, 'rb') as f:
+        header, data_start = _parse_header(f.read(len(MAGIC) + 8), f)
+        # The map stays alive for as long as any array view references it
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    arrays = {}
+    for name, entry in header['arrays'].items():
+        dtype = np.dtype(entry['dtype'])
+        count = int(np.prod(entry['shape'], dtype=np.int64))
+        if count == 0:
+            arrays[name] = np.empty(entry['shape'], dtype=dtype)
+            continue
+        arrays[name] = np.frombuffer(mapped, dtype=dtype, count=count,
+                                     offset=data_start + entry['offset']).reshape(entry['shape'])
+
+    if verify and _content_hash(arrays, header['metadata']) != header['content_hash']:
+        raise BundleError(f"Checksum mismatch in {path}")
+    return arrays, header
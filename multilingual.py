@@ -0,0 +1,149 @@
+"""
+Symptom extraction for messages in languages other than English
+
+Each language has a table in ``locales/<code>.json`` mapping the canonical
+English symptom keys of MedicalChatbotLSTM to phrases in that language, the
+same tables script.js uses in the browser. ``MultilingualExtractor`` works
+out which languages a message may be in and matches it with one
+SymptomMatcher per language. A matcher is compiled the first time its
+language is seen, so languages nobody writes in cost neither startup time
+nor memory.
+
+Languages are told apart cheaply:
+- Non-Latin scripts (Telugu, Devanagari) by the Unicode block of their letters.
+- Latin-script languages by a few common words (``LATIN_MARKERS``), since
+  they share a script with English.
+"""
+
+import json
+import os
+import re
+import threading
+import unicodedata
+
+from symptom_matcher import SymptomMatcher
+
+LOCALES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'locales')
+
+# Unicode blocks of the scripts with a locale; everything else is ignored
+SCRIPT_RANGES = (
+    ('devanagari', 0x0900, 0x097F),
+    ('telugu', 0x0C00, 0x0C7F),
+)
+SCRIPT_LANGUAGES = {
+    'devanagari': ('hi',),
+    'telugu': ('te',),
+}
+
+# Frequent words of each Latin-script locale that are not English words,
+# compared after accents are folded
+LATIN_MARKERS = {
+    'es': frozenset(['tengo', 'tiene', 'estoy', 'siento', 'duele', 'dolor', 'mucho', 'mucha', 'muy', 'desde', 'ayer',
+                     'fiebre', 'tos', 'garganta', 'cabeza', 'pecho', 'y', 'con', 'el', 'los', 'las']),
+    'fr': frozenset(['j', 'ai', 'je', 'suis', 'mal', 'depuis', 'tres', 'et', 'avec', 'le', 'les', 'des', 'du',
+                     'fievre', 'toux', 'gorge', 'tete', 'hier']),
+}
+
+# Zero-width joiners and spaces only steer rendering and would break matches
+_INVISIBLE = dict.fromkeys(map(ord, '​‌‍⁠﻿'))
+_INVISIBLE.update({ord('’'): "'", ord('‘'): "'"})
+_WORD_PATTERN = re.compile(r'[a-z]+')
+
+
+def normalize(text, fold_accents=False):
+    """NFKC-normalize and case-fold ``text``; ``fold_accents`` also strips diacritics"""
+    if text.isascii():
+        # Nothing to normalize or fold, and most messages are English
+        return text.lower()
+    text = unicodedata.normalize('NFKC', text).translate(_INVISIBLE).casefold()
+    if fold_accents:
+        text = ''.join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+    return text
+
+
+def detect_scripts(text):
+    """Return the set of SCRIPT_RANGES scripts whose letters occur in ``text``"""
+    if text.isascii():
+        return set()
+    scripts = set()
+    for char in text:
+        code = ord(char)
+        if code < 0x0900:
+            continue
+        for script, first, last in SCRIPT_RANGES:
+            if first <= code <= last:
+                scripts.add(script)
+                break
+    return scripts
+
+
+class MultilingualExtractor:
+    """Lazily compiled per-language symptom matchers over ``locales/*.json``
+
+    ``languages`` limits the locales used (default: every file in
+    ``locales_dir``). Only the file names are read up front.
+    """
+
+    def __init__(self, languages=None, locales_dir=LOCALES_DIR):
+        self.locales_dir = locales_dir
+        available = sorted(name[:-len('.json')] for name in os.listdir(locales_dir) if name.endswith('.json'))
+        if languages is None:
+            languages = available
+        missing = sorted(set(languages) - set(available))
+        if missing:
+            raise ValueError(f"No locale file for {missing} in {locales_dir}. Available: {available}")
+        self.languages = tuple(languages)
+        self._script_languages = {script: [language for language in codes if language in self.languages]
+                                  for script, codes in SCRIPT_LANGUAGES.items()}
+        self._latin_languages = [language for language in self.languages if language in LATIN_MARKERS]
+        self._matchers = {}
+        self._lock = threading.Lock()
+
+    def detect_languages(self, text):
+        """Return the enabled languages ``text`` may be written in, English excluded"""
+        languages = []
+        for script in detect_scripts(text):
+            languages.extend(self._script_languages[script])
+        if self._latin_languages:
+            words = set(_WORD_PATTERN.findall(normalize(text, fold_accents=True)))
+            languages.extend(language for language in self._latin_languages if words & LATIN_MARKERS[language])
+        return languages
+
+    def matcher(self, language):
+        """Return (SymptomMatcher, fold_accents) for ``language``, compiling it on first use"""
+        entry = self._matchers.get(language)
+        if entry is None:
+            with self._lock:
+                entry = self._matchers.get(language)
+                if entry is None:
+                    entry = self._matchers[language] = self._compile(language)
+        return entry
+
+    def _compile(self, language):
+        with open(os.path.join(self.locales_dir, f'{language}.json'), encoding='utf-8') as f:
+            locale = json.load(f)
+        fold_accents = locale.get('fold_accents', False)
+        synonyms = {symptom: [normalize(phrase, fold_accents) for phrase in phrases]
+                    for symptom, phrases in locale['symptoms'].items()}
+        return SymptomMatcher(synonyms, suffixes=locale.get('suffixes', ())), fold_accents
+
+    def loaded_languages(self):
+        return sorted(self._matchers)
+
+    def extract(self, text, languages=None):
+        """Return canonical English symptom keys found in ``text``, in order of first mention
+
+        ``languages`` skips detection, e.g. for a language the user picked.
+        """
+        if languages is None:
+            languages = self.detect_languages(text)
+        symptoms = []
+        normalized = {}
+        for language in languages:
+            matcher, fold_accents = self.matcher(language)
+            if fold_accents not in normalized:
+                normalized[fold_accents] = normalize(text, fold_accents)
+            for symptom in matcher.extract(normalized[fold_accents]):
+                if symptom not in symptoms:
+                    symptoms.append(symptom)
+        return symptoms
@@ -0,0 +1,150 @@
+"""
+Post-training int8 quantization of the exported LSTM
+
+``quantize_arrays`` takes the float32 arrays written by lstm_runtime and
+stores every weight matrix as int8 values with one float32 scale per
+output channel (symmetric, ``scale = max|w| / 127``). The channels are
+the columns of the LSTM and Dense kernels and the rows of the embedding,
+so each token's vector keeps its own range. Biases stay float32. The
+vocabulary, labels and config are copied unchanged, and the result is
+saved as one ``.npz`` file about a quarter the size of the float export.
+
+``QuantizedLSTM`` runs the NumpyLSTM forward pass on those arrays.
+Weights stay int8 in memory. NumPy has no int8 matrix products, so each
+kernel is cast to float32 right before it is used, into a scratch buffer
+the size of the largest kernel, one per thread. The per-channel scales
+are applied to the matrix products rather than to the weights. The
+embedding is dequantized only for the rows a batch looks up.
+"""
+
+import threading
+
+import numpy as np
+
+from lstm_runtime import NumpyLSTM, vocabulary_arrays
+
+QUANT_FORMAT_VERSION = 1
+_INT8_MAX = 127
+
+
+def quantize_per_channel(weights, axis):
+    """Return (int8 values, float32 scales) with one scale per index of ``axis``"""
+    weights = np.asarray(weights, dtype=np.float32)
+    reduce_axes = tuple(i for i in range(weights.ndim) if i != axis % weights.ndim)
+    scale = np.abs(weights).max(axis=reduce_axes) / _INT8_MAX
+    # All-zero channels would divide by zero; any scale reproduces them
+    scale[scale == 0] = 1.0
+    shape = [1] * weights.ndim
+    shape[axis] = -1
+    values = np.clip(np.rint(weights / scale.reshape(shape)), -_INT8_MAX, _INT8_MAX).astype(np.int8)
+    return values, scale.astype(np.float32)
+
+
+def dequantize(values, scale, axis):
+    shape = [1] * values.ndim
+    shape[axis] = -1
+    weights = values.astype(np.float32)
+    weights *= scale.reshape(shape)
+    return weights
+
+
+def _channel_axis(name):
+    # Embedding rows are looked up per token; kernels are (inputs, outputs)
+    return 0 if name == 'embedding' else 1
+
+
+def _is_weight_matrix(name):
+    return name == 'embedding' or (name.startswith(('lstm_', 'dense_')) and name.endswith('kernel'))
+
+
+def quantize_arrays(arrays):
+    """int8 per-channel copy of lstm_runtime arrays; weight ``name`` becomes ``name_q`` and ``name_scale``"""
+    quantized = vocabulary_arrays(arrays)
+    quantized['dense_activations'] = arrays['dense_activations']
+    for name, array in arrays.items():
+        if _is_weight_matrix(name):
+            quantized[f'{name}_q'], quantized[f'{name}_scale'] = quantize_per_channel(array, _channel_axis(name))
+        elif name.startswith(('lstm_', 'dense_')) and name.endswith('bias'):
+            quantized[name] = array
+    quantized['quant_config'] = np.array([QUANT_FORMAT_VERSION], dtype=np.int64)
+    return quantized
+
+
+def dequantize_arrays(quantized):
+    """Float32 lstm_runtime arrays with the values the quantized model computes with"""
+    arrays = {}
+    for name, array in quantized.items():
+        if name.endswith('_q'):
+            base = name[:-len('_q')]
+            arrays[base] = dequantize(array, quantized[f'{base}_scale'], _channel_axis(base))
+        elif not name.endswith('_scale') and name != 'quant_config':
+            arrays[name] = array
+    return arrays
+
+
+class QuantizedLSTM(NumpyLSTM):
+    """NumpyLSTM over int8 per-channel weights written by quantize_arrays
+
+    Each weight is held as a (values, scales) pair.
+    """
+
+    def __init__(self, arrays):
+        version = int(arrays['quant_config'][0])
+        if version != QUANT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported quantized weight file version {version}")
+        # The base class reads config, vocabulary, labels and the layer layout; the weights are replaced below
+        super().__init__({name[:-len('_q')] if name.endswith('_q') else name: array
+                          for name, array in arrays.items()})
+        self.arrays = arrays
+
+        self.embedding = self._weight('embedding')
+        self.lstm_layers = [
+            (self._weight(f'lstm_{i}_kernel'), self._weight(f'lstm_{i}_recurrent_kernel'), bias)
+            for i, (_, _, bias) in enumerate(self.lstm_layers)
+        ]
+        self.dense_layers = [
+            (self._weight(f'dense_{i}_kernel'), bias, activation)
+            for i, (_, bias, activation) in enumerate(self.dense_layers)
+        ]
+        self._local = threading.local()
+
+    def _weight(self, name):
+        return self.arrays[f'{name}_q'], self.arrays[f'{name}_scale']
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def float_arrays(self):
+        return dequantize_arrays(self.arrays)
+
+    def _cast(self, values):
+        """``values`` as float32 in this thread's scratch buffer, valid until the next call"""
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None or buffer.size < values.size:
+            buffer = self._local.buffer = np.empty(values.size, dtype=np.float32)
+        # A fresh array per call would be big enough for malloc to map and unmap it every time
+        out = buffer[:values.size].reshape(values.shape)
+        out[...] = values
+        return out
+
+    def _embed(self, sequences):
+        values, scale = self.embedding
+        x = values[sequences].astype(np.float32)
+        x *= scale[sequences][..., None]
+        return x
+
+    def _matmul(self, x, weights):
+        # Scaling the product by output channel equals multiplying by the dequantized weights,
+        # and the product is smaller than the weights for the batches served here
+        values, scale = weights
+        product = x @ self._cast(values)
+        product *= scale
+        return product
+
+    def _lstm(self, inputs, kernel, recurrent_kernel, bias, mask, return_sequences):
+        # The projection is done with the scratch buffer before the recurrent kernel takes it over
+        projected = self._matmul(inputs, kernel) + bias
+        values, scale = recurrent_kernel
+        return self._recurrence(projected, self._cast(values), mask, return_sequences, recurrent_scale=scale)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Quantize the saved LSTM to int8
+
+Loads the model with any LSTM backend (by default the Keras
+``<model>_model.h5``), quantizes its embedding, LSTM and Dense weights to
+int8 with one scale per output channel and writes ``<model>_int8.npz``.
+Serve the result with ``--backend int8`` in chat_server.py,
+score_messages.py or medical_chatbot_lstm.py.
+``benchmarks/bench_quantization.py`` compares it with the float model.
+
+Usage: python quantize_model.py [--model PREFIX] [--backend keras]
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from lstm_runtime import lstm_arrays
+from medical_chatbot_lstm import MedicalChatbotLSTM
+from quantization import QuantizedLSTM
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="medical_chatbot_lstm", help="prefix of the saved model files")
+    parser.add_argument("--backend", choices=["keras", "numpy", "mmap", "bundle"], default="keras",
+                        help="backend the float LSTM is loaded with")
+    args = parser.parse_args()
+
+    chatbot = MedicalChatbotLSTM()
+    if not chatbot.saved_model_exists(args.model, args.backend):
+        parser.error(f"No saved {args.backend} model at {args.model}_*. Train one with medical_chatbot_lstm.py first.")
+    chatbot.load_model(args.model, backend=args.backend)
+
+    path = chatbot.export_model(args.model, backend='int8')
+    float_arrays = lstm_arrays(chatbot)
+    quantized = QuantizedLSTM.load(path)
+    print(f"{'weight':<28}{'float KB':>10}{'int8 KB':>10}{'max abs error':>15}")
+    for name, array in quantized.float_arrays().items():
+        if name.startswith(('embedding', 'lstm_', 'dense_')) and array.ndim == 2:
+            stored = quantized.arrays[f'{name}_q'].nbytes + quantized.arrays[f'{name}_scale'].nbytes
+            error = np.abs(array - float_arrays[name]).max()
+            print(f"{name:<28}{float_arrays[name].nbytes / 1024:>10.1f}{stored / 1024:>10.1f}{error:>15.5f}")
+    print(f"{path}: {os.path.getsize(path) / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
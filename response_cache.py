@@ -0,0 +1,151 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def approximate_size(value):
+    """Rough in-memory size of a cached value in bytes"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approximate_size(k) + approximate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(approximate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+_CONTAINERS = (dict, list, np.ndarray)
+
+
+def copy_value(value, copy_arrays=False):
+    """Copy the dicts and lists of a cached value and make its arrays read-only; the rest is shared
+
+    Arrays are read-only views unless ``copy_arrays``, which stored values
+    need so the caller's array can still change without affecting them.
+    """
+    if isinstance(value, dict):
+        return {key: copy_value(item, copy_arrays) if isinstance(item, _CONTAINERS) else item
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_value(item, copy_arrays) if isinstance(item, _CONTAINERS) else item for item in value]
+    if isinstance(value, np.ndarray):
+        array = value.copy() if copy_arrays else value.view()
+        array.flags.writeable = False
+        return array
+    return value
+
+
+class LRUCache:
+    """Thread-safe LRU cache with optional TTL and an approximate byte budget
+
+    Entries are written together with the cache ``generation`` they were
+    computed under. ``invalidate()`` bumps the generation, so a result that
+    was still being computed against an old model is dropped instead of
+    being stored after the reload.
+
+    Dicts and lists are copied on ``put`` and ``get`` and arrays are handed
+    out read-only, so a caller changing the predictions it was given or
+    stored cannot alter the cached entry.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=None, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy_value(value)
+
+    def put(self, key, value, generation=None):
+        size = approximate_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (copy_value(value, copy_arrays=True), size, expires_at)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and self.bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def invalidate(self):
+        """Drop every entry and reject writes computed before this call"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+class ResponseCache:
+    """Two-level cache for chat_response
+
+    Level 1 maps the normalized message text (the same cleaning that
+    predict_disease applies) to the LSTM prediction, which depends on
+    nothing else. Level 2 maps the frozenset of extracted symptoms to the
+    analyze_symptoms ranking, so "I have fever and cough" and
+    "fever, cough" share one entry.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024, ttl=None):
+        # Split the byte budget evenly between the two levels
+        level_bytes = max_bytes // 2 if max_bytes is not None else None
+        self.predictions = LRUCache(max_entries, level_bytes, ttl)
+        self.analyses = LRUCache(max_entries, level_bytes, ttl)
+
+    def invalidate(self):
+        self.predictions.invalidate()
+        self.analyses.invalidate()
+
+    def stats(self):
+        return {'predictions': self.predictions.stats(), 'analyses': self.analyses.stats()}
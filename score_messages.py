@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Score a JSONL archive of user messages with a saved MedicalChatbotLSTM
+
+Each input line is a JSON object holding the message in ``--field`` (or a
+bare JSON string). Each output line holds the input line's byte ``offset``
+and ``next_offset``, any ``--id-field`` value, the extracted symptoms and
+the model prediction, or the full chat_response with ``--responses``.
+
+The input is streamed in batches of ``--batch-size`` lines. Every worker
+process loads the model once and scores a whole batch with one
+predict_diseases call. Results are written in input order, and at most
+two batches per worker are in flight, so memory stays bounded whatever
+the input size.
+
+The output is flushed after every batch. After an interruption,
+``--resume`` continues from the ``next_offset`` of the last complete
+output line. ``--start-offset`` starts from an explicit byte offset.
+
+Usage:
+    python score_messages.py messages.jsonl scored.jsonl --workers 4
+    python score_messages.py requests.jsonl scored.jsonl --field body --id-field request_id
+    python score_messages.py messages.jsonl scored.jsonl --workers 4 --resume
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from chat_server import to_jsonable
+from data_stream import chunked, ordered_parallel_map
+from medical_chatbot_lstm import MedicalChatbotLSTM
+
+# Per-process state for the scoring workers, set up once by _init_worker
+_chatbot = None
+_options = None
+
+
+def _init_worker(model_prefix, backend, options):
+    global _chatbot, _options
+    _chatbot = MedicalChatbotLSTM()
+    _chatbot.load_model(model_prefix, backend=backend)
+    _options = options
+
+
+def _parse_line(raw):
+    """Return (record, message) for one input line; message is None if it has none"""
+    record = json.loads(raw)
+    if isinstance(record, str):
+        return {}, record
+    message = record.get(_options['field']) if isinstance(record, dict) else None
+    return (record if isinstance(record, dict) else {}), (message if isinstance(message, str) else None)
+
+
+def _score_batch(batch):
+    """Score one batch of (offset, next_offset, raw line)
+
+    Returns (output text, line count, next_offset of the last line).
+    """
+    results = []
+    messages = []
+    for offset, next_offset, raw in batch:
+        result = {'offset': offset, 'next_offset': next_offset}
+        try:
+            record, message = _parse_line(raw)
+        except ValueError as exc:
+            result['error'] = f"invalid JSON: {exc}"
+            record, message = {}, None
+        else:
+            if message is None:
+                result['error'] = f"no string field '{_options['field']}'"
+        if _options['id_field'] is not None and _options['id_field'] in record:
+            result[_options['id_field']] = record[_options['id_field']]
+        results.append(result)
+        if message is not None:
+            messages.append((result, message))
+
+    texts = [message for _, message in messages]
+    if _options['responses']:
+        for (result, _), response in zip(messages, _chatbot.chat_responses(texts)):
+            result['response'] = to_jsonable(response)
+    else:
+        predictions = _chatbot.predict_diseases(texts)
+        for (result, message), prediction in zip(messages, predictions):
+            result['extracted_symptoms'] = _chatbot.extract_symptoms(message)
+            result['disease'] = prediction['disease']
+            result['confidence'] = round(float(prediction['confidence']), 6)
+
+    return ''.join(json.dumps(result) + '\n' for result in results), len(batch), batch[-1][1]
+
+
+def iter_lines(path, start_offset=0):
+    """Yield (offset, next_offset, raw line) for each non-blank line from ``start_offset``"""
+    with open(path, 'rb') as f:
+        f.seek(start_offset)
+        offset = start_offset
+        for raw in f:
+            next_offset = offset + len(raw)
+            if raw.strip():
+                yield offset, next_offset, raw
+            offset = next_offset
+
+
+def resume_offset(output_path):
+    """Byte offset to continue from, after dropping a partially written last line"""
+    if not os.path.exists(output_path):
+        return 0
+    with open(output_path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        # Read backwards until the tail holds the last complete line
+        block = 4096
+        while True:
+            start = max(0, end - block)
+            f.seek(start)
+            tail = f.read(end - start)
+            newline = tail.rfind(b'\n')
+            previous = tail.rfind(b'\n', 0, newline) if newline >= 0 else -1
+            if previous >= 0 or start == 0:
+                break
+            block *= 2
+        if newline < 0:
+            f.truncate(0)
+            return 0
+        f.truncate(start + newline + 1)
+        return json.loads(tail[previous + 1:newline + 1])['next_offset']
+
+
+def format_eta(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class Progress:
+    """Periodic lines/sec and ETA report on stderr, estimated from bytes consumed"""
+
+    def __init__(self, start_offset, total_bytes, interval=5.0):
+        self.start_offset = start_offset
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.lines = 0
+        self.offset = start_offset
+        self.started = self.last_report = time.perf_counter()
+
+    def update(self, lines, offset):
+        self.lines += lines
+        self.offset = offset
+        now = time.perf_counter()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report(now)
+
+    def report(self, now=None):
+        elapsed = (now or time.perf_counter()) - self.started
+        done = self.offset - self.start_offset
+        byte_rate = done / elapsed if elapsed else 0.0
+        eta = format_eta((self.total_bytes - self.offset) / byte_rate) if byte_rate else "?"
+        percent = self.offset / self.total_bytes if self.total_bytes else 1.0
+        print(f"⏱️ {self.lines} lines, {self.lines / elapsed if elapsed else 0.0:.0f} lines/s, "
+              f"{percent:.1%} of input, ETA {eta}", file=sys.stderr, flush=True)
+
+
+def score_file(input_path, output_path, model_prefix, backend='keras', workers=1, batch_size=256,
+               field='message', id_field=None, responses=False, start_offset=0, append=False,
+               progress_interval=5.0):
+    """Score ``input_path`` into ``output_path`` and return the offset reached"""
+    options = {'field': field, 'id_field': id_field, 'responses': responses}
+    batches = ((batch,) for batch in chunked(iter_lines(input_path, start_offset), batch_size))
+    if workers == 1:
+        # Not worth a process pool for a single CPU
+        _init_worker(model_prefix, backend, options)
+        scored = (_score_batch(*args) for args in batches)
+    else:
+        scored = ordered_parallel_map(_score_batch, batches, workers,
+                                      initializer=_init_worker, initargs=(model_prefix, backend, options))
+
+    progress = Progress(start_offset, os.path.getsize(input_path), progress_interval)
+    with open(output_path, 'a' if append else 'w') as out:
+        try:
+            for text, count, next_offset in scored:
+                out.write(text)
+                out.flush()
+                progress.update(count, next_offset)
+        except KeyboardInterrupt:
+            print(f"\nInterrupted; continue with --resume or --start-offset {progress.offset}", file=sys.stderr)
+            raise
+    progress.report()
+    return progress.offset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of messages")
+    parser.add_argument("output", help="JSONL file for the results")
+    parser.add_argument("--model", default="medical_chatbot_lstm", help="prefix of the saved model files")
+    parser.add_argument("--backend", choices=sorted(MedicalChatbotLSTM.BACKEND_FILES), default="keras",
+                        help="inference backend; 'numpy' keeps TensorFlow out of the workers")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="scoring processes")
+    parser.add_argument("--batch-size", type=int, default=256, help="lines per predict_diseases call")
+    parser.add_argument("--field", default="message", help="JSON field holding the message text")
+    parser.add_argument("--id-field", help="JSON field copied to each result, e.g. an id")
+    parser.add_argument("--responses", action="store_true",
+                        help="write the full chat_response for each line instead of the prediction")
+    parser.add_argument("--start-offset", type=int, default=None, help="byte offset in the input to start from")
+    parser.add_argument("--resume", action="store_true",
+                        help="append to the output, continuing after its last complete line")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="seconds between progress lines")
+    args = parser.parse_args()
+
+    if args.resume and args.start_offset is not None:
+        parser.error("--resume and --start-offset are mutually exclusive")
+    if not MedicalChatbotLSTM.saved_model_exists(args.model, args.backend):
+        parser.error(f"No saved {args.backend} model at {args.model}_*. Train one with medical_chatbot_lstm.py first.")
+
+    start_offset = resume_offset(args.output) if args.resume else (args.start_offset or 0)
+    try:
+        score_file(args.input, args.output, args.model, backend=args.backend, workers=args.workers,
+                   batch_size=args.batch_size, field=args.field, id_field=args.id_field,
+                   responses=args.responses, start_offset=start_offset,
+                   append=args.resume or args.start_offset is not None,
+                   progress_interval=args.progress_interval)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    print(f"✅ Scored {args.input} into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -100,6 +100,12 @@ const symptomSynonyms = {
 let chatHistory = [];
 let currentSymptoms = [];
 let isAnalyzing = false;
+// Lets the server accumulate symptoms across turns instead of re-analyzing the conversation
+let sessionId = newSessionId();
+
+function newSessionId() {
+    return Date.now().toString(36) + Math.random().toString(36).slice(2);
+}
 
 // Multilingual support
 let currentLanguage = 'en';
@@ -291,8 +297,17 @@ function addMessage(text, sender, isTyping = false) {
     
     // Store in chat history
     if (!isTyping) {
+        messageDiv.dataset.historyIndex = chatHistory.length;
         chatHistory.push({ text, sender, timestamp: new Date() });
     }
+    return messageDiv;
+}
+
+// Replace the text of a message added earlier, e.g. as a streamed response is refined
+function updateMessage(messageDiv, text) {
+    messageDiv.querySelector('.message-bubble').innerHTML = formatMessage(text);
+    chatHistory[messageDiv.dataset.historyIndex].text = text;
+    chatMessages.scrollTop = chatMessages.scrollHeight;
 }
 
 // Format message with proper line breaks and styling
@@ -300,19 +315,164 @@ function formatMessage(text) {
     return text.replace(/\n/g, '<br>');
 }
 
+// Python inference server (chat_server.py); override before loading this script if needed
+const API_BASE_URL = window.CHAT_API_BASE_URL || 'http://localhost:8000';
+const API_TIMEOUT_MS = 10000;
+
 // Process user message and generate response
 async function processUserMessage(message) {
     isAnalyzing = true;
     
     // Show typing indicator
-    addMessage('', 'bot', true);
+    let typingIndicator = addMessage('', 'bot', true);
+    let botMessage = null;
+    const removeTypingIndicator = () => {
+        if (typingIndicator) {
+            chatMessages.removeChild(typingIndicator);
+            typingIndicator = null;
+        }
+    };
+    
+    // Render each part of the server's answer as it arrives; the emergency
+    // warning and the extracted symptoms come before the LSTM has run
+    const handlers = {
+        symptoms(data) {
+            currentSymptoms = [...new Set([...currentSymptoms, ...data.extracted_symptoms])];
+            if (data.emergency_warning) {
+                removeTypingIndicator();
+                botMessage = addMessage(data.message, 'bot');
+                showEmergencyInfo();
+            } else if (data.extracted_symptoms.length > 0) {
+                // Keep the typing indicator below while the analysis runs
+                botMessage = addMessage(`Identified symptoms: ${data.extracted_symptoms.join(', ')}. Analyzing...`, 'bot');
+                chatMessages.insertBefore(botMessage, typingIndicator);
+            }
+        },
+        symptom_analysis(data) {
+            removeTypingIndicator();
+            const text = `${data.message}\n\nRefining with the LSTM model...`;
+            if (botMessage) {
+                updateMessage(botMessage, text);
+            } else {
+                botMessage = addMessage(text, 'bot');
+            }
+        },
+        response(data) {
+            removeTypingIndicator();
+            botMessage = renderServerResponse(data, botMessage);
+        }
+    };
+    
+    // Ask the inference server; fall back to in-browser analysis if it is unreachable
+    try {
+        await streamChatResponse(message, handlers);
+    } catch (error) {
+        if (!botMessage) {
+            console.warn('Inference server unavailable, using local analysis:', error);
+        } else {
+            console.warn('Streamed response interrupted:', error);
+        }
+    }
+    
+    removeTypingIndicator();
+    if (!botMessage) {
+        processUserMessageLocally(message);
+    }
     
-    // Simulate processing time
-    await new Promise(resolve => setTimeout(resolve, 1500));
+    isAnalyzing = false;
+}
+
+// POST the message to the server's /chat/stream endpoint and call
+// handlers[event](data) for each server-sent event as it arrives
+async function streamChatResponse(message, handlers) {
+    const controller = new AbortController();
+    const timeout = setTimeout(() => controller.abort(), API_TIMEOUT_MS);
     
-    // Remove typing indicator
-    chatMessages.removeChild(chatMessages.lastChild);
+    try {
+        const response = await fetch(`${API_BASE_URL}/chat/stream`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ message, session_id: sessionId }),
+            signal: controller.signal
+        });
+        if (!response.ok) {
+            throw new Error(`Server responded with ${response.status}`);
+        }
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            
+            // Events end with a blank line; keep a trailing partial event for the next read
+            let end;
+            while ((end = buffer.indexOf('\n\n')) !== -1) {
+                const event = parseServerSentEvent(buffer.slice(0, end));
+                buffer = buffer.slice(end + 2);
+                if (event.name === 'error') {
+                    throw new Error(event.data.error);
+                }
+                if (handlers[event.name]) {
+                    handlers[event.name](event.data);
+                }
+            }
+        }
+    } finally {
+        clearTimeout(timeout);
+    }
+}
+
+function parseServerSentEvent(block) {
+    let name = 'message';
+    const data = [];
+    for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) {
+            name = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+            data.push(line.slice(5).trim());
+        }
+    }
+    return { name, data: JSON.parse(data.join('\n')) };
+}
+
+// Render a chat_response payload from the inference server, replacing
+// messageDiv (a streamed partial answer) if given; returns the message element
+function renderServerResponse(data, messageDiv = null) {
+    currentSymptoms = [...new Set([...currentSymptoms, ...data.extracted_symptoms])];
     
+    let text = data.message;
+    if (data.recommendations) {
+        text += `\n\n${data.recommendations}`;
+    }
+    if (messageDiv) {
+        updateMessage(messageDiv, text);
+    } else {
+        messageDiv = addMessage(text, 'bot');
+    }
+    
+    if (data.emergency_warning) {
+        showEmergencyInfo();
+        return messageDiv;
+    }
+    
+    // If high confidence prediction, show detailed results
+    const top = data.disease_predictions[0];
+    if (top && top.confidence > 0.6 && top.description) {
+        showDiseaseResults({
+            name: top.disease,
+            confidence: top.confidence,
+            description: top.description,
+            recommendations: top.recommendations
+        });
+    }
+    return messageDiv;
+}
+
+// In-browser analysis used when the inference server cannot be reached
+function processUserMessageLocally(message) {
     // Extract symptoms from message
     const extractedSymptoms = extractSymptoms(message.toLowerCase());
     
@@ -335,13 +495,122 @@ async function processUserMessage(message) {
         const response = generateGeneralResponse(message);
         addMessage(response, 'bot');
     }
-    
-    isAnalyzing = false;
+}
+
+// Typo tolerance, mirroring FuzzyIndex in fuzzy_index.py: every synonym word of
+// at least FUZZY_MIN_LENGTH letters is indexed under the strings left after
+// deleting up to FUZZY_MAX_DISTANCE letters from its prefix
+const FUZZY_MAX_DISTANCE = 2;
+const FUZZY_MIN_LENGTH = 5;
+const FUZZY_PREFIX_LENGTH = 7;
+const COMMON_WORDS = new Set(`
+    about after again also always another because been before being better both cause could
+    doing during each eight either every fewer fight first going having hired light might
+    never other right since sight still there their these think those thought though three
+    through tight times today tried tries under until where which while would should worse
+    height hours weeks years month months started feeling really things
+`.split(/\s+/).filter(Boolean));
+let fuzzyIndex = null;
+
+function deleteVariants(word, maxDistance) {
+    const variants = new Set([word]);
+    let frontier = [word];
+    for (let d = 0; d < maxDistance; d++) {
+        const next = [];
+        for (const variant of frontier) {
+            for (let i = 0; i < variant.length; i++) {
+                const shorter = variant.slice(0, i) + variant.slice(i + 1);
+                if (!variants.has(shorter)) {
+                    variants.add(shorter);
+                    next.push(shorter);
+                }
+            }
+        }
+        frontier = next;
+    }
+    return variants;
+}
+
+// Optimal string alignment distance, or limit + 1 once it must exceed limit
+function editDistance(a, b, limit) {
+    if (Math.abs(a.length - b.length) > limit) return limit + 1;
+    let previous2 = null;
+    let previous = Array.from({ length: b.length + 1 }, (_, j) => j);
+    for (let i = 1; i <= a.length; i++) {
+        const current = [i];
+        let rowMin = i;
+        for (let j = 1; j <= b.length; j++) {
+            let value = Math.min(previous[j] + 1, current[j - 1] + 1,
+                                 previous[j - 1] + (a[i - 1] === b[j - 1] ? 0 : 1));
+            if (i > 1 && j > 1 && a[i - 1] === b[j - 2] && a[i - 2] === b[j - 1]) {
+                value = Math.min(value, previous2[j - 2] + 1);
+            }
+            current[j] = value;
+            rowMin = Math.min(rowMin, value);
+        }
+        if (rowMin > limit) return limit + 1;
+        previous2 = previous;
+        previous = current;
+    }
+    return previous[b.length];
+}
+
+function allowedEdits(word) {
+    return Math.min(FUZZY_MAX_DISTANCE, Math.floor(word.length / 4));
+}
+
+function buildFuzzyIndex() {
+    const vocabulary = new Set();
+    for (const synonyms of Object.values(symptomSynonyms)) {
+        for (const synonym of synonyms) {
+            for (const word of synonym.toLowerCase().match(/\p{L}+/gu) || []) {
+                vocabulary.add(word);
+            }
+        }
+    }
+    const words = [];
+    const deletes = new Map();
+    for (const word of vocabulary) {
+        if (word.length < FUZZY_MIN_LENGTH || allowedEdits(word) === 0) continue;
+        const wordId = words.push(word) - 1;
+        for (const variant of deleteVariants(word.slice(0, FUZZY_PREFIX_LENGTH), FUZZY_MAX_DISTANCE)) {
+            if (!deletes.has(variant)) deletes.set(variant, []);
+            deletes.get(variant).push(wordId);
+        }
+    }
+    return { vocabulary, words, deletes };
+}
+
+// Closest synonym word to a misspelled token, or the token itself
+function correctToken(token) {
+    if (token.length < FUZZY_MIN_LENGTH || COMMON_WORDS.has(token) || fuzzyIndex.vocabulary.has(token)) {
+        return token;
+    }
+    let best = null;
+    const seen = new Set();
+    for (const variant of deleteVariants(token.slice(0, FUZZY_PREFIX_LENGTH), FUZZY_MAX_DISTANCE)) {
+        for (const wordId of fuzzyIndex.deletes.get(variant) || []) {
+            if (seen.has(wordId)) continue;
+            seen.add(wordId);
+            const word = fuzzyIndex.words[wordId];
+            let limit = allowedEdits(word);
+            if (best) limit = Math.min(limit, wordId > best.wordId ? best.distance - 1 : best.distance);
+            const distance = editDistance(token, word, limit);
+            if (distance <= limit) best = { word, distance, wordId };
+        }
+    }
+    return best ? best.word : token;
+}
+
+function correctTypos(message) {
+    if (!fuzzyIndex) fuzzyIndex = buildFuzzyIndex();
+    return message.replace(/\p{L}+/gu, correctToken);
 }
 
 // Extract symptoms from user message
 function extractSymptoms(message) {
     const symptoms = [];
+    message = correctTypos(message);
     
     // Check for symptom synonyms
     for (const [symptom, synonyms] of Object.entries(symptomSynonyms)) {
@@ -508,6 +777,7 @@ function clearChat() {
     
     chatHistory = [];
     currentSymptoms = [];
+    sessionId = newSessionId();
     isAnalyzing = false;
 }
 
@@ -575,17 +845,18 @@ function extractSymptomsWithContext(message) {
 
 // Extract duration from message
 function extractDuration(message) {
+    // Units are reported in the plural, as the server's session context does
     const durationPatterns = [
-        /(\d+)\s*(day|days)/i,
-        /(\d+)\s*(week|weeks)/i,
-        /(\d+)\s*(hour|hours)/i,
-        /(\d+)\s*(month|months)/i
+        [/(\d+)\s*(day|days)/i, 'days'],
+        [/(\d+)\s*(week|weeks)/i, 'weeks'],
+        [/(\d+)\s*(hour|hours)/i, 'hours'],
+        [/(\d+)\s*(month|months)/i, 'months']
     ];
     
-    for (const pattern of durationPatterns) {
+    for (const [pattern, unit] of durationPatterns) {
         const match = message.match(pattern);
         if (match) {
-            return { value: parseInt(match[1]), unit: match[2] };
+            return { value: parseInt(match[1]), unit };
         }
     }
     
@@ -0,0 +1,274 @@
+import re
+import sys
+import threading
+import time
+from array import array
+
+# Context extraction, mirroring extractDuration / extractSeverity /
+# extractFrequency in script.js. Units are reported in the plural however
+# the message spells them.
+DURATION_PATTERNS = [
+    (re.compile(r'(\d+)\s*(day|days)', re.IGNORECASE), 'days'),
+    (re.compile(r'(\d+)\s*(week|weeks)', re.IGNORECASE), 'weeks'),
+    (re.compile(r'(\d+)\s*(hour|hours)', re.IGNORECASE), 'hours'),
+    (re.compile(r'(\d+)\s*(month|months)', re.IGNORECASE), 'months'),
+]
+_DIGIT = re.compile(r'\d')
+SEVERE_WORDS = ('severe', 'terrible', 'awful', 'intense', 'extreme', 'very bad')
+MILD_WORDS = ('mild', 'slight', 'minor', 'little')
+FREQUENCY_WORDS = {
+    'constant': 'constant',
+    'continuous': 'constant',
+    'intermittent': 'intermittent',
+    'occasional': 'occasional',
+    'frequent': 'frequent',
+    'rare': 'rare',
+}
+
+
+def extract_duration(message):
+    """Return (value, unit) for the first duration mentioned, or None"""
+    if not _DIGIT.search(message):
+        return None
+    for pattern, unit in DURATION_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return int(match.group(1)), unit
+    return None
+
+
+def extract_severity(message):
+    if any(word in message for word in SEVERE_WORDS):
+        return 'severe'
+    if any(word in message for word in MILD_WORDS):
+        return 'mild'
+    return 'moderate'
+
+
+def extract_frequency(message):
+    for word, frequency in FREQUENCY_WORDS.items():
+        if word in message:
+            return frequency
+    return 'unknown'
+
+
+class Session:
+    """Accumulated state of one conversation
+
+    Symptoms are a bitset (a Python int) over the store's symptom ids, and
+    ``overlaps`` holds, per disease, how many of the session's symptoms the
+    disease lists; confidence is that count over the disease's symptom
+    count, as in SymptomIndex.score. ``disease_ids`` lists the diseases
+    whose count is non-zero, so ranking reads only those.
+    """
+
+    __slots__ = ('symptom_bits', 'overlaps', 'disease_ids', 'generation', 'duration', 'severity', 'frequency',
+                 'turns', 'expires_at')
+
+    def __init__(self, overlaps, disease_ids, generation):
+        self.symptom_bits = 0
+        self.overlaps = overlaps
+        self.disease_ids = disease_ids
+        self.generation = generation
+        self.duration = None
+        self.severity = 'moderate'
+        self.frequency = 'unknown'
+        self.turns = 0
+        self.expires_at = None
+
+    def nbytes(self):
+        return (sys.getsizeof(self) + sys.getsizeof(self.symptom_bits) + sys.getsizeof(self.overlaps)
+                + sys.getsizeof(self.disease_ids) + (sys.getsizeof(self.duration) if self.duration is not None else 0))
+
+
+class SessionStore:
+    """Multi-turn session state keyed by session id, with TTL and LRU eviction
+
+    Each turn only extracts symptoms from the new message. Newly seen
+    symptoms are set in the session's bitset, and the per-disease overlap
+    counts are bumped through the index's postings, so a turn costs the
+    postings of its new symptoms rather than a rescore of the whole
+    conversation.
+
+    Symptom ids are append-only, so a session's bitset stays valid when the
+    disease database changes. ``invalidate()`` bumps the generation and the
+    overlap counts of older sessions are rebuilt from their bitsets on their
+    next turn.
+    """
+
+    def __init__(self, symptom_index, max_sessions=200000, max_bytes=None, ttl=1800.0):
+        self.index = symptom_index
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.generation = 0
+        self.symptom_ids = {}
+        self.symptom_names = []
+        # A plain dict in insertion order is the LRU list: OrderedDict's
+        # extra linked-list node per entry costs more than the session itself
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _symptom_bit(self, symptom):
+        symptom_id = self.symptom_ids.get(symptom)
+        if symptom_id is None:
+            symptom_id = self.symptom_ids[symptom] = len(self.symptom_names)
+            self.symptom_names.append(symptom)
+        return 1 << symptom_id
+
+    def symptoms(self, session):
+        """Decode a session's bitset into symptom names, in symptom id order"""
+        bits = session.symptom_bits
+        names = []
+        while bits:
+            low = bits & -bits
+            names.append(self.symptom_names[low.bit_length() - 1])
+            bits ^= low
+        return names
+
+    def _new_overlaps(self):
+        # One byte per disease unless some disease lists more than 255 symptoms
+        if max(self.index.symptom_counts, default=0) < 256:
+            return bytearray(len(self.index))
+        return array('H', bytes(2 * len(self.index)))
+
+    def _new_disease_ids(self):
+        return array('H' if len(self.index) < 65536 else 'I')
+
+    def _add_symptom(self, session, symptom):
+        overlaps = session.overlaps
+        for disease_id in self.index.postings.get(symptom, ()):
+            if not overlaps[disease_id]:
+                session.disease_ids.append(disease_id)
+            overlaps[disease_id] += 1
+
+    def _rescore(self, session):
+        session.overlaps = self._new_overlaps()
+        session.disease_ids = self._new_disease_ids()
+        for symptom in self.symptoms(session):
+            self._add_symptom(session, symptom)
+        session.generation = self.generation
+
+    def update(self, session_id, symptoms, message):
+        """Fold one turn into a session, creating it if needed
+
+        Returns (session, newly added symptoms).
+        """
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None and session.expires_at is not None and session.expires_at <= now:
+                self._remove(session_id)
+                self.expirations += 1
+                session = None
+            if session is None:
+                session = Session(self._new_overlaps(), self._new_disease_ids(), self.generation)
+                self._sessions[session_id] = session
+            else:
+                self._sessions[session_id] = self._sessions.pop(session_id)
+                self.bytes -= session.nbytes()
+            index_changed = session.generation != self.generation
+
+            new_symptoms = []
+            for symptom in symptoms:
+                bit = self._symptom_bit(symptom)
+                if not session.symptom_bits & bit:
+                    session.symptom_bits |= bit
+                    new_symptoms.append(symptom)
+            if index_changed:
+                self._rescore(session)
+            else:
+                for symptom in new_symptoms:
+                    self._add_symptom(session, symptom)
+
+            message = message.lower()
+            session.duration = extract_duration(message) or session.duration
+            severity = extract_severity(message)
+            if severity != 'moderate':
+                session.severity = severity
+            frequency = extract_frequency(message)
+            if frequency != 'unknown':
+                session.frequency = frequency
+            session.turns += 1
+            session.expires_at = now + self.ttl if self.ttl is not None else None
+
+            self.bytes += session.nbytes()
+            self._evict(session_id, now)
+        return session, new_symptoms
+
+    def _evict(self, keep, now):
+        # Sessions are in last-update order and share one TTL, so the expired ones are at the front
+        expired = []
+        for session_id, session in self._sessions.items():
+            if session_id == keep or session.expires_at is None or session.expires_at > now:
+                break
+            expired.append(session_id)
+        for session_id in expired:
+            self._remove(session_id)
+        self.expirations += len(expired)
+
+        while len(self._sessions) > self.max_sessions or (
+                self.max_bytes is not None and self.bytes > self.max_bytes):
+            oldest = next(iter(self._sessions))
+            if oldest == keep:
+                break
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, session_id):
+        self.bytes -= self._sessions.pop(session_id).nbytes()
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None and session.expires_at is not None and session.expires_at <= time.monotonic():
+                self._remove(session_id)
+                self.expirations += 1
+                return None
+            return session
+
+    def end(self, session_id):
+        """Forget a session, e.g. when the user clears the chat"""
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+
+    def predictions(self, session, top_k=None):
+        """Rank the session's diseases from its overlap counts, like SymptomIndex.score"""
+        with self._lock:
+            if session.generation != self.generation:
+                # The rescore can change the overlap array's type and the disease list
+                self.bytes -= session.nbytes()
+                self._rescore(session)
+                self.bytes += session.nbytes()
+        return self.index.rank_overlaps(self.symptoms(session), session.overlaps, top_k=top_k,
+                                        disease_ids=session.disease_ids)
+
+    def context(self, session):
+        return {
+            'duration': {'value': session.duration[0], 'unit': session.duration[1]} if session.duration else None,
+            'severity': session.severity,
+            'frequency': session.frequency,
+        }
+
+    def invalidate(self, symptom_index):
+        """Switch to a new disease index; sessions are rescored on their next turn"""
+        with self._lock:
+            self.index = symptom_index
+            self.generation += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'bytes': self.bytes,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'symptom_ids': len(self.symptom_names),
+            }
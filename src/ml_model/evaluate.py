@@ -1,26 +1,63 @@
+import os
 import pickle
-import pandas as pd
-from sklearn.metrics import accuracy_score
+from concurrent.futures import ProcessPoolExecutor
 import json
 
-def evaluate(data_path="data/processed.csv", model_path="models/chatbot_model.pkl"):
-    df = pd.read_csv(data_path)
-    X = df["symptoms"]
-    y = df["disease"]
+from features import chunk_paths, load_chunk, read_manifest
+from timing import StageTimer
 
+# Per-process state for the scoring workers, loaded once by _init_worker
+_model = None
+_num_features = None
+
+
+def _init_worker(model_path, num_features):
+    global _model, _num_features
     with open(model_path, "rb") as f:
-        vectorizer, model = pickle.load(f)
+        _, _model = pickle.load(f)
+    _num_features = num_features
+
+
+def _score_chunk(path):
+    """Return (correct, total) predictions for one chunk"""
+    X_vec, y = load_chunk(path, _num_features)
+    preds = _model.predict(X_vec)
+    return int((preds == y).sum()), len(y)
 
-    X_vec = vectorizer.transform(X)
-    preds = model.predict(X_vec)
 
-    acc = accuracy_score(y, preds)
+def evaluate(data_dir="data/processed", model_path="models/chatbot_model.pkl", metrics_path="metrics.json",
+             timings_path="timings/evaluate.json", workers=None):
+    timer = StageTimer("evaluate")
+
+    with timer.step("load"):
+        manifest = read_manifest(data_dir)
+        if manifest is None:
+            raise FileNotFoundError(f"No preprocessed data in {data_dir}; run preprocess.py first")
+        paths = chunk_paths(data_dir, manifest)
+        num_features = len(manifest["vocabulary"])
+        workers = min(workers or os.cpu_count() or 1, len(paths)) or 1
+
+    with timer.step("score"):
+        if workers == 1:
+            # Not worth a process pool for a single chunk or CPU
+            _init_worker(model_path, num_features)
+            results = [_score_chunk(path) for path in paths]
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(model_path, num_features)) as pool:
+                results = list(pool.map(_score_chunk, paths))
+
+    correct = sum(chunk_correct for chunk_correct, _ in results)
+    total = sum(chunk_total for _, chunk_total in results)
+    acc = correct / total if total else 0.0
     metrics = {"accuracy": acc}
 
-    with open("metrics.json", "w") as f:
+    with open(metrics_path, "w") as f:
         json.dump(metrics, f)
 
+    timer.write(timings_path, rows=total, chunks=len(paths), workers=workers)
     print(f"✅ Model evaluated with accuracy: {acc:.2f}")
 
+
 if __name__ == "__main__":
     evaluate()
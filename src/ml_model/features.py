@@ -0,0 +1,86 @@
+"""
+Chunked bag-of-words store shared by the preprocess, train and evaluate stages
+
+``data/processed/`` holds one ``chunk_NNNNN.npz`` per group of diseases
+(a CSR count matrix plus the disease and severity of each row) and a
+``manifest.json`` with the vocabulary, the diseases in each chunk and a
+content hash per disease. The vocabulary only ever grows, so existing
+column ids stay valid and a chunk is rewritten only when one of its
+diseases changes.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import CountVectorizer
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def disease_hash(info):
+    """Content hash of one disease entry, independent of key order"""
+    return hashlib.sha1(json.dumps(info, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def disease_text(info):
+    # Same text the CSV pipeline vectorized: the symptom list joined by spaces
+    return " ".join(info["symptoms"])
+
+
+def make_vectorizer(vocabulary):
+    """CountVectorizer fixed to the store's column order"""
+    return CountVectorizer(vocabulary={term: index for index, term in enumerate(vocabulary)})
+
+
+def chunk_path(output_dir, index):
+    return os.path.join(output_dir, f"chunk_{index:05d}.npz")
+
+
+def read_manifest(output_dir):
+    """Return the manifest, or None if there is none in a compatible format"""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    # Written last and atomically: an interrupted run leaves the old manifest,
+    # whose hashes make the next run redo the unfinished chunks
+    with open(path + ".tmp", "w") as f:
+        json.dump(dict(manifest, format_version=FORMAT_VERSION), f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def save_chunk(path, matrix, diseases, severities):
+    matrix = csr_matrix(matrix)
+    np.savez(
+        path,
+        data=matrix.data,
+        indices=matrix.indices,
+        indptr=matrix.indptr,
+        shape=np.array(matrix.shape, dtype=np.int64),
+        diseases=np.array(diseases, dtype=np.str_),
+        severities=np.array(severities, dtype=np.str_),
+    )
+
+
+def load_chunk(path, num_features):
+    """Return (counts, diseases) with the matrix widened to the current vocabulary"""
+    with np.load(path) as data:
+        rows = int(data["shape"][0])
+        matrix = csr_matrix((data["data"], data["indices"], data["indptr"]), shape=(rows, num_features))
+        return matrix, data["diseases"]
+
+
+def chunk_paths(output_dir, manifest):
+    return [chunk_path(output_dir, index) for index, diseases in enumerate(manifest["chunks"]) if diseases]
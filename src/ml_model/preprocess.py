@@ -1,23 +1,92 @@
-import pandas as pd
 import json
 import os
+from collections import Counter
 
-def preprocess(input_path="data/disease_database.json", output_path="data/processed.csv"):
-    with open(input_path, "r") as f:
-        data = json.load(f)
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import CountVectorizer
 
-    rows = []
-    for disease, info in data.items():
-        rows.append({
-            "disease": disease,
-            "symptoms": " ".join(info["symptoms"]),  # join symptoms into text
-            "severity": info["severity"]
+from features import (chunk_path, disease_hash, disease_text, read_manifest, save_chunk,
+                      write_manifest)
+from timing import StageTimer
+
+
+def plan_chunks(data, manifest, chunk_size):
+    """Assign every disease to a chunk and return (chunks, indices of chunks to rewrite)
+
+    Diseases keep the chunk they were written to. A chunk is dirty when one
+    of its diseases was edited or removed; new diseases fill up the last
+    chunk and then open new ones.
+    """
+    hashes = {disease: disease_hash(info) for disease, info in data.items()}
+    old_hashes = manifest["hashes"] if manifest else {}
+    chunks = [list(diseases) for diseases in manifest["chunks"]] if manifest else []
+
+    dirty = set()
+    for index, diseases in enumerate(chunks):
+        kept = [disease for disease in diseases if disease in data]
+        if kept != diseases or any(hashes[disease] != old_hashes[disease] for disease in kept):
+            dirty.add(index)
+        chunks[index] = kept
+
+    placed = {disease for diseases in chunks for disease in diseases}
+    for disease in data:
+        if disease in placed:
+            continue
+        if not chunks or len(chunks[-1]) >= chunk_size:
+            chunks.append([])
+        chunks[-1].append(disease)
+        dirty.add(len(chunks) - 1)
+    return chunks, sorted(dirty), hashes
+
+
+def preprocess(input_path="data/disease_database.json", output_dir="data/processed", chunk_size=256,
+               timings_path="timings/preprocess.json"):
+    timer = StageTimer("preprocess")
+
+    with timer.step("load"):
+        with open(input_path, "r") as f:
+            data = json.load(f)
+        manifest = read_manifest(output_dir)
+        if manifest and manifest["chunk_size"] != chunk_size:
+            manifest = None
+
+    with timer.step("plan"):
+        chunks, dirty, hashes = plan_chunks(data, manifest, chunk_size)
+        vocabulary = list(manifest["vocabulary"]) if manifest else []
+        term_ids = {term: index for index, term in enumerate(vocabulary)}
+        analyzer = CountVectorizer().build_analyzer()
+
+    os.makedirs(output_dir, exist_ok=True)
+    for index in dirty:
+        diseases = chunks[index]
+        with timer.step("vectorize"):
+            rows, cols, counts = [], [], []
+            for row, disease in enumerate(diseases):
+                for term, count in Counter(analyzer(disease_text(data[disease]))).items():
+                    if term not in term_ids:
+                        # New terms get new columns; existing chunks stay valid
+                        term_ids[term] = len(vocabulary)
+                        vocabulary.append(term)
+                    rows.append(row)
+                    cols.append(term_ids[term])
+                    counts.append(count)
+            matrix = csr_matrix((counts, (rows, cols)), shape=(len(diseases), len(vocabulary)), dtype="int64")
+        with timer.step("write"):
+            save_chunk(chunk_path(output_dir, index), matrix, diseases,
+                       [data[disease]["severity"] for disease in diseases])
+
+    with timer.step("write"):
+        write_manifest(output_dir, {
+            "chunk_size": chunk_size,
+            "chunks": chunks,
+            "hashes": hashes,
+            "vocabulary": vocabulary,
         })
 
-    df = pd.DataFrame(rows)
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_csv(output_path, index=False)
-    print(f"✅ Preprocessed data saved to {output_path}")
+    timer.write(timings_path, diseases=len(data), chunks=len(chunks), chunks_written=len(dirty),
+                vocabulary=len(vocabulary))
+    print(f"✅ Preprocessed data saved to {output_dir} ({len(dirty)} of {len(chunks)} chunks rewritten)")
+
 
 if __name__ == "__main__":
     preprocess()
@@ -0,0 +1,37 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """Wall-clock time of each step of a pipeline stage, written as a DVC metrics file"""
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.steps = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def step(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = self.steps.get(name, 0.0) + time.perf_counter() - start
+
+    def write(self, path, **counts):
+        """Save total and per-step seconds plus any counts worth tracking next to them"""
+        total = time.perf_counter() - self._start
+        report = {
+            "total_s": round(total, 4),
+            "steps_s": {name: round(seconds, 4) for name, seconds in self.steps.items()},
+            **counts,
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+        steps = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.steps.items())
+        print(f"⏱️  {self.stage} took {total:.3f}s ({steps})")
+        return report
@@ -1,25 +1,44 @@
-import pandas as pd
 import pickle
 import os
-from sklearn.feature_extraction.text import CountVectorizer
+
+import numpy as np
+from scipy.sparse import vstack
 from sklearn.linear_model import LogisticRegression
 
-def train(data_path="data/processed.csv", model_path="models/chatbot_model.pkl"):
-    df = pd.read_csv(data_path)
-    X = df["symptoms"]
-    y = df["disease"]
+from features import chunk_paths, load_chunk, make_vectorizer, read_manifest
+from timing import StageTimer
+
 
-    vectorizer = CountVectorizer()
-    X_vec = vectorizer.fit_transform(X)
+def train(data_dir="data/processed", model_path="models/chatbot_model.pkl", timings_path="timings/train.json"):
+    timer = StageTimer("train")
 
-    model = LogisticRegression()
-    model.fit(X_vec, y)
+    with timer.step("load"):
+        manifest = read_manifest(data_dir)
+        if manifest is None:
+            raise FileNotFoundError(f"No preprocessed data in {data_dir}; run preprocess.py first")
+        vocabulary = manifest["vocabulary"]
+        matrices, labels = [], []
+        for path in chunk_paths(data_dir, manifest):
+            matrix, diseases = load_chunk(path, len(vocabulary))
+            matrices.append(matrix)
+            labels.append(diseases)
+        X_vec = vstack(matrices, format="csr")
+        y = np.concatenate(labels)
 
-    os.makedirs(os.path.dirname(model_path), exist_ok=True)
-    with open(model_path, "wb") as f:
-        pickle.dump((vectorizer, model), f)
+    with timer.step("fit"):
+        # Vectorization happened in preprocess; this vectorizer only encodes new text the same way
+        vectorizer = make_vectorizer(vocabulary)
+        model = LogisticRegression()
+        model.fit(X_vec, y)
 
+    with timer.step("save"):
+        os.makedirs(os.path.dirname(model_path), exist_ok=True)
+        with open(model_path, "wb") as f:
+            pickle.dump((vectorizer, model), f)
+
+    timer.write(timings_path, rows=X_vec.shape[0], features=X_vec.shape[1])
     print(f"✅ Model trained and saved to {model_path}")
 
+
 if __name__ == "__main__":
     train()
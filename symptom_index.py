@@ -0,0 +1,159 @@
+import heapq
+
+import numpy as np
+
+
+class SymptomIndex:
+    """Inverted symptom -> disease index over a disease database
+
+    Built once per database. Scoring a symptom list only visits the diseases
+    that share at least one symptom with it, and ``top_k`` selects the best
+    matches with a heap instead of sorting every candidate. ``score_matrix``
+    scores a whole batch of symptom lists with one sparse matrix product.
+
+    Only symptom sets are kept per disease; severity, description and
+    recommendations are read from the database when a prediction is built,
+    so an array-backed DiseaseTable stays in its shared pages.
+    """
+
+    def __init__(self, disease_database):
+        self.database = disease_database
+        self.disease_names = list(disease_database)
+        self.disease_symptoms = []
+        self.symptom_ids = {}
+        self.postings = {}
+        self.symptom_counts = []
+
+        for disease_id, name in enumerate(self.disease_names):
+            disease_symptoms = dict.fromkeys(disease_database[name]['symptoms'])
+            self.disease_symptoms.append(frozenset(disease_symptoms))
+            self.symptom_counts.append(len(disease_symptoms))
+            for symptom in disease_symptoms:
+                self.symptom_ids.setdefault(symptom, len(self.symptom_ids))
+                self.postings.setdefault(symptom, []).append(disease_id)
+
+        self._incidence = None
+
+    def __len__(self):
+        return len(self.disease_names)
+
+    def _prediction(self, disease_id, matched_symptoms, confidence):
+        info = self.database[self.disease_names[disease_id]]
+        return {
+            'disease': self.disease_names[disease_id],
+            'confidence': confidence,
+            'matched_symptoms': matched_symptoms,
+            'total_symptoms': self.symptom_counts[disease_id],
+            'severity': info['severity'],
+            'description': info['description'],
+            'recommendations': info['recommendations']
+        }
+
+    def _rank(self, candidates, top_k):
+        """Order (confidence, disease_id, ...) tuples best first, database order on ties"""
+        def key(candidate):
+            return (candidate[0], -candidate[1])
+
+        if top_k is not None and top_k < len(candidates):
+            return heapq.nlargest(top_k, candidates, key=key)
+        return sorted(candidates, key=key, reverse=True)
+
+    def score(self, symptoms, top_k=None):
+        """Return predictions for every disease sharing a symptom, best first"""
+        matched = {}
+        for symptom in dict.fromkeys(symptoms):
+            for disease_id in self.postings.get(symptom, ()):
+                matched.setdefault(disease_id, []).append(symptom)
+
+        candidates = [
+            (len(matched_symptoms) / self.symptom_counts[disease_id], disease_id, matched_symptoms)
+            for disease_id, matched_symptoms in matched.items()
+        ]
+        return [
+            self._prediction(disease_id, matched_symptoms, confidence)
+            for confidence, disease_id, matched_symptoms in self._rank(candidates, top_k)
+        ]
+
+    def rank_overlaps(self, symptoms, overlaps, top_k=None, disease_ids=None):
+        """Rank diseases from precomputed per-disease overlap counts with ``symptoms``
+
+        ``disease_ids`` limits the ranking to those diseases, e.g. the ones
+        whose count is known to be non-zero, instead of scanning every count.
+        """
+        if disease_ids is None:
+            disease_ids = range(len(overlaps))
+        candidates = [
+            (overlaps[disease_id] / self.symptom_counts[disease_id], disease_id)
+            for disease_id in disease_ids if overlaps[disease_id] and self.symptom_counts[disease_id]
+        ]
+        # Matched symptom lists are only built for the diseases that are returned
+        predictions = []
+        for confidence, disease_id in self._rank(candidates, top_k):
+            disease_symptoms = self.disease_symptoms[disease_id]
+            matched_symptoms = [symptom for symptom in symptoms if symptom in disease_symptoms]
+            predictions.append(self._prediction(disease_id, matched_symptoms, confidence))
+        return predictions
+
+    def incidence_matrix(self):
+        """Return the (diseases x symptoms) 0/1 matrix, sparse when SciPy is available"""
+        if self._incidence is None:
+            rows = [disease_id for disease_id, count in enumerate(self.symptom_counts) for _ in range(count)]
+            cols = [self.symptom_ids[symptom]
+                    for name in self.disease_names
+                    for symptom in dict.fromkeys(self.database[name]['symptoms'])]
+            self._incidence = self._matrix(rows, cols, (len(self), len(self.symptom_ids)))
+        return self._incidence
+
+    def symptom_matrix(self, symptom_lists):
+        """Encode a batch of symptom lists as a (batch x symptoms) 0/1 matrix"""
+        rows, cols = [], []
+        for row, symptoms in enumerate(symptom_lists):
+            for symptom in dict.fromkeys(symptoms):
+                symptom_id = self.symptom_ids.get(symptom)
+                if symptom_id is not None:
+                    rows.append(row)
+                    cols.append(symptom_id)
+        return self._matrix(rows, cols, (len(symptom_lists), len(self.symptom_ids)))
+
+    def _matrix(self, rows, cols, shape):
+        data = np.ones(len(rows), dtype=np.float32)
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError:
+            dense = np.zeros(shape, dtype=np.float32)
+            dense[rows, cols] = data
+            return dense
+        return csr_matrix((data, (rows, cols)), shape=shape)
+
+    def score_matrix(self, symptom_lists):
+        """Return a dense (batch x diseases) confidence matrix from one matrix product"""
+        overlaps = self.symptom_matrix(symptom_lists) @ self.incidence_matrix().T
+        if hasattr(overlaps, 'toarray'):
+            overlaps = overlaps.toarray()
+        overlaps = np.asarray(overlaps, dtype=np.float32)
+        counts = np.asarray(self.symptom_counts, dtype=np.float32)
+        # A disease listed without symptoms matches nothing and scores 0 instead of dividing by zero
+        return np.divide(overlaps, counts, out=np.zeros_like(overlaps), where=counts > 0)
+
+    def score_batch(self, symptom_lists, top_k=None):
+        """Score many symptom lists at once; returns one prediction list per input"""
+        symptom_lists = [list(dict.fromkeys(symptoms)) for symptoms in symptom_lists]
+        if not symptom_lists:
+            return []
+        confidences = self.score_matrix(symptom_lists)
+
+        results = []
+        for symptoms, row in zip(symptom_lists, confidences):
+            candidates = []
+            for disease_id in np.flatnonzero(row):
+                if not self.symptom_counts[disease_id]:
+                    continue
+                disease_symptoms = self.disease_symptoms[disease_id]
+                matched_symptoms = [symptom for symptom in symptoms if symptom in disease_symptoms]
+                confidence = len(matched_symptoms) / self.symptom_counts[disease_id]
+                candidates.append((confidence, int(disease_id), matched_symptoms))
+            results.append([
+                self._prediction(disease_id, matched_symptoms, confidence)
+                for confidence, disease_id, matched_symptoms in self._rank(candidates, top_k)
+            ])
+        return results
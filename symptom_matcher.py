@@ -0,0 +1,126 @@
+import unicodedata
+from collections import namedtuple
+
+SymptomMatch = namedtuple('SymptomMatch', ['symptom', 'phrase', 'start', 'end'])
+
+
+def _is_word_char(char):
+    # Vowel signs of Indic scripts are combining marks and belong to the word
+    return char.isalnum() or char == '_' or (char > '\x7f' and unicodedata.category(char)[0] == 'M')
+
+
+class SymptomMatcher:
+    """Aho-Corasick automaton over every synonym phrase of every symptom
+
+    The automaton is compiled once from a ``{symptom: [synonyms]}`` table and
+    then finds all phrases in a single left-to-right pass over the message,
+    so the cost per message does not grow with the size of the table.
+
+    With ``word_boundaries`` enabled a phrase only matches as whole words
+    ("cold" does not fire inside "scold"), except that one of ``suffixes``
+    may follow it so plurals such as "headaches" still count.
+    """
+
+    def __init__(self, symptom_synonyms, word_boundaries=True, suffixes=('s', 'es')):
+        self.word_boundaries = word_boundaries
+        self.suffixes = tuple(suffixes) if word_boundaries else ()
+        self.phrase_count = 0
+
+        # State 0 is the root; each state has transitions, a failure link and outputs
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+
+        for symptom, synonyms in symptom_synonyms.items():
+            for synonym in synonyms:
+                self._add_phrase(synonym.lower(), symptom)
+        self._build_failure_links()
+
+    def _add_phrase(self, phrase, symptom):
+        if not phrase:
+            return
+        state = 0
+        for char in phrase:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append((len(phrase), symptom, phrase))
+        self.phrase_count += 1
+
+    def _build_failure_links(self):
+        # Breadth-first so every failure target is finished before it is used
+        frontier = list(self._goto[0].values())
+        while frontier:
+            next_frontier = []
+            for state in frontier:
+                for char, child in self._goto[state].items():
+                    fallback = self._fail[state]
+                    while fallback and char not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    target = self._goto[fallback].get(char, 0)
+                    self._fail[child] = target if target != child else 0
+                    # Inherit outputs so a state reports every phrase ending here
+                    self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+                    next_frontier.append(child)
+            frontier = next_frontier
+
+    def _match_end(self, text, end):
+        """Return the end of the match (after any allowed suffix) or None"""
+        if end == len(text) or not _is_word_char(text[end]):
+            return end
+        for suffix in self.suffixes:
+            suffix_end = end + len(suffix)
+            if text.startswith(suffix, end) and (suffix_end == len(text) or not _is_word_char(text[suffix_end])):
+                return suffix_end
+        return None
+
+    def find_matches(self, text):
+        """Return every phrase occurrence as SymptomMatch(symptom, phrase, start, end)
+
+        Offsets index into ``text.lower()``, which lines up with ``text``
+        for everything except a handful of special Unicode characters.
+        """
+        text = text.lower()
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not outputs[state]:
+                continue
+
+            end = position + 1
+            for length, symptom, phrase in outputs[state]:
+                start = end - length
+                if self.word_boundaries:
+                    if _is_word_char(phrase[0]) and start > 0 and _is_word_char(text[start - 1]):
+                        continue
+                    match_end = self._match_end(text, end) if _is_word_char(phrase[-1]) else end
+                    if match_end is None:
+                        continue
+                else:
+                    match_end = end
+                matches.append(SymptomMatch(symptom, phrase, start, match_end))
+
+        matches.sort(key=lambda match: (match.start, -match.end))
+        return matches
+
+    def extract(self, text):
+        """Return the distinct symptoms found in text, in order of first mention"""
+        symptoms = []
+        seen = set()
+        for match in self.find_matches(text):
+            if match.symptom not in seen:
+                seen.add(match.symptom)
+                symptoms.append(match.symptom)
+        return symptoms